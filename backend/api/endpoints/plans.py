@@ -1,19 +1,27 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from backend.config import get_settings
+from backend.core.scheduler import GenerationQueueFull
 from backend.db.session import get_db
-from backend.schemas.plan import PlanCreate, PlanResponse, TaskStatusUpdate, GoalPlan
-from backend.services.plan_service import PlanService
+from backend.schemas.plan import (
+    PlanCreate, PlanImportResult, PlanProgress, PlanResponse, TaskStatusUpdate, GoalPlan, PlanSearchPage, PlanSummaryPage,
+    TaskStatusBatch, TaskStatusBatchResponse
+)
+from backend.services.plan_service import PlanService, etag_matches
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/plans", tags=["plans"])
 
 
-def get_plan_service(db: Session = Depends(get_db)) -> PlanService:
+def get_plan_service(db: AsyncSession = Depends(get_db)) -> PlanService:
     """Dependency to get plan service."""
     return PlanService(db)
 
@@ -21,23 +29,63 @@ def get_plan_service(db: Session = Depends(get_db)) -> PlanService:
 @router.post("/generate", response_class=StreamingResponse)
 async def generate_plan(
         plan_request: PlanCreate,
+        request: Request,
         service: PlanService = Depends(get_plan_service)
 ):
     """Generate a personalized health plan with streaming."""
+    bypass_cache = settings.GENERATION_CACHE_BYPASS_HEADER in request.headers
+    # Anonymous requests are queued fairly per client address
+    client_key = f"client:{request.client.host}" if request.client else None
     try:
+        events = await service.start_generation(
+            plan_request,
+            use_cache=not bypass_cache,
+            user_key=client_key
+        )
         return StreamingResponse(
-            service.generate_and_save_plan(plan_request),
+            events,
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "X-Accel-Buffering": "no",  # Disable nginx buffering
             }
         )
+    except GenerationQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.exception("Error generating plan")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/generate/{plan_id}/events", response_class=StreamingResponse)
+async def resume_generation(
+        plan_id: str,
+        last_event_id: Optional[str] = Header(None),
+        service: PlanService = Depends(get_plan_service)
+):
+    """Resume a generation's event stream after Last-Event-ID."""
+    try:
+        events = await service.resume_generation(plan_id, last_event_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if events is None:
+        raise HTTPException(status_code=404, detail="Generation not found")
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        }
+    )
+
+
 @router.patch("/{plan_id}/weeks/{week_number}/tasks/{task_id}")
 async def update_task_status(
         plan_id: str,
@@ -69,32 +117,131 @@ async def update_task_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{plan_id}", response_model=PlanResponse)
-def get_plan(
+@router.patch("/tasks", response_model=TaskStatusBatchResponse)
+async def update_task_statuses(
+        batch: TaskStatusBatch,
+        service: PlanService = Depends(get_plan_service)
+):
+    """Update the completion status of many tasks, possibly across plans."""
+    try:
+        response = await service.update_task_statuses(batch.updates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if response is None:
+        raise HTTPException(status_code=500, detail="Failed to update tasks")
+
+    return response
+
+
+@router.get("/summaries", response_model=PlanSummaryPage)
+async def list_plan_summaries(
+        limit: Optional[int] = Query(None, ge=1),
+        cursor: Optional[str] = None,
+        service: PlanService = Depends(get_plan_service)
+):
+    """List plan summaries page by page, newest first."""
+    try:
+        return await service.list_plan_summaries(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_plans(service: PlanService = Depends(get_plan_service)):
+    """Stream every saved plan as NDJSON, one PlanExportRecord per line."""
+    return StreamingResponse(service.export_plans(), media_type="application/x-ndjson")
+
+
+@router.post("/import", response_model=PlanImportResult)
+async def import_plans(request: Request, service: PlanService = Depends(get_plan_service)):
+    """Bulk insert plans from an NDJSON body of PlanExportRecord lines."""
+    return await service.import_plans(request.stream())
+
+
+@router.get("/search", response_model=PlanSearchPage)
+async def search_plans(
+        q: str = Query(..., min_length=1, max_length=200),
+        limit: Optional[int] = Query(None, ge=1),
+        cursor: Optional[str] = None,
+        service: PlanService = Depends(get_plan_service)
+):
+    """Search goals, overviews, week focuses and tasks, best matches first."""
+    try:
+        return await service.search_plans(q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{plan_id}/progress", response_model=PlanProgress)
+async def get_plan_progress(
         plan_id: str,
         service: PlanService = Depends(get_plan_service)
 ):
-    """Retrieve a saved plan by ID."""
-    plan = service.get_plan(plan_id)
-    if not plan:
+    """Completed and total task counts of a plan and each of its weeks."""
+    progress = await service.get_progress(plan_id)
+    if not progress:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    return PlanResponse(plan=plan)
+    return progress
+
+
+def _set_etag(response: Response, etag: Optional[str]) -> None:
+    """Attach an ETag and make clients revalidate before reusing the body."""
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
+
+@router.get("/{plan_id}", response_model=PlanResponse)
+async def get_plan(
+        plan_id: str,
+        if_none_match: Optional[str] = Header(None),
+        service: PlanService = Depends(get_plan_service)
+):
+    """Retrieve a saved plan by ID, or 304 if the client's copy is current."""
+    cached = service.get_cached_plan(plan_id)
+    etag = cached.etag if cached else await service.get_plan_etag(plan_id)
+    if etag and etag_matches(if_none_match, etag):
+        not_modified = Response(status_code=304)
+        _set_etag(not_modified, etag)
+        return not_modified
+
+    if cached is None:
+        cached = await service.load_plan(plan_id)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Plan not found")
+
+    # The body is already serialized, so skip response model validation
+    response = Response(content=cached.body, media_type="application/json")
+    _set_etag(response, cached.etag)
+    return response
 
 
 @router.get("/", response_model=list[GoalPlan])
-def list_plans(service: PlanService = Depends(get_plan_service)):
-    """List saved plans."""
-    return service.list_plans()
+async def list_plans(
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        service: PlanService = Depends(get_plan_service)
+):
+    """List saved plans, or 304 if the client's copy is current."""
+    etag = await service.get_plans_etag()
+    if etag and etag_matches(if_none_match, etag):
+        not_modified = Response(status_code=304)
+        _set_etag(not_modified, etag)
+        return not_modified
+
+    _set_etag(response, etag)
+    return await service.list_plans()
 
 
 @router.delete("/{plan_id}")
-def delete_plan(
+async def delete_plan(
         plan_id: str,
         service: PlanService = Depends(get_plan_service)
 ):
     """Delete a plan."""
-    success = service.delete_plan(plan_id)
+    success = await service.delete_plan(plan_id)
     if not success:
         raise HTTPException(status_code=404, detail="Plan not found")
 
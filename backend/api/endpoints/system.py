@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from backend.core.plan_cache import get_plan_cache
+from backend.core.scheduler import get_generation_scheduler
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/generations")
+async def generation_stats():
+    """Report active, queued and rejected generation counts."""
+    return get_generation_scheduler().stats()
+
+
+@router.get("/plan-cache")
+async def plan_cache_stats():
+    """Report plan cache size, hits, misses and evictions."""
+    return get_plan_cache().stats()
@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from backend.api.endpoints import plans
+from backend.api.endpoints import plans, system
 
 router = APIRouter()
 
 # All endpoint routers
 router.include_router(plans.router)
+router.include_router(system.router)
@@ -0,0 +1,165 @@
+"""End-to-end load benchmark for POST /api/plans/generate on the fake LLM.
+
+Runs the real FastAPI app (lifespan, scheduler, cache, parser, builder and
+SQLite persistence) in process through its ASGI interface, with the
+fake LLM backend standing in for OpenAI. Every request uses a distinct goal
+so neither the generation cache nor single-flight short-circuits it.
+Reports time-to-first-event, end-to-end latency (p50/p99) and events/sec.
+
+    python -m backend.benchmarks.bench_generate_e2e
+    python -m backend.benchmarks.bench_generate_e2e --concurrency 32 --requests 256 --token-delay-ms 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the pct-th percentile of samples in milliseconds."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index] * 1000
+
+
+def configure(args: argparse.Namespace, directory: Path) -> None:
+    """Point the app at the fake backend and a scratch database."""
+    os.environ.update({
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "dummy"),
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_CHUNK_SIZE": str(args.chunk_size),
+        "FAKE_LLM_TOKEN_DELAY_MS": str(args.token_delay_ms),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "DATABASE_URL": f"sqlite:///{directory / 'bench.db'}",
+        "GENERATION_MAX_CONCURRENCY": str(args.max_concurrency),
+        "GENERATION_MAX_QUEUE": str(args.requests),
+        "PARALLEL_GENERATION_ENABLED": str(args.parallel),
+    })
+
+
+async def generate(app, index: int, timeline: str) -> dict:
+    """Run one generation through the ASGI app and time its events.
+
+    The app is called directly rather than through an HTTP client so that
+    response chunks are observed as they are sent, not once the body ends.
+    """
+    body = json.dumps({
+        "goal": f"Benchmark goal {index}: run a half marathon",
+        "current_level": "Beginner",
+        "timeline": timeline,
+    }).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/plans/generate",
+        "raw_path": b"/api/plans/generate",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": (f"10.0.{index // 256 % 256}.{index % 256}", 50000),
+        "server": ("bench", 80),
+    }
+    start = time.perf_counter()
+    result = {"outcome": "error", "events": 0, "first_event": None}
+    received = False
+    buffer = ""
+
+    async def receive() -> dict:
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # The client never disconnects
+        await asyncio.Event().wait()
+
+    async def send(message: dict) -> None:
+        nonlocal buffer
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            result["outcome"] = f"http {message['status']}"
+        if message["type"] != "http.response.body":
+            return
+
+        buffer += message.get("body", b"").decode()
+        *events, buffer = buffer.split("\n\n")
+        for raw in events:
+            # Events may carry an "id:" line before their data
+            data = next((line for line in raw.splitlines() if line.startswith("data: ")), None)
+            if data is None:
+                continue
+            event = json.loads(data.removeprefix("data: "))
+            if event["type"] == "queued":
+                continue
+            if result["first_event"] is None:
+                result["first_event"] = time.perf_counter() - start
+            result["events"] += 1
+            if event["type"] in ("done", "error"):
+                result["outcome"] = event["type"]
+
+    await app(scope, receive, send)
+    result["total"] = time.perf_counter() - start
+    return result
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    # The app reads its settings at import time, so import it only after
+    # configure() has set the environment
+    from backend.main import app
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(index: int) -> dict:
+        async with semaphore:
+            return await generate(app, index, args.timeline)
+
+    async with app.router.lifespan_context(app):
+        await generate(app, -1, args.timeline)  # warm up
+        return await asyncio.gather(*(limited(n) for n in range(args.requests)))
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--concurrency", type=int, default=16, help="concurrent client streams")
+    arg_parser.add_argument("--requests", type=int, default=64)
+    arg_parser.add_argument("--timeline", default="16 weeks")
+    arg_parser.add_argument("--chunk-size", type=int, default=16)
+    arg_parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--max-concurrency", type=int, default=64, help="scheduler slots")
+    arg_parser.add_argument("--parallel", action="store_true", help="parallel week-range generation")
+    args = arg_parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        configure(args, Path(directory))
+        start = time.perf_counter()
+        results = asyncio.run(run(args))
+        wall = time.perf_counter() - start
+
+    completed = [r for r in results if r["outcome"] == "done"]
+    first_events = [r["first_event"] for r in completed]
+    totals = [r["total"] for r in completed]
+    events = sum(r["events"] for r in results)
+
+    print(f"requests={args.requests} concurrency={args.concurrency} timeline={args.timeline!r} "
+          f"chunk={args.chunk_size} delay={args.token_delay_ms}ms parallel={args.parallel}")
+    print(f"completed: {len(completed)}/{len(results)} in {wall:.2f} s")
+    print(f"time to first event  p50={percentile(first_events, 50):8.1f} ms  "
+          f"p99={percentile(first_events, 99):8.1f} ms")
+    print(f"end-to-end latency   p50={percentile(totals, 50):8.1f} ms  "
+          f"p99={percentile(totals, 99):8.1f} ms")
+    print(f"throughput           {events / wall:8.0f} events/s  {len(completed) / wall:6.1f} plans/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Storage size and decode time of the plan_data codecs.
+
+Encodes the same synthetic plans with every available codec, stores them
+in a fresh database per codec and reports the average snapshot size, the
+database file size after VACUUM, and per-plan encode and decode latency.
+
+    python -m backend.benchmarks.bench_plan_codec
+    python -m backend.benchmarks.bench_plan_codec --plans 20000 --weeks 16
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import insert, text
+from sqlmodel import SQLModel, create_engine
+
+from backend.benchmarks.bench_sqlite_profiles import make_plan, percentile
+from backend.db.models import SavedPlan
+from backend.db.plan_codec import CODECS, decode_plan
+
+
+def run_codec(name: str, plans: list, directory: Path) -> dict:
+    """Encode, store and decode every plan with one codec."""
+    codec = CODECS[name]
+    encode_times, decode_times = [], []
+
+    encoded = []
+    for plan in plans:
+        started = time.perf_counter()
+        encoded.append(codec.encode(plan))
+        encode_times.append(time.perf_counter() - started)
+
+    for data in encoded:
+        started = time.perf_counter()
+        decode_plan(name, data)
+        decode_times.append(time.perf_counter() - started)
+
+    path = directory / f"{name}.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(SavedPlan), [
+            {
+                "id": plan.id,
+                "goal": plan.goal,
+                "overview": plan.overview,
+                "plan_data": data,
+                "plan_data_format": name,
+                "created_at": datetime.fromisoformat(plan.created_at),
+            }
+            for plan, data in zip(plans, encoded)
+        ])
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    engine.dispose()
+
+    return {
+        "codec": name,
+        "bytes": sum(len(data) for data in encoded) / len(encoded),
+        "db_mb": path.stat().st_size / 1024 / 1024,
+        "encode_p50": percentile(encode_times, 50),
+        "decode_p50": percentile(decode_times, 50),
+        "decode_p99": percentile(decode_times, 99),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--plans", type=int, default=5000)
+    arg_parser.add_argument("--weeks", type=int, default=12)
+    arg_parser.add_argument("--codecs", nargs="+", choices=list(CODECS), default=list(CODECS))
+    args = arg_parser.parse_args(argv)
+
+    plans = [make_plan(i, args.weeks) for i in range(args.plans)]
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_codec(name, plans, Path(tmp)) for name in args.codecs]
+
+    print(f"plans={args.plans} weeks={args.weeks} tasks/week=4")
+    print(f"{'codec':>8} {'bytes':>7} {'db':>8} {'encode p50':>11} {'decode p50':>11} {'decode p99':>11}")
+    for r in results:
+        print(f"{r['codec']:>8} {r['bytes']:>7.0f} {r['db_mb']:>6.1f}MB "
+              f"{r['encode_p50']:>9.3f}ms {r['decode_p50']:>9.3f}ms {r['decode_p99']:>9.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
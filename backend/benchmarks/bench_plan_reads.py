@@ -0,0 +1,108 @@
+"""Uncached plan read latency: validated models vs. passthrough bytes.
+
+Seeds plans through PlanRepository, then loads each one's PlanResponse
+body both ways a plan cache miss can: validating the rows into a GoalPlan
+and serializing it, or serializing the trusted rows directly. Reports
+latency percentiles and CPU time per read.
+
+    python -m backend.benchmarks.bench_plan_reads
+    python -m backend.benchmarks.bench_plan_reads --plans 500 --weeks 16 --reads 5000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.benchmarks.bench_sqlite_profiles import make_plan, percentile
+from backend.config import get_settings
+from backend.core.plan_cache import CachedPlan
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.db.session import apply_storage_profile, engine_options, get_async_database_url
+
+
+async def validated(repository: PlanRepository, plan_id: str) -> bytes:
+    plan, _ = await repository.get_with_version(plan_id)
+    return CachedPlan.build(plan, etag=None).body
+
+
+async def passthrough(repository: PlanRepository, plan_id: str) -> bytes:
+    body, _ = await repository.get_body_with_version(plan_id)
+    return body
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    """Seed a database and time both read paths on it."""
+    config = get_settings()
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'reads.db'}"
+        sync_engine = create_engine(url, **engine_options(url, config))
+        apply_storage_profile(sync_engine, config)
+        SQLModel.metadata.create_all(sync_engine)
+        sync_engine.dispose()
+
+        async_url = get_async_database_url(url)
+        engine = create_async_engine(async_url, **engine_options(async_url, config))
+        apply_storage_profile(engine.sync_engine, config)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        plan_ids = []
+        async with sessions() as db:
+            repository = PlanRepository(db)
+            for i in range(args.plans):
+                plan = make_plan(i, args.weeks)
+                await repository.save(plan, current_level="Beginner", timeline=f"{args.weeks} weeks")
+                plan_ids.append(plan.id)
+
+        rng = random.Random(7)
+        reads = [rng.choice(plan_ids) for _ in range(args.reads)]
+
+        for name, load in [("validated", validated), ("passthrough", passthrough)]:
+            latencies = []
+            cpu_started = time.process_time()
+            for plan_id in reads:
+                # A fresh session per read, like a request
+                async with sessions() as db:
+                    started = time.perf_counter()
+                    await load(PlanRepository(db), plan_id)
+                    latencies.append(time.perf_counter() - started)
+            cpu = time.process_time() - cpu_started
+
+            results.append({
+                "path": name,
+                "p50": percentile(latencies, 50),
+                "p99": percentile(latencies, 99),
+                "cpu": cpu / len(reads) * 1000,
+            })
+
+        await engine.dispose()
+
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--plans", type=int, default=200)
+    arg_parser.add_argument("--weeks", type=int, default=12)
+    arg_parser.add_argument("--reads", type=int, default=2000)
+    args = arg_parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    print(f"plans={args.plans} weeks={args.weeks} tasks/week=4 reads={args.reads}")
+    print(f"{'path':>12} {'p50':>9} {'p99':>9} {'cpu/read':>10}")
+    for r in results:
+        print(f"{r['path']:>12} {r['p50']:>7.2f}ms {r['p99']:>7.2f}ms {r['cpu']:>8.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Throughput and peak memory of NDJSON plan import and export.
+
+Writes synthetic plan records to an NDJSON file, bulk imports them into a
+fresh database, then exports them again, and reports the process's peak
+RSS after each phase. RSS includes SQLite's page cache and memory-mapped
+database pages, so it grows until SQLITE_CACHE_SIZE and SQLITE_MMAP_SIZE
+are reached. --trace-memory reports the peak Python heap of each phase
+with tracemalloc instead. That heap stays flat as --plans grows and only
+the batch sizes move it, but tracing slows both phases down several times.
+
+    python -m backend.benchmarks.bench_plan_transfer
+    python -m backend.benchmarks.bench_plan_transfer --plans 1000000 --weeks 4
+"""
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.benchmarks.bench_sqlite_profiles import make_plan
+from backend.config import get_settings
+from backend.db.plan_transfer import import_plans, split_lines
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.db.session import apply_storage_profile, engine_options, get_async_database_url
+
+
+def write_records(path: Path, plans: int, weeks: int) -> None:
+    """Write one NDJSON plan record per plan."""
+    with open(path, "w") as output:
+        for i in range(plans):
+            plan = make_plan(i, weeks)
+            output.write(json.dumps({"plan": plan.model_dump(), "timeline": f"{weeks} weeks"}) + "\n")
+
+
+async def file_chunks(path: Path):
+    with open(path, "rb") as source:
+        while chunk := source.read(1 << 16):
+            yield chunk
+
+
+def peak_memory(args: argparse.Namespace) -> int:
+    """Return peak bytes: traced heap of the phase, or RSS of the process."""
+    if args.trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        return peak
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    """Import the records into a fresh database, then export them."""
+    config = get_settings()
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        records = Path(tmp) / "plans.ndjson"
+        write_records(records, args.plans, args.weeks)
+
+        url = f"sqlite:///{Path(tmp) / 'transfer.db'}"
+        sync_engine = create_engine(url, **engine_options(url, config))
+        apply_storage_profile(sync_engine, config)
+        SQLModel.metadata.create_all(sync_engine)
+        sync_engine.dispose()
+
+        async_url = get_async_database_url(url)
+        engine = create_async_engine(async_url, **engine_options(async_url, config))
+        apply_storage_profile(engine.sync_engine, config)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        if args.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        async with sessions() as db:
+            lines = split_lines(file_chunks(records), config.IMPORT_MAX_LINE_BYTES)
+            result = await import_plans(db, lines, args.import_batch)
+        elapsed = time.perf_counter() - started
+        results.append({"phase": "import", "plans": result.imported, "seconds": elapsed,
+                        "peak": peak_memory(args)})
+
+        exported = 0
+        started = time.perf_counter()
+        with open(Path(tmp) / "export.ndjson", "wb") as output:
+            async with sessions() as db:
+                async for lines in PlanRepository(db).export_plans(args.export_batch):
+                    output.write(lines)
+                    exported += lines.count(b"\n")
+        elapsed = time.perf_counter() - started
+        results.append({"phase": "export", "plans": exported, "seconds": elapsed,
+                        "peak": peak_memory(args)})
+        tracemalloc.stop()
+
+        await engine.dispose()
+
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    config = get_settings()
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--plans", type=int, default=20_000)
+    arg_parser.add_argument("--weeks", type=int, default=12)
+    arg_parser.add_argument("--import-batch", type=int, default=config.IMPORT_BATCH_SIZE)
+    arg_parser.add_argument("--export-batch", type=int, default=config.EXPORT_BATCH_SIZE)
+    arg_parser.add_argument("--trace-memory", action="store_true")
+    args = arg_parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    print(f"plans={args.plans} weeks={args.weeks} tasks/week=4 "
+          f"import_batch={args.import_batch} export_batch={args.export_batch}")
+    print(f"{'phase':>7} {'plans':>9} {'plans/s':>9} {'peak heap' if args.trace_memory else 'peak rss':>10}")
+    for r in results:
+        print(f"{r['phase']:>7} {r['plans']:>9} {r['plans'] / r['seconds']:>9.0f} "
+              f"{r['peak'] / 1024 / 1024:>8.1f}MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Per-request planner setup overhead before and after the shared planner.
+
+"per-request" rebuilds what every generation used to construct: a new
+ChatOpenAI (with its own HTTP clients and connection pools), a new
+ChatPromptTemplate and a new chain. "shared" is what a generation does
+now: look up the process-wide planner and its precompiled chain.
+No network calls are made.
+
+    OPENAI_API_KEY=dummy python -m backend.benchmarks.bench_planner_setup
+"""
+import argparse
+import sys
+import time
+
+from langchain_openai import ChatOpenAI
+
+from backend.config import get_settings
+from backend.core.planner import HealthPlannerAI, get_planner
+
+settings = get_settings()
+
+
+def per_request_setup(num_weeks: int) -> object:
+    """Reproduce the setup each generation performed before sharing."""
+    llm = ChatOpenAI(
+        model=settings.OPENAI_MODEL,
+        temperature=settings.OPENAI_TEMPERATURE,
+        streaming=True
+    )
+    prompt = HealthPlannerAI._create_prompt(num_weeks)
+    return prompt | llm
+
+
+def shared_setup(num_weeks: int) -> object:
+    """Setup performed by a generation with the shared planner."""
+    return get_planner()._get_chain(num_weeks)
+
+
+def time_setup(setup, runs: int) -> float:
+    """Return mean microseconds per setup call."""
+    start = time.perf_counter()
+    for n in range(runs):
+        setup(n % settings.MAX_PLAN_WEEKS + 1)
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=200)
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    get_planner()
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    per_request = time_setup(per_request_setup, args.runs)
+    shared = time_setup(shared_setup, args.runs)
+
+    print(f"runs={args.runs} max_weeks={settings.MAX_PLAN_WEEKS}")
+    print(f"one-off shared planner build:   {startup_ms:10.1f} ms")
+    print(f"per-request setup (before):     {per_request:10.1f} us")
+    print(f"shared planner lookup (after):  {shared:10.1f} us")
+    print(f"speedup:                        {per_request / shared:10.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
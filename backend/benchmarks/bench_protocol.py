@@ -0,0 +1,118 @@
+"""Output tokens and latency of the json and compact LLM event protocols.
+
+Re-encodes a recorded plan stream in both protocols, counts tokens with
+tiktoken (or, offline, an approximate split on tiktoken's pre-tokenizer
+pattern), and estimates generation time at a fixed decode rate: the total
+and the time until the first task line is complete. Parser CPU time is
+measured by streaming each encoding through StreamingJSONParser in
+token-sized chunks.
+
+    python -m backend.benchmarks.bench_protocol
+    python -m backend.benchmarks.bench_protocol --tokens-per-second 40 --runs 50
+"""
+import argparse
+import json
+import re
+import sys
+import time
+
+import tiktoken
+
+from backend.benchmarks.bench_streaming_parser import load_recording, replay
+from backend.core.planner import HealthPlannerAI
+from backend.core.streaming_parser import StreamingJSONParser, compact_event
+
+PROTOCOLS = ["json", "compact"]
+
+# The word/number/punctuation split tiktoken applies before BPE merges; each
+# piece is at least one token, so counts from it are a lower bound
+PRETOKENIZE = re.compile(r"""'(?i:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+""")
+
+
+class ApproximateEncoding:
+    """Stand-in for a tiktoken encoding when its BPE ranks cannot be downloaded."""
+
+    name = "approximate"
+
+    def encode(self, text: str) -> list[str]:
+        return PRETOKENIZE.findall(text)
+
+    def decode(self, tokens: list[str]) -> str:
+        return "".join(tokens)
+
+
+def get_encoding(name: str):
+    """Return the tiktoken encoding, falling back to ApproximateEncoding."""
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(f"tiktoken encoding {name!r} unavailable ({type(e).__name__}); counting approximate tokens")
+        return ApproximateEncoding()
+
+
+def encode(events: list[dict], protocol: str) -> list[str]:
+    """Return the NDJSON lines an LLM would write for the events."""
+    if protocol == "compact":
+        return [json.dumps(compact_event(event), ensure_ascii=False, separators=(",", ":")) for event in events]
+    return [json.dumps(event, ensure_ascii=False) for event in events]
+
+
+def measure(events: list[dict], protocol: str, encoding, args: argparse.Namespace) -> dict:
+    """Count tokens of one encoding and time parsing it token by token."""
+    lines = encode(events, protocol)
+    text = "".join(line + "\n" for line in lines)
+    tokens = encoding.encode(text)
+    chunks = [encoding.decode([token]) for token in tokens]
+
+    first_task = next(i for i, event in enumerate(events) if event["type"] == "task")
+    first_task_tokens = len(encoding.encode("".join(line + "\n" for line in lines[:first_task + 1])))
+    prompt = HealthPlannerAI._create_prompt(args.weeks, protocol).messages[0].prompt.template
+
+    assert replay(chunks) == len(events)
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        replay(chunks)
+    parse_seconds = (time.perf_counter() - started) / args.runs
+
+    return {
+        "protocol": protocol,
+        "bytes": len(text.encode()),
+        "tokens": len(tokens),
+        "prompt_tokens": len(encoding.encode(prompt)),
+        "first_task_s": first_task_tokens / args.tokens_per_second,
+        "total_s": len(tokens) / args.tokens_per_second,
+        "parse_ms": parse_seconds * 1000,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--recording", default="plan_16_weeks.ndjson")
+    arg_parser.add_argument("--encoding", default="o200k_base")
+    arg_parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    arg_parser.add_argument("--weeks", type=int, default=16, help="Plan length used for the prompt")
+    arg_parser.add_argument("--runs", type=int, default=100)
+    args = arg_parser.parse_args(argv)
+
+    parser = StreamingJSONParser()
+    events = parser.process_chunk(load_recording(args.recording)) + parser.flush()
+    encoding = get_encoding(args.encoding)
+    results = [measure(events, protocol, encoding, args) for protocol in PROTOCOLS]
+
+    print(f"recording={args.recording} events={len(events)} encoding={encoding.name} "
+          f"tokens/s={args.tokens_per_second:g}")
+    print(f"{'protocol':>9} {'bytes':>7} {'tokens':>7} {'prompt':>7} "
+          f"{'first task':>11} {'total':>8} {'parse':>9}")
+    for r in results:
+        print(f"{r['protocol']:>9} {r['bytes']:>7} {r['tokens']:>7} {r['prompt_tokens']:>7} "
+              f"{r['first_task_s']:>10.2f}s {r['total_s']:>7.1f}s {r['parse_ms']:>7.2f}ms")
+
+    baseline, compact = results
+    saved = 1 - compact["tokens"] / baseline["tokens"]
+    print(f"compact saves {saved:.1%} of output tokens "
+          f"({baseline['total_s'] - compact['total_s']:.1f}s at {args.tokens_per_second:g} tokens/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
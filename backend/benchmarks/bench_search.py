@@ -0,0 +1,147 @@
+"""Plan search latency on a large FTS5 index.
+
+Seeds a database with synthetic plans (plan rows and search documents
+only, inserted in bulk), then runs each query repeatedly through
+PlanRepository.search and reports latency percentiles per query. The
+queries range from a rare term to terms found in nearly every plan.
+
+    python -m backend.benchmarks.bench_search
+    python -m backend.benchmarks.bench_search --plans 300000 --repeat 50
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.benchmarks.bench_sqlite_profiles import percentile
+from backend.config import get_settings
+from backend.db.models import SavedPlan
+from backend.db.plan_search import query_terms
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.db.session import apply_storage_profile, engine_options, get_async_database_url
+
+ACTIVITIES = [
+    "running", "swimming", "cycling", "yoga", "pilates", "rowing", "hiking", "climbing",
+    "boxing", "dancing", "walking", "stretching", "lifting", "sprinting", "skating", "tennis",
+]
+OUTCOMES = [
+    "endurance", "strength", "mobility", "balance", "sleep", "posture", "recovery", "focus",
+    "flexibility", "stamina", "weight", "energy", "speed", "core", "breathing", "stress",
+]
+QUERIES = ["running", "yoga flexibility", "stretch", "marathon", "tennis sleep posture"]
+
+
+def make_document(rng: random.Random) -> dict[str, str]:
+    """Return search document columns for one synthetic plan."""
+    activity, other = rng.sample(ACTIVITIES, 2)
+    outcome = rng.choice(OUTCOMES)
+    goal = f"Improve {outcome} with {activity}"
+    if rng.random() < 0.01:
+        goal += " and finish a marathon"
+    return {
+        "goal": goal,
+        "overview": f"A progressive {activity} plan mixed with {other} for {outcome}.",
+        "focus": " ".join(f"Week {week} {rng.choice(OUTCOMES)}" for week in range(1, 13)),
+        "tasks": " ".join(
+            f"{rng.choice(ACTIVITIES)} session {rng.choice(OUTCOMES)} drills" for _ in range(36)
+        ),
+    }
+
+
+def seed(url: str, config, plans: int) -> None:
+    """Bulk insert plan rows and their search documents."""
+    rng = random.Random(7)
+    sync_engine = create_engine(url, **engine_options(url, config))
+    apply_storage_profile(sync_engine, config)
+    SQLModel.metadata.create_all(sync_engine)
+
+    with sync_engine.begin() as connection:
+        for start in range(0, plans, 10_000):
+            documents = [make_document(rng) for _ in range(start, min(plans, start + 10_000))]
+            connection.execute(
+                text("INSERT INTO plan_search (rowid, goal, overview, focus, tasks) "
+                     "VALUES (:rowid, :goal, :overview, :focus, :tasks)"),
+                [{"rowid": start + i + 1, **document} for i, document in enumerate(documents)]
+            )
+            connection.execute(insert(SavedPlan), [
+                {
+                    "id": f"plan-{start + i:07d}",
+                    "goal": document["goal"],
+                    "overview": document["overview"],
+                    "timeline": "12 weeks",
+                    "plan_data": "{}",
+                    "search_id": start + i + 1,
+                    "created_at": datetime(2025, 1, 1) + timedelta(minutes=start + i),
+                }
+                for i, document in enumerate(documents)
+            ])
+    sync_engine.dispose()
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    """Seed a database and time every query."""
+    config = get_settings()
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'search.db'}"
+        started = time.perf_counter()
+        seed(url, config, args.plans)
+        print(f"seeded {args.plans} plans in {time.perf_counter() - started:.1f}s")
+
+        async_url = get_async_database_url(url)
+        engine = create_async_engine(async_url, **engine_options(async_url, config))
+        apply_storage_profile(engine.sync_engine, config)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with sessions() as db:
+            repository = PlanRepository(db)
+            for query in QUERIES:
+                latencies = []
+                hits = 0
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    found, _ = await repository.search(query_terms(query), args.limit, candidates=args.candidates)
+                    hits = len(found)
+                    latencies.append(time.perf_counter() - started)
+
+                results.append({
+                    "query": query,
+                    "hits": hits,
+                    "p50": percentile(latencies, 50),
+                    "p99": percentile(latencies, 99),
+                })
+
+        await engine.dispose()
+
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--plans", type=int, default=100_000)
+    arg_parser.add_argument("--limit", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--candidates", type=int, default=get_settings().SEARCH_MAX_CANDIDATES)
+    args = arg_parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    print(f"plans={args.plans} limit={args.limit} repeat={args.repeat} candidates={args.candidates}")
+    print(f"{'query':>22} {'hits':>5} {'p50':>9} {'p99':>9}")
+    for r in results:
+        print(f"{r['query']:>22} {r['hits']:>5} {r['p50']:>7.1f}ms {r['p99']:>7.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
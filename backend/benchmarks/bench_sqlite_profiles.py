@@ -0,0 +1,175 @@
+"""Mixed read/write load benchmark for the SQLite storage profiles.
+
+Seeds a fresh database per profile, then runs concurrent readers (plan
+reads and summary pages) against concurrent writers (task toggles and new
+plans) through the async PlanRepository, and reports throughput, latency
+percentiles and failed operations.
+
+    python -m backend.benchmarks.bench_sqlite_profiles
+    python -m backend.benchmarks.bench_sqlite_profiles --readers 32 --writers 4 --duration 10
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.config import get_settings
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.db.session import apply_storage_profile, engine_options, get_async_database_url
+from backend.schemas.plan import GoalPlan, WeeklyPlan, WeeklyTask
+
+PROFILES = ["default", "tuned"]
+
+
+def make_plan(index: int, num_weeks: int) -> GoalPlan:
+    """Build a realistic plan with 4 tasks per week."""
+    return GoalPlan(
+        id=str(uuid.uuid4()),
+        goal=f"Benchmark goal {index}: run a half marathon",
+        overview="Progressive running plan with strength and mobility work.",
+        weeks=[
+            WeeklyPlan(
+                week=week,
+                focus=f"Week {week} focus",
+                tasks=[
+                    WeeklyTask(
+                        id=str(uuid.uuid4()),
+                        title=f"Session {n}",
+                        description="Run at an easy pace, then 3 rounds of core work.",
+                        duration="45 mins"
+                    )
+                    for n in range(4)
+                ]
+            )
+            for week in range(1, num_weeks + 1)
+        ],
+        created_at=(datetime(2025, 1, 1) + timedelta(minutes=index)).isoformat()
+    )
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the pct-th percentile of samples in milliseconds."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index] * 1000
+
+
+async def run_profile(profile: str, args: argparse.Namespace, directory: Path) -> dict:
+    """Seed a database for one profile and run the mixed workload on it."""
+    config = get_settings().model_copy(update={"SQLITE_PROFILE": profile})
+    url = f"sqlite:///{directory / f'{profile}.db'}"
+    async_url = get_async_database_url(url)
+
+    sync_engine = create_engine(url, **engine_options(url, config))
+    apply_storage_profile(sync_engine, config)
+    SQLModel.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    engine = create_async_engine(async_url, **engine_options(async_url, config))
+    apply_storage_profile(engine.sync_engine, config)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    plans = [make_plan(i, args.weeks) for i in range(args.plans)]
+    async with sessions() as db:
+        repository = PlanRepository(db)
+        for plan in plans:
+            await repository.save(plan, "Beginner", f"{args.weeks} weeks")
+
+    reads: list[float] = []
+    writes: list[float] = []
+    failures = {"read": 0, "write": 0}
+    deadline = time.perf_counter() + args.duration
+
+    async def reader() -> None:
+        while time.perf_counter() < deadline:
+            plan = random.choice(plans)
+            started = time.perf_counter()
+            async with sessions() as db:
+                repository = PlanRepository(db)
+                if random.random() < 0.5:
+                    ok = await repository.get_by_id(plan.id) is not None
+                else:
+                    ok = bool(await repository.list_summaries(20))
+            reads.append(time.perf_counter() - started)
+            failures["read"] += not ok
+
+    async def writer() -> None:
+        index = args.plans
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            async with sessions() as db:
+                repository = PlanRepository(db)
+                if random.random() < args.insert_ratio:
+                    index += 1
+                    ok = await repository.save(make_plan(index, args.weeks), "Beginner", "weeks")
+                else:
+                    plan = random.choice(plans)
+                    week = random.choice(plan.weeks)
+                    task = random.choice(week.tasks)
+                    ok = await repository.update_task_status(
+                        plan.id, week.week, task.id, random.random() < 0.5
+                    )
+            writes.append(time.perf_counter() - started)
+            failures["write"] += not ok
+
+    await asyncio.gather(
+        *(reader() for _ in range(args.readers)),
+        *(writer() for _ in range(args.writers))
+    )
+    await engine.dispose()
+
+    return {
+        "profile": profile,
+        "reads_per_sec": len(reads) / args.duration,
+        "writes_per_sec": len(writes) / args.duration,
+        "read_p50": percentile(reads, 50),
+        "read_p99": percentile(reads, 99),
+        "write_p50": percentile(writes, 50),
+        "write_p99": percentile(writes, 99),
+        "failures": failures["read"] + failures["write"],
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    """Run every requested profile on its own database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        return [await run_profile(profile, args, Path(tmp)) for profile in args.profiles]
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=PROFILES)
+    arg_parser.add_argument("--plans", type=int, default=200)
+    arg_parser.add_argument("--weeks", type=int, default=12)
+    arg_parser.add_argument("--readers", type=int, default=16)
+    arg_parser.add_argument("--writers", type=int, default=4)
+    arg_parser.add_argument("--insert-ratio", type=float, default=0.1)
+    arg_parser.add_argument("--duration", type=float, default=5.0)
+    args = arg_parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    print(f"plans={args.plans} weeks={args.weeks} readers={args.readers} "
+          f"writers={args.writers} duration={args.duration}s")
+    print(f"{'profile':>8} {'reads/s':>9} {'writes/s':>9} {'read p50':>9} {'read p99':>9} "
+          f"{'write p50':>10} {'write p99':>10} {'failed':>7}")
+    for r in results:
+        print(f"{r['profile']:>8} {r['reads_per_sec']:>9,.0f} {r['writes_per_sec']:>9,.0f} "
+              f"{r['read_p50']:>8.1f}ms {r['read_p99']:>8.1f}ms "
+              f"{r['write_p50']:>9.1f}ms {r['write_p99']:>9.1f}ms {r['failures']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Cold-start benchmark: app import time and time to first successful request.
+
+Each run starts a fresh interpreter that imports backend.main, runs the
+app's lifespan startup, serves a plan list read and then a generation on
+the fake LLM, all in process through the ASGI interface. Reports medians
+over the runs, with the time to the first read measured from process
+spawn. The planner loads lazily, so the first generation pays for it
+unless --idle-ms gives the background prewarm time to finish first.
+With --baseline, medians that regress past --tolerance are flagged and
+the exit status is 1; --save writes the medians for later runs.
+
+    python -m backend.benchmarks.bench_startup
+    python -m backend.benchmarks.bench_startup --runs 10 --save startup.json
+    python -m backend.benchmarks.bench_startup --idle-ms 3000
+    python -m backend.benchmarks.bench_startup --baseline startup.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+METRICS = ["import_ms", "startup_ms", "first_read_ms", "first_generation_ms", "spawn_to_first_read_ms"]
+
+
+async def child(idle_ms: float) -> dict:
+    """Time the app's cold start from inside a fresh interpreter."""
+    started = time.perf_counter()
+    from backend.main import app
+    import httpx
+    timings = {"import_ms": (time.perf_counter() - started) * 1000}
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup_ms"] = (time.perf_counter() - started) * 1000
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            response = await client.get("/api/plans/summaries")
+            response.raise_for_status()
+            timings["first_read_ms"] = (time.perf_counter() - started) * 1000
+            timings["first_read_at"] = time.time()
+
+            await asyncio.sleep(idle_ms / 1000)
+            started = time.perf_counter()
+            response = await client.post("/api/plans/generate", json={
+                "goal": "Run a 5k without stopping",
+                "current_level": "Beginner",
+                "timeline": "4 weeks",
+            })
+            response.raise_for_status()
+            if '"done"' not in response.text:
+                raise RuntimeError("Generation did not finish")
+            timings["first_generation_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def run_once(args: argparse.Namespace, directory: Path) -> dict:
+    """Spawn one cold process and collect its timings."""
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "dummy"),
+        "LLM_BACKEND": "fake",
+        "DATABASE_URL": f"sqlite:///{directory / f'startup-{time.monotonic_ns()}.db'}",
+        "PLANNER_PREWARM": str(not args.no_prewarm),
+    }
+    spawned_at = time.time()
+    result = subprocess.run(
+        [sys.executable, "-m", "backend.benchmarks.bench_startup", "--child", "--idle-ms", str(args.idle_ms)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["spawn_to_first_read_ms"] = (timings.pop("first_read_at") - spawned_at) * 1000
+    return timings
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=5)
+    arg_parser.add_argument("--no-prewarm", action="store_true", help="set PLANNER_PREWARM=false")
+    arg_parser.add_argument("--idle-ms", type=float, default=0.0, help="wait between the read and the generation")
+    arg_parser.add_argument("--baseline", type=Path, help="JSON medians from an earlier --save")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown over the baseline")
+    arg_parser.add_argument("--save", type=Path, help="write the medians as JSON")
+    arg_parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+
+    if args.child:
+        import logging
+        logging.disable(logging.INFO)
+        print(json.dumps(asyncio.run(child(args.idle_ms))))
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [run_once(args, Path(directory)) for _ in range(args.runs)]
+    medians = {metric: statistics.median(run[metric] for run in runs) for metric in METRICS}
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+    regressions = []
+    print(f"runs={args.runs} prewarm={not args.no_prewarm} idle={args.idle_ms:.0f}ms")
+    print(f"{'metric':>24} {'median':>10} {'baseline':>10}")
+    for metric in METRICS:
+        line = f"{metric:>24} {medians[metric]:>8.1f}ms"
+        if metric in baseline:
+            line += f" {baseline[metric]:>8.1f}ms"
+            if medians[metric] > baseline[metric] * (1 + args.tolerance):
+                regressions.append(metric)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        args.save.write_text(json.dumps(medians, indent=2) + "\n")
+    if regressions:
+        print(f"regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Micro-benchmark for StreamingJSONParser.
+
+Replays recorded NDJSON plan streams at realistic token chunk sizes and
+reports events/sec and peak allocated memory per replay.
+
+    python -m backend.benchmarks.bench_streaming_parser
+    python -m backend.benchmarks.bench_streaming_parser --chunk-sizes 4 16 --runs 50
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from backend.core.streaming_parser import StreamingJSONParser
+
+RECORDINGS_DIR = Path(__file__).parent / "recordings"
+
+# LLM token deltas are typically 2-6 characters; larger sizes model
+# providers that coalesce tokens before flushing.
+DEFAULT_CHUNK_SIZES = [3, 4, 8, 32, 256]
+
+
+def load_recording(name: str) -> str:
+    """Load a recorded NDJSON stream by file name."""
+    return (RECORDINGS_DIR / name).read_text()
+
+
+def chunk_stream(text: str, chunk_size: int) -> list[str]:
+    """Split a recorded stream into fixed-size token deltas."""
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def replay(chunks: list[str]) -> int:
+    """Feed chunks through a fresh parser and return the event count."""
+    parser = StreamingJSONParser()
+    count = 0
+    for chunk in chunks:
+        count += len(parser.process_chunk(chunk))
+    count += len(parser.flush())
+    return count
+
+
+def measure(chunks: list[str], runs: int) -> dict:
+    """Time repeated replays and measure allocations of a single replay."""
+    events = replay(chunks)  # warm-up
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        replay(chunks)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    replay(chunks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "events": events,
+        "chunks": len(chunks),
+        "events_per_sec": events * runs / elapsed,
+        "us_per_chunk": elapsed / (runs * len(chunks)) * 1e6,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--recording", default="plan_16_weeks.ndjson")
+    arg_parser.add_argument("--chunk-sizes", type=int, nargs="+", default=DEFAULT_CHUNK_SIZES)
+    arg_parser.add_argument("--runs", type=int, default=200)
+    arg_parser.add_argument(
+        "--min-events-per-sec", type=float, default=0.0,
+        help="Exit non-zero if any chunk size falls below this throughput"
+    )
+    args = arg_parser.parse_args(argv)
+
+    text = load_recording(args.recording)
+    print(f"recording={args.recording} bytes={len(text)} runs={args.runs}")
+    print(f"{'chunk':>6} {'chunks':>7} {'events':>7} {'events/s':>12} "
+          f"{'us/chunk':>9} {'peak KiB':>9}")
+
+    failed = False
+    for size in args.chunk_sizes:
+        result = measure(chunk_stream(text, size), args.runs)
+        print(f"{size:>6} {result['chunks']:>7} {result['events']:>7} "
+              f"{result['events_per_sec']:>12,.0f} {result['us_per_chunk']:>9.2f} "
+              f"{result['peak_kib']:>9.1f}")
+        if result["events_per_sec"] < args.min_events_per_sec:
+            failed = True
+
+    if failed:
+        print(f"REGRESSION: throughput below {args.min_events_per_sec:,.0f} events/s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Write throughput with and without write-behind commit batching.
+
+Seeds a fresh database per mode, then runs concurrent writers (mostly task
+toggles, some new plans) for a fixed duration. "direct" commits every
+write on its own through PlanRepository; "write_behind" queues them on a
+WriteBehindWriter, and every writer still waits until its write is
+committed.
+
+    python -m backend.benchmarks.bench_write_behind
+    python -m backend.benchmarks.bench_write_behind --writers 64 --profile default
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.benchmarks.bench_sqlite_profiles import PROFILES, make_plan, percentile
+from backend.config import get_settings
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.db.session import apply_storage_profile, engine_options, get_async_database_url
+from backend.db.write_behind import WriteBehindWriter
+
+MODES = ["direct", "write_behind"]
+
+
+async def run_mode(mode: str, args: argparse.Namespace, directory: Path) -> dict:
+    """Seed a database and run the write workload in one mode."""
+    config = get_settings().model_copy(update={"SQLITE_PROFILE": args.profile})
+    url = f"sqlite:///{directory / f'{mode}.db'}"
+    async_url = get_async_database_url(url)
+
+    sync_engine = create_engine(url, **engine_options(url, config))
+    apply_storage_profile(sync_engine, config)
+    SQLModel.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    engine = create_async_engine(async_url, **engine_options(async_url, config))
+    apply_storage_profile(engine.sync_engine, config)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    plans = [make_plan(i, args.weeks) for i in range(args.plans)]
+    async with sessions() as db:
+        repository = PlanRepository(db)
+        for plan in plans:
+            await repository.save(plan, "Beginner", f"{args.weeks} weeks")
+
+    writer = WriteBehindWriter(sessions, max_pending=args.writers * 4, batch_size=args.batch_size)
+    latencies: list[float] = []
+    failures = 0
+    index = args.plans
+    deadline = time.perf_counter() + args.duration
+
+    async def write_direct(plan, week, task, insert) -> bool:
+        async with sessions() as db:
+            repository = PlanRepository(db)
+            if insert:
+                return await repository.save(plan, "Beginner", "weeks")
+            return await repository.update_task_status(plan.id, week.week, task.id, True)
+
+    async def write_behind(plan, week, task, insert) -> bool:
+        if insert:
+            return await (await writer.save_plan(plan, "Beginner", "weeks"))
+        return await writer.update_task_status(plan.id, week.week, task.id, True)
+
+    write = write_direct if mode == "direct" else write_behind
+
+    async def worker() -> None:
+        nonlocal failures, index
+        while time.perf_counter() < deadline:
+            insert = random.random() < args.insert_ratio
+            if insert:
+                index += 1
+                plan = make_plan(index, args.weeks)
+            else:
+                plan = random.choice(plans)
+            week = random.choice(plan.weeks)
+            task = random.choice(week.tasks)
+
+            started = time.perf_counter()
+            ok = await write(plan, week, task, insert)
+            latencies.append(time.perf_counter() - started)
+            failures += not ok
+
+    await asyncio.gather(*(worker() for _ in range(args.writers)))
+    await writer.close()
+    await engine.dispose()
+
+    return {
+        "mode": mode,
+        "writes_per_sec": len(latencies) / args.duration,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "writes_per_commit": writer.writes / writer.batches if writer.batches else 1.0,
+        "failures": failures,
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    """Run every mode on its own database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        return [await run_mode(mode, args, Path(tmp)) for mode in MODES]
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--profile", choices=PROFILES, default="tuned")
+    arg_parser.add_argument("--plans", type=int, default=200)
+    arg_parser.add_argument("--weeks", type=int, default=12)
+    arg_parser.add_argument("--writers", type=int, default=32)
+    arg_parser.add_argument("--insert-ratio", type=float, default=0.05)
+    arg_parser.add_argument("--batch-size", type=int, default=200)
+    arg_parser.add_argument("--duration", type=float, default=5.0)
+    args = arg_parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    print(f"profile={args.profile} plans={args.plans} writers={args.writers} "
+          f"insert_ratio={args.insert_ratio} duration={args.duration}s")
+    print(f"{'mode':>12} {'writes/s':>9} {'p50':>9} {'p99':>9} {'per commit':>11} {'failed':>7}")
+    for r in results:
+        print(f"{r['mode']:>12} {r['writes_per_sec']:>9,.0f} {r['p50']:>7.1f}ms {r['p99']:>7.1f}ms "
+              f"{r['writes_per_commit']:>11.1f} {r['failures']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
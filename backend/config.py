@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -18,14 +19,125 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-5-mini"
     OPENAI_TEMPERATURE: float = 0.0
 
+    # LLM backend: "openai", or "fake" for a local deterministic stand-in
+    # that streams canned plans, for load tests without API calls
+    LLM_BACKEND: Literal["openai", "fake"] = "openai"
+    FAKE_LLM_CHUNK_SIZE: int = 16  # characters per streamed chunk
+    FAKE_LLM_TOKEN_DELAY_MS: float = 0.0
+    FAKE_LLM_ERROR_RATE: float = 0.0  # fraction of streams that fail midway
+    FAKE_LLM_SEED: int = 0
+
+    # Event format the LLM is prompted to write: "json" objects, or "compact"
+    # positional arrays with one-letter tags that spend fewer output tokens.
+    # Both are parsed into the same events and SSE stream.
+    LLM_PROTOCOL: Literal["json", "compact"] = "json"
+
+    # How the LLM returns a plan: "ndjson" event lines in LLM_PROTOCOL, or
+    # "structured", one tool call whose arguments are parsed as they stream
+    # and survive truncation. Requests can choose with output_mode.
+    LLM_OUTPUT_MODE: Literal["ndjson", "structured"] = "ndjson"
+
+    # Load the planner and LLM stack in the background on startup instead
+    # of on the first generation
+    PLANNER_PREWARM: bool = True
+
+    # Shared keep-alive HTTP connection pool for LLM requests
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    LLM_TIMEOUT_SECONDS: float = 120.0
+
     DATABASE_URL: str = f"sqlite:///database.db"
 
+    # SQLite storage profile: "tuned" applies the pragmas below to every new
+    # connection, "default" keeps SQLite's stock rollback journal settings.
+    SQLITE_PROFILE: Literal["default", "tuned"] = "tuned"
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64 * 1024  # negative values are KiB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Connection pool (file databases only)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+
     CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://localhost:8000"]
 
     # Planning
     MAX_PLAN_WEEKS: int = 16
     DEFAULT_PLAN_WEEKS: int = 12
 
+    # Parallel generation: plans of at least PARALLEL_MIN_WEEKS weeks are
+    # outlined first, then their week ranges are generated concurrently,
+    # each in its own LLM stream bounded by LLM_MAX_STREAMS
+    PARALLEL_GENERATION_ENABLED: bool = False
+    PARALLEL_MIN_WEEKS: int = 8
+    PARALLEL_WEEKS_PER_RANGE: int = 4
+
+    # Generation cache: replays identical requests without calling the LLM
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    GENERATION_CACHE_MEMORY_ENTRIES: int = 256
+    GENERATION_CACHE_MAX_ROWS: int = 10_000
+    # Requests carrying this header skip the lookup and refresh the entry
+    GENERATION_CACHE_BYPASS_HEADER: str = "X-Plan-Cache-Bypass"
+
+    # Single-flight: identical concurrent generations share one LLM stream
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_QUEUE_SIZE: int = 64
+
+    # Admission control: at most this many LLM streams run at once, the rest
+    # wait in a per-user fair queue and overflow is rejected with 429
+    GENERATION_MAX_CONCURRENCY: int = 8
+    GENERATION_MAX_QUEUE: int = 32
+    GENERATION_RETRY_AFTER_SECONDS: int = 15
+    # Concurrent LLM streams across all generations. A parallel generation
+    # opens 1 + ceil(weeks / PARALLEL_WEEKS_PER_RANGE) streams under one
+    # scheduler slot, so its extra streams wait here for provider capacity
+    LLM_MAX_STREAMS: int = 8
+
+    # Generations run detached from the request; finished runs stay in
+    # memory this long so dropped clients can resume with Last-Event-ID
+    GENERATION_RUN_RETENTION_SECONDS: float = 300.0
+
+    # Write-behind persistence: plan saves and task updates are queued and
+    # committed in batches by a background task
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_MAX_PENDING: int = 1000
+    WRITE_BEHIND_BATCH_SIZE: int = 200
+
+    # Encoding of newly written plan_data snapshots; "zstd" and "msgpack"
+    # need their modules installed, and the app refuses to start without
+    # them. Existing rows keep their own format
+    # until re-encoded with `python -m backend.db.migrations --reencode-plan-data`
+    PLAN_DATA_CODEC: Literal["json", "zlib", "zstd", "msgpack"] = "zlib"
+
+    # Listing
+    PLANS_PAGE_SIZE: int = 20
+    PLANS_MAX_PAGE_SIZE: int = 100
+
+    # NDJSON export reads plans this many at a time from a server-side
+    # cursor; bulk import inserts and commits them in batches of this size
+    EXPORT_BATCH_SIZE: int = 500
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+
+    # Search ranks only the newest matches, bounding the cost of common
+    # terms; pages are flagged truncated when the limit is reached
+    SEARCH_MAX_CANDIDATES: int = 1000
+
+    # Largest number of task changes accepted by one batch update
+    TASK_BATCH_MAX_UPDATES: int = 500
+
+    # Read-through cache of loaded plans and their response bodies, bounded
+    # by their estimated memory (the body plus the parsed plan, about eight
+    # times the body); the TTL bounds staleness across processes
+    PLAN_CACHE_ENABLED: bool = True
+    PLAN_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PLAN_CACHE_TTL_SECONDS: int = 300
+
     class Config:
         env_file = ".env"
 
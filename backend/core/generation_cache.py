@@ -0,0 +1,92 @@
+"""Content-addressed cache of generated plan event sequences."""
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from backend.config import get_settings
+from backend.db.repositories.generation_cache_repository import GenerationCacheRepository
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class GenerationCache:
+    """Two-tier cache: an in-process LRU in front of a SQLite table.
+
+    Entries hold the raw plan events of a completed generation. They are
+    replayed through a fresh PlanBuilder, so every hit yields a new plan id
+    and new task ids.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, max_rows: int):
+        """Initialize"""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+
+    async def get(
+            self,
+            key: str,
+            repository: GenerationCacheRepository
+    ) -> Optional[list[dict]]:
+        """Look up events in memory first, then in the database."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, events = entry
+            if time.monotonic() - stored_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                logger.info(f"Generation cache memory hit {key[:12]}")
+                return events
+            del self._entries[key]
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        row = await repository.get(key, now - timedelta(seconds=self.ttl_seconds))
+        if row is None:
+            return None
+
+        events, age = row
+        logger.info(f"Generation cache database hit {key[:12]}")
+        # Keep the row's deadline rather than starting a new TTL
+        self._remember(key, events, time.monotonic() - age)
+        return events
+
+    async def put(
+            self,
+            key: str,
+            events: list[dict],
+            repository: GenerationCacheRepository
+    ) -> None:
+        """Store the events of a completed generation in both tiers."""
+        self._remember(key, events)
+        await repository.put(key, events, self.max_rows)
+
+    def _remember(self, key: str, events: list[dict], stored_at: Optional[float] = None) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entries."""
+        self._entries[key] = (time.monotonic() if stored_at is None else stored_at, events)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        self._entries.clear()
+
+
+async def replay_events(events: list[dict]) -> AsyncIterator[dict]:
+    """Stream cached events as if they came from the LLM."""
+    for event in events:
+        yield event
+
+
+@lru_cache()
+def get_generation_cache() -> GenerationCache:
+    """Get the process-wide generation cache."""
+    return GenerationCache(
+        max_entries=settings.GENERATION_CACHE_MEMORY_ENTRIES,
+        ttl_seconds=settings.GENERATION_CACHE_TTL_SECONDS,
+        max_rows=settings.GENERATION_CACHE_MAX_ROWS
+    )
@@ -0,0 +1,110 @@
+"""Detached generation runs that clients can follow and resume."""
+import asyncio
+import logging
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from backend.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class GenerationRun:
+    """One generation running independently of the request that started it.
+
+    Every SSE event the generation produces is kept in order, so a client
+    that reconnects can replay what it missed and then keep following.
+    """
+
+    def __init__(self, plan_id: str):
+        """Initialize"""
+        self.plan_id = plan_id
+        # (sequence number, SSE text); events without an id have no number
+        self.events: list[tuple[Optional[int], str]] = []
+        self.finished = False
+        self.task: Optional[asyncio.Task] = None
+        self._update = asyncio.Event()
+
+    def append(self, seq: Optional[int], sse_event: str) -> None:
+        """Add an event and wake every follower."""
+        self.events.append((seq, sse_event))
+        self._wake()
+
+    def finish(self) -> None:
+        """Mark the run as complete and wake every follower."""
+        self.finished = True
+        self._wake()
+
+    def _wake(self) -> None:
+        self._update.set()
+        self._update = asyncio.Event()
+
+    async def follow(self, after: int = 0) -> AsyncIterator[str]:
+        """Yield the events numbered after `after`, then new ones as they come.
+
+        Unnumbered events (queue positions) are only replayed to followers
+        that start from the beginning.
+        """
+        position = 0
+        while True:
+            # Take the wake-up event before reading so no append is missed
+            update = self._update
+            while position < len(self.events):
+                seq, sse_event = self.events[position]
+                position += 1
+                if (seq is None and after == 0) or (seq is not None and seq > after):
+                    yield sse_event
+
+            if self.finished:
+                return
+            await update.wait()
+
+
+class GenerationRuns:
+    """Registry of in-progress and recently finished generation runs."""
+
+    def __init__(self, retention_seconds: float):
+        """Initialize"""
+        self.retention_seconds = retention_seconds
+        self._runs: dict[str, GenerationRun] = {}
+
+    def start(self, plan_id: str, events: AsyncIterator[tuple[Optional[int], str]]) -> GenerationRun:
+        """Run an event stream in the background under plan_id."""
+        run = GenerationRun(plan_id)
+        self._runs[plan_id] = run
+        run.task = asyncio.create_task(self._drive(run, events))
+        return run
+
+    def get(self, plan_id: str) -> Optional[GenerationRun]:
+        """Return the run for plan_id if it is running or recently finished."""
+        return self._runs.get(plan_id)
+
+    async def _drive(self, run: GenerationRun, events: AsyncIterator[tuple[Optional[int], str]]) -> None:
+        """Pump the stream into the run, keeping it around for late resumes."""
+        try:
+            async for seq, sse_event in events:
+                run.append(seq, sse_event)
+        except Exception:
+            logger.exception(f"Generation run {run.plan_id} failed")
+        finally:
+            run.finish()
+            asyncio.get_running_loop().call_later(self.retention_seconds, self._forget, run)
+
+    def _forget(self, run: GenerationRun) -> None:
+        if self._runs.get(run.plan_id) is run:
+            del self._runs[run.plan_id]
+
+    async def cancel_all(self) -> None:
+        """Cancel every unfinished run, e.g. on shutdown."""
+        tasks = [run.task for run in self._runs.values() if not run.finished and run.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runs.clear()
+
+
+@lru_cache()
+def get_generation_runs() -> GenerationRuns:
+    """Get the process-wide generation run registry."""
+    return GenerationRuns(retention_seconds=settings.GENERATION_RUN_RETENTION_SECONDS)
@@ -0,0 +1,218 @@
+"""LLM backends for plan generation."""
+import asyncio
+import json
+import logging
+import random
+import re
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Sequence
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from pydantic import PrivateAttr
+
+from backend.config import get_settings
+from backend.core.streaming_parser import compact_event
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class FakeLLMError(RuntimeError):
+    """Error injected by the fake backend."""
+
+
+class FakePlanChatModel(BaseChatModel):
+    """Deterministic offline stand-in for the plan LLM.
+
+    Answers the planner prompts with canned NDJSON plans for the requested
+    weeks, split into chunks of chunk_size characters with token_delay
+    seconds between them. With error_rate > 0 that fraction of streams
+    fails halfway through. When bound to a tool it streams the plan as
+    the arguments of a call to that tool instead.
+    """
+
+    chunk_size: int = 16
+    token_delay: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    _random: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        """Seed the error injection."""
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-plan"
+
+    def bind_tools(
+            self,
+            tools: Sequence[dict[str, Any] | type | Callable],
+            *,
+            tool_choice: Optional[str] = None,
+            **kwargs: Any
+    ) -> Runnable:
+        return self.bind(tools=tools, tool_choice=tool_choice, **kwargs)
+
+    def _generate(
+            self,
+            messages: list[BaseMessage],
+            stop: Optional[list[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any
+    ) -> ChatResult:
+        text = "".join(chunk.message.content for chunk in self._stream(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _message_chunks(self, messages: list[BaseMessage], tools: Optional[list]) -> Iterator[AIMessageChunk]:
+        """Wrap the canned response chunks as content or tool call arguments."""
+        if not tools:
+            for content in self._chunks(messages):
+                yield AIMessageChunk(content=content)
+            return
+
+        name = tools[0]["function"]["name"]
+        for n, content in enumerate(self._chunks(messages, structured=True)):
+            yield AIMessageChunk(content="", tool_call_chunks=[tool_call_chunk(
+                name=name if n == 0 else None,
+                args=content,
+                id="call_fake" if n == 0 else None,
+                index=0
+            )])
+
+    def _stream(
+            self,
+            messages: list[BaseMessage],
+            stop: Optional[list[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        for message in self._message_chunks(messages, kwargs.get("tools")):
+            yield ChatGenerationChunk(message=message)
+
+    async def _astream(
+            self,
+            messages: list[BaseMessage],
+            stop: Optional[list[str]] = None,
+            run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+            **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for message in self._message_chunks(messages, kwargs.get("tools")):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield ChatGenerationChunk(message=message)
+
+    def _chunks(self, messages: list[BaseMessage], structured: bool = False) -> Iterator[str]:
+        """Split the canned response into chunks, failing if injected."""
+        text = render_plan(messages, structured)
+        fail_at = len(text) // 2 if self._random.random() < self.error_rate else None
+
+        for start in range(0, len(text), self.chunk_size):
+            if fail_at is not None and start >= fail_at:
+                raise FakeLLMError("Injected fake LLM failure")
+            yield text[start:start + self.chunk_size]
+
+
+def render_plan(messages: list[BaseMessage], structured: bool = False) -> str:
+    """Render the NDJSON answer to a planner prompt.
+
+    The prompt kind, week numbers and protocol are read back from the
+    prompt text, so full plans, outlines and week ranges all get matching
+    answers, as compact arrays when the prompt asks for them. structured
+    renders the plan as one JSON document of submit_plan tool arguments.
+    """
+    prompt = "\n".join(str(message.content) for message in messages)
+    compact = "newline-delimited JSON arrays" in prompt
+    goal_match = re.search(r"Goal: (.*)", prompt)
+    goal = goal_match.group(1).strip() if goal_match else "your goal"
+    lines: list[dict] = []
+
+    outline = re.search(r"Outline exactly (\d+) weeks", prompt)
+    week_range = re.search(r"Only write weeks (\d+) to (\d+)", prompt)
+    full = re.search(r"Create exactly (\d+) weeks", prompt)
+
+    if outline:
+        lines.append(_overview(goal))
+        lines.extend(
+            {"type": "outline", "week": week, "focus": _focus(week)}
+            for week in range(1, int(outline.group(1)) + 1)
+        )
+        return _ndjson(lines, compact)
+
+    if week_range:
+        weeks = range(int(week_range.group(1)), int(week_range.group(2)) + 1)
+    else:
+        lines.append(_overview(goal))
+        weeks = range(1, int(full.group(1)) + 1 if full else 2)
+
+    for week in weeks:
+        lines.append({"type": "week_start", "week": week, "focus": _focus(week)})
+        lines.extend(
+            {
+                "type": "task",
+                "week": week,
+                "task": {
+                    "title": f"Session {n} of week {week}",
+                    "description": f"Work towards {goal} at {20 + 5 * week} minutes of steady effort.",
+                    "duration": f"{20 + 5 * week} mins"
+                }
+            }
+            for n in range(1, 5)
+        )
+    lines.append({"type": "done"})
+    if structured:
+        return _document(lines)
+    return _ndjson(lines, compact)
+
+
+def _overview(goal: str) -> dict:
+    return {"type": "overview", "value": f"A progressive plan to {goal}, building volume week by week."}
+
+
+def _focus(week: int) -> str:
+    return f"Week {week}: build consistency and add load gradually"
+
+
+def _ndjson(lines: list[dict], compact: bool = False) -> str:
+    if compact:
+        return "".join(json.dumps(compact_event(line), separators=(",", ":")) + "\n" for line in lines)
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+
+def _document(lines: list[dict]) -> str:
+    """Arrange plan events as the arguments of a submit_plan call."""
+    document = {"overview": "", "weeks": []}
+    for line in lines:
+        if line["type"] == "overview":
+            document["overview"] = line["value"]
+        elif line["type"] == "week_start":
+            document["weeks"].append({"week": line["week"], "focus": line["focus"], "tasks": []})
+        elif line["type"] == "task":
+            document["weeks"][-1]["tasks"].append(line["task"])
+    return json.dumps(document)
+
+
+def create_llm(http_client: Optional[httpx.AsyncClient] = None) -> BaseChatModel:
+    """Create the chat model selected by LLM_BACKEND."""
+    if settings.LLM_BACKEND == "fake":
+        logger.info("Using the fake LLM backend")
+        return FakePlanChatModel(
+            chunk_size=settings.FAKE_LLM_CHUNK_SIZE,
+            token_delay=settings.FAKE_LLM_TOKEN_DELAY_MS / 1000,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            seed=settings.FAKE_LLM_SEED
+        )
+
+    return ChatOpenAI(
+        model=settings.OPENAI_MODEL,
+        temperature=settings.OPENAI_TEMPERATURE,
+        streaming=True,
+        http_async_client=http_client
+    )
@@ -0,0 +1,260 @@
+"""In-process metrics with Prometheus text exposition.
+
+Metrics are updated and rendered from the event loop thread, so
+observations are plain attribute updates with no locking. Label sets are
+resolved once into series objects; hot paths should keep a reference to
+their series.
+"""
+import functools
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable
+
+# Seconds; covers sub-millisecond queries up to multi-minute generations
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+# Seconds; sized for per-chunk parsing work
+PARSE_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 1e-2)
+
+REGISTRY: list["_Metric"] = []
+
+
+class _Metric(ABC):
+    """Base class holding a metric's name, help text and labelled series."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        """Initialize"""
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._series: dict[tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+        if not label_names:
+            self.labels()
+
+    def labels(self, *values: str):
+        """Return the series for a set of label values, creating it once."""
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = self._new_series()
+        return series
+
+    @abstractmethod
+    def _new_series(self):
+        """Return a new, empty series."""
+
+    def _label_text(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        # A snapshot, since modules imported off the loop (the planner
+        # prewarm) can resolve new label sets while this renders
+        for values, series in list(self._series.items()):
+            lines.extend(self._render_series(values, series))
+        return lines
+
+    @abstractmethod
+    def _render_series(self, values: tuple[str, ...], series) -> list[str]:
+        """Return the exposition lines of one series."""
+
+
+class _CounterSeries:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_series(self) -> _CounterSeries:
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled series."""
+        self.labels().inc(amount)
+
+    def _render_series(self, values, series) -> list[str]:
+        return [f"{self.name}{self._label_text(values)} {_format(series.value)}"]
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            label_names: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        """Initialize"""
+        self.buckets = buckets
+        super().__init__(name, documentation, label_names)
+
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record a value in the unlabelled series."""
+        self.labels().observe(value)
+
+    def _render_series(self, values, series) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), series.counts):
+            cumulative += count
+            le = "+Inf" if bound == math.inf else _format(bound)
+            labels = self._label_text(values, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_format(series.sum)}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {series.count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A value read from a callback when metrics are collected."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        """Initialize"""
+        super().__init__(name, documentation)
+        self.read = read
+
+    def _new_series(self) -> None:
+        return None
+
+    def _render_series(self, values, series) -> list[str]:
+        return [f"{self.name} {_format(self.read())}"]
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_metrics() -> str:
+    """Render every registered metric in Prometheus text format."""
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def timed(histogram: Histogram, *label_values: str) -> Callable:
+    """Decorate a coroutine function to observe its duration."""
+    def decorator(func: Callable) -> Callable:
+        series = histogram.labels(*label_values)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+# Generation
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "plan_llm_time_to_first_token_seconds",
+    "Time from opening an LLM stream to its first non-empty chunk."
+)
+GENERATION_TIME_TO_FIRST_EVENT = Histogram(
+    "plan_generation_time_to_first_event_seconds",
+    "Time from the start of plan building to the first plan event."
+)
+GENERATION_DURATION = Histogram(
+    "plan_generation_duration_seconds",
+    "Total time to build a plan from its event stream."
+)
+GENERATION_QUEUE_WAIT = Histogram(
+    "plan_generation_queue_wait_seconds",
+    "Time a generation waited for a scheduler slot."
+)
+GENERATIONS = Counter(
+    "plan_generations_total",
+    "Generations by event source (llm, shared or cache).",
+    ("source",)
+)
+GENERATIONS_REJECTED = Counter(
+    "plan_generations_rejected_total",
+    "Generations rejected with 429 because the scheduler queue was full."
+)
+PLAN_EVENTS = Counter(
+    "plan_events_total",
+    "Plan events applied to plans by type.",
+    ("type",)
+)
+
+# Parsing
+PARSE_CHUNK_DURATION = Histogram(
+    "plan_parser_chunk_seconds",
+    "Time StreamingJSONParser spends on one chunk.",
+    buckets=PARSE_BUCKETS
+)
+UNPARSEABLE_LINES = Counter(
+    "plan_parser_unparseable_lines_total",
+    "Lines from the LLM that were not valid JSON."
+)
+
+STRUCTURED_PARSE_FAILURES = Counter(
+    "plan_parser_structured_failures_total",
+    "Structured plan outputs that were invalid or ended early, by outcome "
+    "(recovered from their completed tasks, or lost).",
+    ("outcome",)
+)
+
+# Persistence
+REPOSITORY_LATENCY = Histogram(
+    "plan_repository_operation_seconds",
+    "PlanRepository operation latency.",
+    ("operation",)
+)
+PLAN_CACHE_LOOKUPS = Counter(
+    "plan_cache_lookups_total",
+    "Plan cache lookups by result.",
+    ("result",)
+)
+PLAN_LOADS = Counter(
+    "plan_loads_total",
+    "Plans loaded from the database by read path (passthrough or validated).",
+    ("path",)
+)
@@ -97,6 +97,13 @@ class PlanBuilder:
             logger.error(f"Plan validation failed: {e}")
             return None
 
+    def snapshot(self) -> dict:
+        """Serialize the partial plan for checkpointing."""
+        return {
+            "overview": self.overview,
+            "weeks": [week.model_dump() for week in self.weeks.values()],
+        }
+
     def get_stats(self) -> dict:
         """Get current building statistics."""
         total_tasks = sum(len(week.tasks) for week in self.weeks.values())
@@ -107,3 +114,26 @@ class PlanBuilder:
             "total_tasks": total_tasks,
             "complete": self.overview is not None and len(self.weeks) > 0
         }
+
+
+def plan_events(overview: Optional[str], weeks: list[WeeklyPlan]) -> list[dict]:
+    """Rebuild the plan events that produce the given overview and weeks.
+
+    Events come in the order a generation streams them: the overview, then
+    each week's start followed by its tasks.
+    """
+    events = []
+    if overview:
+        events.append({"type": "overview", "value": overview})
+
+    for week in weeks:
+        events.append({"type": "week_start", "week": week.week, "focus": week.focus})
+        events.extend(
+            {
+                "type": "task",
+                "week": week.week,
+                "task": task.model_dump(include={"title", "description", "duration"})
+            }
+            for task in week.tasks
+        )
+    return events
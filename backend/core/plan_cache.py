@@ -0,0 +1,150 @@
+"""In-process read-through cache of loaded plans."""
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from backend.config import get_settings
+from backend.core.metrics import PLAN_CACHE_LOOKUPS, Gauge
+from backend.schemas.plan import GoalPlan, PlanResponse
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_HITS = PLAN_CACHE_LOOKUPS.labels("hit")
+_MISSES = PLAN_CACHE_LOOKUPS.labels("miss")
+
+# A parsed GoalPlan holds about seven times the memory of its JSON body
+# (measured on 4 to 52 week plans). Entries are charged for both, since
+# any entry may hold its parsed plan by the time it is evicted.
+PARSED_PLAN_SIZE_FACTOR = 7
+
+
+@dataclass
+class CachedPlan:
+    """A plan's ETag and serialized PlanResponse body.
+
+    Entries built from pre-serialized bytes parse the plan only when
+    `plan` is first used.
+    """
+
+    etag: Optional[str]
+    body: bytes
+    _plan: Optional[GoalPlan] = None
+
+    @property
+    def size(self) -> int:
+        """Estimated memory of the body and the parsed plan."""
+        return len(self.body) * (1 + PARSED_PLAN_SIZE_FACTOR)
+
+    @property
+    def plan(self) -> GoalPlan:
+        if self._plan is None:
+            self._plan = PlanResponse.model_validate_json(self.body).plan
+        return self._plan
+
+    @classmethod
+    def build(cls, plan: GoalPlan, etag: Optional[str]) -> "CachedPlan":
+        """Serialize a plan into an entry."""
+        return cls(etag, PlanResponse(plan=plan).model_dump_json().encode(), plan)
+
+
+class PlanCache:
+    """LRU of plans by id, bounded by estimated memory and entry age.
+
+    Hits serve both the parsed plan and its response bytes, so neither
+    SQLite nor pydantic is involved. Writers invalidate entries after they
+    commit; a load that started before an invalidation is not stored, so a
+    slow reader cannot put back a plan that was just changed. The TTL
+    bounds staleness for writes made by other processes.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        """Initialize"""
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, tuple[float, CachedPlan]] = OrderedDict()
+
+    def get(self, plan_id: str) -> Optional[CachedPlan]:
+        """Return a fresh entry and mark it recently used."""
+        entry = self._entries.get(plan_id)
+        if entry is not None:
+            stored_at, cached = entry
+            if time.monotonic() - stored_at < self.ttl_seconds:
+                self._entries.move_to_end(plan_id)
+                self.hits += 1
+                _HITS.inc()
+                return cached
+            self._remove(plan_id)
+
+        self.misses += 1
+        _MISSES.inc()
+        return None
+
+    def token(self) -> int:
+        """Return a token to pass to put() by a load that is about to start."""
+        return self.invalidations
+
+    def put(self, plan_id: str, cached: CachedPlan, token: int) -> None:
+        """Store an entry unless anything was invalidated since `token`."""
+        if token != self.invalidations or cached.size > self.max_bytes:
+            return
+
+        self._remove(plan_id)
+        self._entries[plan_id] = (time.monotonic(), cached)
+        self.size += cached.size
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, *plan_ids: str) -> None:
+        """Drop entries for plans that were just written."""
+        self.invalidations += 1
+        for plan_id in plan_ids:
+            self._remove(plan_id)
+
+    def stats(self) -> dict:
+        """Return the cache counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self.size = 0
+
+    def _remove(self, plan_id: str) -> None:
+        entry = self._entries.pop(plan_id, None)
+        if entry is not None:
+            self.size -= entry[1].size
+
+
+@lru_cache()
+def get_plan_cache() -> PlanCache:
+    """Get the process-wide plan cache."""
+    return PlanCache(
+        max_bytes=settings.PLAN_CACHE_MAX_BYTES,
+        ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS
+    )
+
+
+Gauge(
+    "plan_cache_bytes",
+    "Estimated memory held by the plans in the plan cache.",
+    lambda: get_plan_cache().size
+)
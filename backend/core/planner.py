@@ -1,32 +1,178 @@
 """Health planner AI core logic."""
+import asyncio
+import hashlib
 import json
 import logging
+import textwrap
+import time
 import uuid
 from datetime import datetime
-from typing import AsyncIterator, Optional
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
+import httpx
+from langchain_core.messages import AIMessageChunk
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import Runnable
 
 from backend.config import get_settings
+from backend.core.llm import create_llm
+from backend.core.metrics import (
+    GENERATION_DURATION,
+    GENERATION_TIME_TO_FIRST_EVENT,
+    LLM_TIME_TO_FIRST_TOKEN,
+    PARSE_CHUNK_DURATION,
+    PLAN_EVENTS,
+)
 from backend.core.plan_builder import PlanBuilder
+from backend.core.scheduler import get_llm_stream_slots
 from backend.core.streaming_parser import StreamingJSONParser
+from backend.core.structured_parser import StructuredPlanParser
 from backend.schemas.plan import GoalPlan
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+_RANGE_END = object()
+
+_EVENT_COUNTERS = {
+    event_type: PLAN_EVENTS.labels(event_type)
+    for event_type in ("overview", "week_start", "task", "done", "error")
+}
+_OTHER_EVENTS = PLAN_EVENTS.labels("other")
+
+
+# Example line of each event type per LLM_PROTOCOL; WEEK stands for the
+# week number. Compact events are the positional arrays expanded by
+# StreamingJSONParser and cost far fewer output tokens than keyed objects.
+EVENT_EXAMPLES = {
+    "json": {
+        "overview": '{"type":"overview","value":"2-3 sentence overview"}',
+        "outline": '{"type":"outline","week":WEEK,"focus":"Weekly focus"}',
+        "week_start": '{"type":"week_start","week":WEEK,"focus":"Weekly focus"}',
+        "task": (
+            '{\n  "type":"task",\n  "week":WEEK,\n  "task": {\n    "title":"Task title",\n'
+            '    "description":"Clear instructions",\n    "duration":"30 mins"\n  }\n}'
+        ),
+        "done": '{"type":"done"}',
+    },
+    "compact": {
+        "overview": '["o","2-3 sentence overview"]',
+        "outline": '["l",WEEK,"Weekly focus"]',
+        "week_start": '["w",WEEK,"Weekly focus"]',
+        "task": '["t",WEEK,"Task title","Clear instructions","30 mins"]',
+        "done": '["d"]',
+    },
+}
+
+
+# Tool the LLM calls with the whole plan in the structured output mode; its
+# arguments stream as one JSON document read by StructuredPlanParser
+_TASK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "duration": {"type": "string"},
+    },
+    "required": ["title", "description", "duration"],
+    "additionalProperties": False,
+}
+PLAN_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "submit_plan",
+        "description": "Submit the complete week-by-week plan.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "overview": {"type": "string", "description": "2-3 sentence overview"},
+                "weeks": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "week": {"type": "integer"},
+                            "focus": {"type": "string"},
+                            "tasks": {"type": "array", "items": _TASK_SCHEMA},
+                        },
+                        "required": ["week", "focus", "tasks"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["overview", "weeks"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def output_format(protocol: str, week: str, events: list[tuple[str, str]]) -> str:
+    """Return the output format section of a system prompt as template text.
+
+    events are (event type, heading) pairs, numbered in order; week is
+    shown as the week number of the examples and may be a template variable.
+    """
+    unit = "object" if protocol == "json" else "array"
+    lines = [
+        f"You MUST stream your response as newline-delimited JSON {unit}s.",
+        f"Each line must be a COMPLETE and VALID JSON {unit}.",
+        "DO NOT wrap in markdown.",
+        "DO NOT explain anything.",
+        "DO NOT output anything except JSON.",
+        "",
+        "Event types and schemas:",
+    ]
+    for n, (event_type, heading) in enumerate(events, start=1):
+        example = EVENT_EXAMPLES[protocol][event_type]
+        example = example.replace("{", "{{").replace("}", "}}").replace("WEEK", week)
+        lines += ["", f"{n}. {heading}:", *example.splitlines()]
+    return textwrap.indent("\n".join(lines), " " * 16, lambda line: True)
+
 
 class HealthPlannerAI:
     """Health and fitness planner."""
 
-    def __init__(self):
-        """Initialize the planner with LLM configuration."""
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            temperature=settings.OPENAI_TEMPERATURE,
-            streaming=True
-        )
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None, protocol: Optional[str] = None):
+        """Initialize the planner with LLM configuration.
+
+        Prompt templates and chains are compiled once for every possible
+        week count, so generating a plan only looks them up. protocol
+        overrides LLM_PROTOCOL, the event format the prompts ask for.
+        Chains for the structured output mode are compiled on first use.
+        """
+        self.http_client = http_client
+        self.protocol = protocol or settings.LLM_PROTOCOL
+        self.llm = create_llm(http_client)
+        self._chains: dict[int, Runnable] = {
+            num_weeks: self._create_prompt(num_weeks, self.protocol) | self.llm
+            for num_weeks in range(1, settings.MAX_PLAN_WEEKS + 1)
+        }
+        self._structured_chains: dict[int, Runnable] = {}
+        self._outline_chain = self._create_outline_prompt(self.protocol) | self.llm
+        self._range_chain = self._create_range_prompt(self.protocol) | self.llm
+
+    def _get_chain(self, num_weeks: int) -> Runnable:
+        """Return the precompiled chain for a week count."""
+        chain = self._chains.get(num_weeks)
+        if chain is None:
+            # Only reachable for degenerate timelines such as "0 weeks"
+            chain = self._create_prompt(num_weeks, self.protocol) | self.llm
+        return chain
+
+    def _get_structured_chain(self, num_weeks: int) -> Runnable:
+        """Return the chain that streams the plan as submit_plan tool arguments."""
+        chain = self._structured_chains.get(num_weeks)
+        if chain is None:
+            llm = self.llm.bind_tools([PLAN_TOOL], tool_choice=PLAN_TOOL["function"]["name"], strict=True)
+            chain = self._structured_chains[num_weeks] = self._create_structured_prompt(num_weeks) | llm
+        return chain
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP connection pool."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
 
     def _calculate_weeks(self, timeline: str) -> int:
         """Calculate number of weeks from timeline string."""
@@ -48,44 +194,128 @@ class HealthPlannerAI:
         digits = ''.join(filter(str.isdigit, text))
         return int(digits) if digits else default
 
-    def _create_prompt(self, num_weeks: int) -> ChatPromptTemplate:
+    @staticmethod
+    def _create_prompt(num_weeks: int, protocol: str = "json") -> ChatPromptTemplate:
         """Create the chat prompt template for plan generation."""
+        formats = output_format(protocol, week="1", events=[
+            ("overview", "Overview (send once)"),
+            ("week_start", "Week start (send before tasks of that week)"),
+            ("task", "Task (send each task separately)"),
+            ("done", "Done (send once at the end)"),
+        ])
         return ChatPromptTemplate.from_messages([
             (
                 "system",
                 f"""
                 You are a professional health and fitness coach.
                 
-                You MUST stream your response as newline-delimited JSON objects.
-                Each line must be a COMPLETE and VALID JSON object.
-                DO NOT wrap in markdown.
-                DO NOT explain anything.
-                DO NOT output anything except JSON.
+{formats}
                 
-                Event types and schemas:
+                Rules:
+                - Create exactly {num_weeks} weeks
+                - Each week must have 3–5 tasks
+                - Tasks should be progressive and actionable
+                - Be specific with numbers, reps, time, etc.
                 
-                1. Overview (send once):
-                {{{{"type":"overview","value":"2-3 sentence overview"}}}}
+                Start streaming immediately.
+                """
+            ),
+            (
+                "human",
+                """
+                    Goal: {goal}
+                    Current Level: {current_level}
+                    Timeline: {timeline}
+                    Constraints: {constraints}
+                """
+            )
+        ])
+
+    @staticmethod
+    def _create_structured_prompt(num_weeks: int) -> ChatPromptTemplate:
+        """Create the prompt for generating the plan as one tool call."""
+        return ChatPromptTemplate.from_messages([
+            (
+                "system",
+                f"""
+                You are a professional health and fitness coach.
                 
-                2. Week start (send before tasks of that week):
-                {{{{"type":"week_start","week":1,"focus":"Weekly focus"}}}}
+                Call the submit_plan tool once with the complete plan:
+                a 2-3 sentence overview, then the weeks in order, each with
+                its focus and tasks.
                 
-                3. Task (send each task separately):
-                {{{{
-                  "type":"task",
-                  "week":1,
-                  "task": {{{{
-                    "title":"Task title",
-                    "description":"Clear instructions",
-                    "duration":"30 mins"
-                  }}}}
-                }}}}
+                Rules:
+                - Create exactly {num_weeks} weeks
+                - Each week must have 3–5 tasks
+                - Tasks should be progressive and actionable
+                - Be specific with numbers, reps, time, etc.
+                """
+            ),
+            (
+                "human",
+                """
+                    Goal: {goal}
+                    Current Level: {current_level}
+                    Timeline: {timeline}
+                    Constraints: {constraints}
+                """
+            )
+        ])
+
+    @staticmethod
+    def _create_outline_prompt(protocol: str = "json") -> ChatPromptTemplate:
+        """Create the prompt for the overview and week-by-week progression."""
+        formats = output_format(protocol, week="1", events=[
+            ("overview", "Overview (send once, first)"),
+            ("outline", "Outline (send once per week, in order)"),
+        ])
+        return ChatPromptTemplate.from_messages([
+            (
+                "system",
+                f"""
+                You are a professional health and fitness coach.
                 
-                4. Done (send once at the end):
-                {{{{"type":"done"}}}}\n
+{formats}
                 
                 Rules:
-                - Create exactly {num_weeks} weeks
+                - Outline exactly {{num_weeks}} weeks
+                - Each week's focus must build on the previous one
+                - Do not list tasks
+                
+                Start streaming immediately.
+                """
+            ),
+            (
+                "human",
+                """
+                    Goal: {goal}
+                    Current Level: {current_level}
+                    Timeline: {timeline}
+                    Constraints: {constraints}
+                """
+            )
+        ])
+
+    @staticmethod
+    def _create_range_prompt(protocol: str = "json") -> ChatPromptTemplate:
+        """Create the prompt for the tasks of a range of outlined weeks."""
+        formats = output_format(protocol, week="{first_week}", events=[
+            ("week_start", "Week start (send before tasks of that week)"),
+            ("task", "Task (send each task separately)"),
+            ("done", "Done (send once at the end)"),
+        ])
+        return ChatPromptTemplate.from_messages([
+            (
+                "system",
+                f"""
+                You are a professional health and fitness coach.
+                
+{formats}
+                
+                Rules:
+                - Only write weeks {{first_week}} to {{last_week}} of this plan outline:
+                {{outline}}
+                - Use the outlined focus for each week
                 - Each week must have 3–5 tasks
                 - Tasks should be progressive and actionable
                 - Be specific with numbers, reps, time, etc.
@@ -104,58 +334,247 @@ class HealthPlannerAI:
             )
         ])
 
-    async def generate_plan_streaming(
+    def request_key(
             self,
             goal: str,
             current_level: str,
             timeline: str,
             constraints: str = "",
-            parser: StreamingJSONParser = StreamingJSONParser()
-    ) -> AsyncIterator[tuple[str, Optional[GoalPlan]]]:
-        """Generate a plan with streaming output."""
+            output_mode: Optional[str] = None
+    ) -> str:
+        """Content address of a generation request.
+
+        Requests that normalize to the same inputs, model, output mode and
+        week count produce the same key.
+        """
+        payload = {
+            "goal": self._normalize(goal),
+            "current_level": self._normalize(current_level),
+            "timeline": self._normalize(timeline),
+            "constraints": self._normalize(constraints or ""),
+            "backend": settings.LLM_BACKEND,
+            "model": settings.OPENAI_MODEL,
+            "output_mode": output_mode or settings.LLM_OUTPUT_MODE,
+            "weeks": self._calculate_weeks(timeline),
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Lowercase and collapse whitespace."""
+        return " ".join(text.lower().split())
+
+    async def stream_events(
+            self,
+            goal: str,
+            current_level: str,
+            timeline: str,
+            constraints: str = "",
+            parser: Optional[StreamingJSONParser] = None,
+            output_mode: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """Stream raw plan events parsed from the LLM output.
+
+        output_mode overrides LLM_OUTPUT_MODE: "ndjson" prompts for event
+        lines, "structured" has the LLM call a tool with the whole plan and
+        parses its arguments incrementally. Structured generations always
+        run as a single stream.
+        """
         num_weeks = self._calculate_weeks(timeline)
-        prompt = self._create_prompt(num_weeks)
-        chain = prompt | self.llm
+        inputs = {
+            "goal": goal,
+            "current_level": current_level,
+            "timeline": timeline,
+            "constraints": constraints or "None",
+        }
 
-        plan_id = str(uuid.uuid4())
-        created_at = datetime.now().isoformat()
+        if (output_mode or settings.LLM_OUTPUT_MODE) == "structured":
+            events = self._stream_chain(
+                self._get_structured_chain(num_weeks), inputs, parser or StructuredPlanParser()
+            )
+        elif settings.PARALLEL_GENERATION_ENABLED and num_weeks >= settings.PARALLEL_MIN_WEEKS:
+            events = self._stream_events_parallel(num_weeks, inputs)
+        else:
+            events = self._stream_chain(self._get_chain(num_weeks), inputs, parser)
 
-        # Initialize components
-        builder = PlanBuilder(plan_id, goal, created_at)
+        async for event in events:
+            yield event
 
-        try:
-            async for chunk in chain.astream({
-                "goal": goal,
-                "current_level": current_level,
-                "timeline": timeline,
-                "constraints": constraints or "None",
-            }):
-                content = chunk.content
+    async def _stream_chain(
+            self,
+            chain: Runnable,
+            inputs: dict,
+            parser: Optional[StreamingJSONParser | StructuredPlanParser] = None
+    ) -> AsyncIterator[dict]:
+        """Run one LLM stream and yield the events parsed from it.
+
+        The stream holds an LLM stream slot from start to finish.
+        """
+        # A fresh parser per stream so buffered text never leaks
+        # between concurrent streams.
+        parser = parser or StreamingJSONParser()
+
+        async with get_llm_stream_slots():
+            start = time.perf_counter()
+            first_token = True
+
+            async for chunk in chain.astream(inputs):
+                content = chunk_text(chunk)
                 if not content:
                     continue
 
+                parse_start = time.perf_counter()
+                if first_token:
+                    first_token = False
+                    LLM_TIME_TO_FIRST_TOKEN.observe(parse_start - start)
+
                 # Process chunk and get complete events
                 events = parser.process_chunk(content)
-
+                PARSE_CHUNK_DURATION.observe(time.perf_counter() - parse_start)
                 for event in events:
-                    event_type = event.get("type")
+                    yield event
+
+        for event in parser.flush():
+            yield event
 
-                    if event_type == "overview":
-                        builder.add_overview(event["value"])
-                        yield self._sse(event), None
+    async def _stream_events_parallel(self, num_weeks: int, inputs: dict) -> AsyncIterator[dict]:
+        """Outline the plan, then generate week ranges concurrently.
 
-                    elif event_type == "week_start":
-                        builder.start_week(event["week"], event["focus"])
-                        yield self._sse(event), None
+        The overview is streamed as soon as the outline call produces it.
+        Each range runs in its own LLM stream; events of the earliest
+        unfinished range are passed through live while later ranges buffer,
+        so weeks still arrive in order.
+        """
+        outline: dict[int, str] = {}
+        async for event in self._stream_chain(self._outline_chain, {**inputs, "num_weeks": num_weeks}):
+            if event.get("type") == "overview":
+                yield event
+            elif event.get("type") == "outline" and event.get("week") in range(1, num_weeks + 1):
+                outline[event["week"]] = event.get("focus") or f"Week {event['week']}"
+
+        outline_text = "\n".join(
+            f"Week {week}: {focus}" for week, focus in sorted(outline.items())
+        )
+        size = settings.PARALLEL_WEEKS_PER_RANGE
+        ranges = [
+            (first, min(first + size - 1, num_weeks))
+            for first in range(1, num_weeks + 1, size)
+        ]
+        queues = [asyncio.Queue() for _ in ranges]
 
-                    elif event_type == "task":
-                        if builder.add_task(event["week"], event["task"]):
-                            yield self._sse(event), None
+        async def produce(first: int, last: int, queue: asyncio.Queue) -> None:
+            try:
+                range_inputs = {
+                    **inputs,
+                    "first_week": first,
+                    "last_week": last,
+                    "outline": outline_text,
+                }
+                async for event in self._stream_chain(self._range_chain, range_inputs):
+                    await queue.put(event)
+                await queue.put(_RANGE_END)
+            except Exception as e:
+                await queue.put(e)
 
-            for event in parser.flush():
-                if event["type"] == "done":
+        tasks = [
+            asyncio.create_task(produce(first, last, queue))
+            for (first, last), queue in zip(ranges, queues)
+        ]
+        logger.info(f"Generating {num_weeks} weeks in {len(ranges)} parallel ranges")
+
+        try:
+            for (first, last), queue in zip(ranges, queues):
+                current, started = first, False
+                while True:
+                    event = await queue.get()
+                    if event is _RANGE_END:
+                        break
+                    if isinstance(event, Exception):
+                        raise event
+
+                    week = event.get("week")
+                    if (event.get("type") not in ("week_start", "task")
+                            or not isinstance(week, int) or not current <= week <= last):
+                        # Each range only contributes its own weeks, in order
+                        continue
+
+                    if week > current or not started:
+                        current = week
+                        started = True
+                        if event["type"] == "task":
+                            yield {"type": "week_start", "week": week, "focus": outline.get(week, f"Week {week}")}
+                    elif event["type"] == "week_start":
+                        continue
+                    yield event
+
+            yield {"type": "done"}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def build_plan_streaming(
+            self,
+            goal: str,
+            events: AsyncIterator[dict],
+            plan_id: Optional[str] = None,
+            checkpoint: Optional[Callable[[dict, int], Awaitable[None]]] = None
+    ) -> AsyncIterator[tuple[str, Optional[GoalPlan]]]:
+        """Apply plan events to a new plan and stream them as SSE.
+
+        Every call builds a plan with a fresh plan id and task ids, so the
+        same event sequence can be replayed for several requests.
+        Each time a week is complete, checkpoint is awaited with the
+        builder's snapshot and the number of SSE events streamed so far.
+        """
+        plan_id = plan_id or str(uuid.uuid4())
+        streamed = 0
+        created_at = datetime.now().isoformat()
+
+        # Initialize components
+        builder = PlanBuilder(plan_id, goal, created_at)
+        start = time.perf_counter()
+        first_event = True
+
+        try:
+            async for event in events:
+                event_type = event.get("type")
+                if first_event:
+                    first_event = False
+                    GENERATION_TIME_TO_FIRST_EVENT.observe(time.perf_counter() - start)
+                _EVENT_COUNTERS.get(event_type, _OTHER_EVENTS).inc()
+
+                if event_type == "overview":
+                    builder.add_overview(event["value"])
+                    streamed += 1
+                    yield self.sse(event), None
+
+                elif event_type == "week_start":
+                    if checkpoint and builder.weeks:
+                        # The previous week is complete
+                        await checkpoint(builder.snapshot(), streamed)
+                    builder.start_week(event["week"], event["focus"])
+                    streamed += 1
+                    yield self.sse(event), None
+
+                elif event_type == "task":
+                    if builder.add_task(event["week"], event["task"]):
+                        streamed += 1
+                        yield self.sse(event), None
+
+                elif event_type == "error":
+                    # The parser could not recover a plan from the output
+                    yield self.sse(event), None
+                    return
+
+                elif event_type == "done":
                     plan = builder.build()
-                    yield self._sse({"type": "done", "plan_id": plan_id}), plan
+                    GENERATION_DURATION.observe(time.perf_counter() - start)
+                    done = {"type": "done", "plan_id": plan_id}
+                    if event.get("partial"):
+                        # Finished from a broken-off structured output
+                        done["partial"] = True
+                    yield self.sse(done), plan
                     return
         except Exception as e:
             logger.exception("Error during streaming generation")
@@ -163,9 +582,60 @@ class HealthPlannerAI:
                 "type": "error",
                 "message": str(e)
             }
-            yield self._sse(error_event), None
+            _EVENT_COUNTERS["error"].inc()
+            yield self.sse(error_event), None
+        finally:
+            # Stop the upstream stream once the plan is complete
+            if hasattr(events, "aclose"):
+                await events.aclose()
+
+    async def generate_plan_streaming(
+            self,
+            goal: str,
+            current_level: str,
+            timeline: str,
+            constraints: str = "",
+            parser: Optional[StreamingJSONParser] = None,
+            output_mode: Optional[str] = None
+    ) -> AsyncIterator[tuple[str, Optional[GoalPlan]]]:
+        """Generate a plan with streaming output."""
+        events = self.stream_events(goal, current_level, timeline, constraints, parser, output_mode)
+        async for sse_event, plan in self.build_plan_streaming(goal, events):
+            yield sse_event, plan
 
     @staticmethod
-    def _sse(payload: dict) -> str:
+    def sse(payload: dict) -> str:
         """Format payload as Server-Sent Event."""
         return f"data: {json.dumps(payload)}\n\n"
+
+
+def chunk_text(chunk: AIMessageChunk) -> str:
+    """Text of a streamed chunk: its content, or its tool call arguments."""
+    if chunk.tool_call_chunks:
+        return "".join(call.get("args") or "" for call in chunk.tool_call_chunks)
+    return chunk.content
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the keep-alive connection pool shared by all LLM requests."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS)
+    )
+
+
+@lru_cache()
+def get_planner() -> HealthPlannerAI:
+    """Get the process-wide planner and its shared HTTP client."""
+    return HealthPlannerAI(http_client=create_http_client())
+
+
+async def close_planner() -> None:
+    """Close the process-wide planner if it was created."""
+    if get_planner.cache_info().currsize:
+        await get_planner().aclose()
+        get_planner.cache_clear()
@@ -0,0 +1,192 @@
+"""Admission control and fair queueing for LLM generations."""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from backend.config import get_settings
+from backend.core.metrics import GENERATIONS_REJECTED, Gauge
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class GenerationQueueFull(Exception):
+    """Raised when a generation can neither start nor wait."""
+
+    def __init__(self, retry_after: int):
+        """Initialize"""
+        super().__init__("Too many plan generations in progress")
+        self.retry_after = retry_after
+
+
+class GenerationTicket:
+    """A request's place in the scheduler, from admission to release."""
+
+    def __init__(self, scheduler: "GenerationScheduler", user_key: str):
+        """Initialize"""
+        self.scheduler = scheduler
+        self.user_key = user_key
+        self.granted = False
+        self.released = False
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> AsyncIterator[int]:
+        """Yield the queue position each time it changes until admitted."""
+        last_position: Optional[int] = None
+        while True:
+            # Clear before reading state so a change during a yield is not lost
+            self._changed.clear()
+            if self.granted:
+                return
+
+            position = self.scheduler.position(self)
+            if position != last_position:
+                last_position = position
+                yield position
+
+            await self._changed.wait()
+
+    def release(self) -> None:
+        """Give up the slot, or the place in the queue if still waiting."""
+        self.scheduler.release(self)
+
+
+class GenerationScheduler:
+    """Limits concurrent generations and queues the rest fairly.
+
+    Waiting tickets are grouped per user and admitted round-robin across
+    users, so one user submitting many plans cannot starve the others.
+    Once the queue is full new requests are rejected immediately.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, retry_after_seconds: int):
+        """Initialize"""
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self._waiting: OrderedDict[str, deque[GenerationTicket]] = OrderedDict()
+
+    def enqueue(self, user_key: str) -> GenerationTicket:
+        """Admit a generation or queue it, raising GenerationQueueFull if full."""
+        ticket = GenerationTicket(self, user_key)
+        if self.active < self.max_concurrency and not self._waiting:
+            self._grant(ticket)
+            return ticket
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            GENERATIONS_REJECTED.inc()
+            logger.warning(f"Generation queue full ({self.queued} waiting), rejecting request")
+            raise GenerationQueueFull(self.retry_after_seconds)
+
+        self._waiting.setdefault(user_key, deque()).append(ticket)
+        self.queued += 1
+        self._notify()
+        return ticket
+
+    def release(self, ticket: GenerationTicket) -> None:
+        """Free a ticket's slot or queue entry and admit waiting tickets."""
+        if ticket.released:
+            return
+        ticket.released = True
+
+        if ticket.granted:
+            self.active -= 1
+        else:
+            tickets = self._waiting[ticket.user_key]
+            tickets.remove(ticket)
+            self.queued -= 1
+            if not tickets:
+                del self._waiting[ticket.user_key]
+
+        self._dispatch()
+
+    def position(self, ticket: GenerationTicket) -> int:
+        """Return the 1-based position a waiting ticket will be admitted at."""
+        position = 0
+        depth = 0
+        queues = list(self._waiting.values())
+        while True:
+            found = False
+            for tickets in queues:
+                if depth < len(tickets):
+                    found = True
+                    position += 1
+                    if tickets[depth] is ticket:
+                        return position
+            if not found:
+                return 0
+            depth += 1
+
+    def stats(self) -> dict:
+        """Return the scheduler gauges."""
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
+
+    def _dispatch(self) -> None:
+        """Admit waiting tickets round-robin across users while slots are free."""
+        while self.active < self.max_concurrency and self._waiting:
+            user_key, tickets = self._waiting.popitem(last=False)
+            ticket = tickets.popleft()
+            self.queued -= 1
+            if tickets:
+                # The user goes to the back of the rotation
+                self._waiting[user_key] = tickets
+            self._grant(ticket)
+
+        self._notify()
+
+    def _grant(self, ticket: GenerationTicket) -> None:
+        """Give a ticket a generation slot."""
+        ticket.granted = True
+        self.active += 1
+        ticket._changed.set()
+
+    def _notify(self) -> None:
+        """Wake every waiting ticket so it can report its new position."""
+        for tickets in self._waiting.values():
+            for ticket in tickets:
+                ticket._changed.set()
+
+
+@lru_cache()
+def get_llm_stream_slots() -> asyncio.Semaphore:
+    """Get the process-wide limit on concurrent LLM streams.
+
+    The scheduler admits generations, but a parallel generation opens
+    several streams; every stream takes one of these slots for its
+    duration so the provider never sees more than LLM_MAX_STREAMS.
+    """
+    return asyncio.Semaphore(settings.LLM_MAX_STREAMS)
+
+
+@lru_cache()
+def get_generation_scheduler() -> GenerationScheduler:
+    """Get the process-wide generation scheduler."""
+    return GenerationScheduler(
+        max_concurrency=settings.GENERATION_MAX_CONCURRENCY,
+        max_queue=settings.GENERATION_MAX_QUEUE,
+        retry_after_seconds=settings.GENERATION_RETRY_AFTER_SECONDS
+    )
+
+
+Gauge(
+    "plan_generations_active",
+    "Generations holding a scheduler slot.",
+    lambda: get_generation_scheduler().active
+)
+Gauge(
+    "plan_generations_queued",
+    "Generations waiting for a scheduler slot.",
+    lambda: get_generation_scheduler().queued
+)
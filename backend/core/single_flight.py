@@ -0,0 +1,143 @@
+"""Single-flight coalescing of identical concurrent generations."""
+import asyncio
+import logging
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Optional
+
+from backend.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class _Subscriber:
+    """A consumer of a flight with its own bounded queue.
+
+    While `lagging` is set the subscriber reads from the flight's shared
+    event log instead of its queue. New subscribers start lagging, which
+    replays everything they missed, and a subscriber whose queue fills up
+    falls back to the log rather than blocking the producer.
+    """
+
+    def __init__(self, queue_size: int):
+        """Initialize"""
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.position = 0
+        self.lagging = True
+
+    def offer(self, item: object) -> None:
+        """Enqueue an item without ever blocking the producer."""
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+
+class _Flight:
+    """One upstream stream shared by every subscriber of a key."""
+
+    def __init__(self):
+        """Initialize"""
+        self.events: list[dict] = []
+        self.subscribers: set[_Subscriber] = set()
+        self.finished = False
+        self.error: Optional[Exception] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class SingleFlight:
+    """Runs at most one upstream event stream per key.
+
+    Concurrent callers with the same key subscribe to the running stream
+    and receive every event, including the ones emitted before they joined.
+    """
+
+    def __init__(self, queue_size: int):
+        """Initialize"""
+        self.queue_size = queue_size
+        self._flights: dict[str, _Flight] = {}
+
+    def is_running(self, key: str) -> bool:
+        """Check whether a stream for key is in progress."""
+        return key in self._flights
+
+    def subscribe(
+            self,
+            key: str,
+            factory: Callable[[], AsyncIterator[dict]]
+    ) -> AsyncIterator[dict]:
+        """Join the stream for key, starting it with factory if needed."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._produce(key, flight, factory()))
+        else:
+            logger.info(f"Joined in-flight generation {key[:12]} "
+                        f"({len(flight.subscribers) + 1} subscribers)")
+
+        return self._consume(key, flight)
+
+    async def _produce(self, key: str, flight: _Flight, events: AsyncIterator[dict]) -> None:
+        """Pump the upstream stream into the log and subscriber queues."""
+        try:
+            async for event in events:
+                flight.events.append(event)
+                for subscriber in flight.subscribers:
+                    subscriber.offer(event)
+        except asyncio.CancelledError:
+            flight.error = RuntimeError("Generation was cancelled")
+        except Exception as e:
+            flight.error = e
+        finally:
+            if hasattr(events, "aclose"):
+                await events.aclose()
+            flight.finished = True
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            for subscriber in flight.subscribers:
+                subscriber.offer(_END)
+
+    async def _consume(self, key: str, flight: _Flight) -> AsyncIterator[dict]:
+        """Yield the flight's events to one subscriber."""
+        subscriber = _Subscriber(self.queue_size)
+        flight.subscribers.add(subscriber)
+
+        try:
+            while True:
+                if subscriber.lagging and subscriber.queue.empty():
+                    while subscriber.position < len(flight.events):
+                        event = flight.events[subscriber.position]
+                        subscriber.position += 1
+                        yield event
+                    if flight.finished:
+                        break
+                    # Caught up: no await between the check and switching back
+                    subscriber.lagging = False
+                    continue
+
+                item = await subscriber.queue.get()
+                if item is _END:
+                    break
+                subscriber.position += 1
+                yield item
+
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            flight.subscribers.discard(subscriber)
+            if not flight.subscribers and not flight.finished:
+                # Nobody is listening any more; stop paying for the stream
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+
+
+@lru_cache()
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight registry."""
+    return SingleFlight(queue_size=settings.SINGLE_FLIGHT_QUEUE_SIZE)
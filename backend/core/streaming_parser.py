@@ -2,47 +2,127 @@ import json
 import logging
 from typing import Optional
 
+from backend.core.metrics import UNPARSEABLE_LINES
+
 logger = logging.getLogger(__name__)
 
+# Compact wire form of plan events (LLM_PROTOCOL=compact): positional arrays
+# led by a one-letter tag instead of keyed objects, for example
+# ["t",1,"Title","Description","30 mins"] for a task. Fields per tag:
+COMPACT_FIELDS = {
+    "o": ("overview", ("value",)),
+    "l": ("outline", ("week", "focus")),
+    "w": ("week_start", ("week", "focus")),
+    "t": ("task", ("week", "title", "description", "duration")),
+    "d": ("done", ()),
+}
+COMPACT_TAGS = {event_type: tag for tag, (event_type, _) in COMPACT_FIELDS.items()}
+TASK_FIELDS = ("title", "description", "duration")
+
+
+def expand_event(values: list) -> Optional[dict]:
+    """Map a compact event back to its keyed form, None if it is malformed."""
+    if not values or not isinstance(values[0], str) or values[0] not in COMPACT_FIELDS:
+        return None
+    event_type, fields = COMPACT_FIELDS[values[0]]
+    if len(values) != len(fields) + 1:
+        return None
+
+    event = {"type": event_type, **dict(zip(fields, values[1:]))}
+    if event_type == "task":
+        event["task"] = {field: event.pop(field) for field in TASK_FIELDS}
+    return event
+
+
+def compact_event(event: dict) -> list:
+    """Write a keyed event in compact form."""
+    event_type = event["type"]
+    tag = COMPACT_TAGS[event_type]
+    source = {**event, **event["task"]} if event_type == "task" else event
+    return [tag, *(source[field] for field in COMPACT_FIELDS[tag][1])]
+
 
 class StreamingJSONParser:
-    """Handles streaming JSON parsing with buffering."""
+    """Handles streaming JSON parsing with buffering.
+
+    Incoming chunks are kept in a list of pending fragments instead of being
+    concatenated onto one growing string. Only the newly arrived chunk is
+    scanned for newlines, and each completed line is joined and decoded
+    exactly once, so the cost per chunk is proportional to the chunk size.
+
+    Lines holding a JSON array are compact events and are expanded to the
+    keyed events, so callers see the same events under either protocol.
+    """
 
     def __init__(self):
         """Initialize parser with empty buffer."""
-        self.buffer = ""
+        self._pending: list[str] = []
+
+    @property
+    def buffer(self) -> str:
+        """Text received since the last complete line."""
+        return "".join(self._pending)
 
     def process_chunk(self, content: str) -> list[dict]:
         """
         Process incoming content and yield complete JSON objects.
         """
-        self.buffer += content
+        if "\n" not in content:
+            if content:
+                self._pending.append(content)
+            return []
+
         events = []
+        start = 0
+        newline = content.find("\n")
 
-        while "\n" in self.buffer:
-            line, self.buffer = self.buffer.split("\n", 1)
-            line = line.strip()
+        while newline != -1:
+            if self._pending:
+                self._pending.append(content[start:newline])
+                line = "".join(self._pending)
+                self._pending.clear()
+            else:
+                line = content[start:newline]
 
-            if not line:
-                continue
+            self._emit(line, events)
 
-            event = self._parse_line(line)
-            if event:
-                events.append(event)
+            start = newline + 1
+            newline = content.find("\n", start)
+
+        if start < len(content):
+            self._pending.append(content[start:])
 
         return events
 
+    def _emit(self, line: str, events: list[dict]) -> None:
+        """Decode a complete line and append it to events if valid."""
+        line = line.strip()
+        if not line:
+            return
+
+        event = self._parse_line(line)
+        if event:
+            events.append(event)
+
     def _parse_line(self, line: str) -> Optional[dict]:
         """Parse a single line as JSON."""
         try:
-            return json.loads(line)
+            event = json.loads(line)
         except json.JSONDecodeError:
+            UNPARSEABLE_LINES.inc()
             logger.warning(f"Incomplete JSON line skipped: {line[:100]}")
             return None
 
+        if isinstance(event, list):
+            event = expand_event(event)
+            if event is None:
+                UNPARSEABLE_LINES.inc()
+                logger.warning(f"Malformed compact event skipped: {line[:100]}")
+        return event
+
     def reset(self) -> None:
         """Reset the buffer."""
-        self.buffer = ""
+        self._pending.clear()
 
     def flush(self) -> list[dict]:
         """Parse any remaining buffered JSON."""
@@ -50,15 +130,13 @@ class StreamingJSONParser:
         remaining = self.buffer.strip()
 
         if remaining:
-            try:
-                event = json.loads(remaining)
+            event = self._parse_line(remaining)
+            if event:
                 events.append(event)
-            except json.JSONDecodeError:
-                logger.warning(f"Unparseable trailing buffer: {remaining[:100]}")
 
         self.reset()
         return events
 
     def has_buffered_data(self) -> bool:
         """Check if there's unparsed data in buffer."""
-        return bool(self.buffer.strip())
+        return any(fragment.strip() for fragment in self._pending)
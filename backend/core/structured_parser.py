@@ -0,0 +1,286 @@
+"""Incremental parsing of plans written as one structured JSON document.
+
+In the structured output mode the LLM calls a tool whose arguments are the
+whole plan, {"overview": ..., "weeks": [{"week", "focus", "tasks": [...]}]},
+streamed as fragments of a single JSON document. PartialJSONParser reads
+that document a character at a time and reports every value the moment it
+is complete; StructuredPlanParser turns those values into the same plan
+events the NDJSON parser produces.
+"""
+import json
+import logging
+import re
+from typing import Any, Callable, Optional
+
+from backend.core.metrics import STRUCTURED_PARSE_FAILURES
+
+logger = logging.getLogger(__name__)
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_LITERAL_CHARS = frozenset("0123456789+-.eEtruefalsn")
+_WHITESPACE = frozenset(" \t\r\n")
+
+# Parser states
+_VALUE, _KEY, _COLON, _COMMA, _STRING, _LITERAL, _DONE = range(7)
+
+
+class PartialJSONError(ValueError):
+    """The document is not valid JSON."""
+
+
+class PartialJSONParser:
+    """Incremental JSON parser that reports values as they complete.
+
+    on_value is called with the path and value of every string, number,
+    literal, object and array once its last character arrives; paths are
+    tuples of object keys and array indexes. Containers are attached to
+    their parent when they open, so root holds the partial document at
+    any point. Raises PartialJSONError on invalid input.
+    """
+
+    def __init__(self, on_value: Callable[[tuple, Any], None]):
+        """Initialize"""
+        self.on_value = on_value
+        self.root: Any = None
+        self._stack: list[tuple[Any, tuple]] = []
+        self._state = _VALUE
+        self._key: Optional[str] = None
+        self._string_is_key = False
+        self._raw: list[str] = []
+        self._escape = False
+
+    def feed(self, text: str) -> None:
+        """Consume the next fragment of the document."""
+        i, n = 0, len(text)
+        while i < n:
+            state = self._state
+
+            if state == _STRING:
+                i = self._read_string(text, i)
+                continue
+
+            char = text[i]
+            if state == _LITERAL:
+                if char in _LITERAL_CHARS:
+                    self._raw.append(char)
+                    i += 1
+                    continue
+                self._end_literal()
+                continue  # the terminator is read in the new state
+
+            i += 1
+            if char in _WHITESPACE:
+                continue
+
+            if state == _VALUE:
+                self._start_value(char)
+            elif state == _KEY:
+                if char == '"':
+                    self._start_string(is_key=True)
+                elif char == "}" and not self._stack[-1][0]:
+                    self._close("}")
+                else:
+                    raise PartialJSONError(f"Expected an object key, got {char!r}")
+            elif state == _COLON:
+                if char != ":":
+                    raise PartialJSONError(f"Expected ':', got {char!r}")
+                self._state = _VALUE
+            elif state == _COMMA:
+                if char == ",":
+                    self._state = _KEY if isinstance(self._stack[-1][0], dict) else _VALUE
+                elif char in "}]":
+                    self._close(char)
+                else:
+                    raise PartialJSONError(f"Expected ',' or a closing bracket, got {char!r}")
+            else:
+                raise PartialJSONError(f"Unexpected {char!r} after the document")
+
+    def finish(self) -> None:
+        """Complete a number that ends the input."""
+        if self._state == _LITERAL:
+            self._end_literal()
+
+    def _start_value(self, char: str) -> None:
+        if char == '"':
+            self._start_string(is_key=False)
+        elif char == "{" or char == "[":
+            container = {} if char == "{" else []
+            path = self._attach(container)
+            self._stack.append((container, path))
+            self._state = _KEY if char == "{" else _VALUE
+        elif char == "]" and self._stack and self._stack[-1][0] == []:
+            self._close("]")
+        elif char in _LITERAL_CHARS:
+            self._raw = [char]
+            self._state = _LITERAL
+        else:
+            raise PartialJSONError(f"Expected a value, got {char!r}")
+
+    def _start_string(self, is_key: bool) -> None:
+        self._string_is_key = is_key
+        self._raw = []
+        self._state = _STRING
+
+    def _read_string(self, text: str, i: int) -> int:
+        """Read string content from text[i:], returning where to continue."""
+        if self._escape:
+            # The backslash ended the previous fragment
+            self._raw.append(text[i])
+            self._escape = False
+            return i + 1
+
+        match = _STRING_SPECIAL.search(text, i)
+        if match is None:
+            self._raw.append(text[i:])
+            return len(text)
+
+        end = match.start()
+        self._raw.append(text[i:end])
+        if text[end] == "\\":
+            if end + 1 < len(text):
+                self._raw.append(text[end:end + 2])
+                return end + 2
+            self._raw.append("\\")
+            self._escape = True
+            return end + 1
+
+        try:
+            value = json.loads(f'"{"".join(self._raw)}"', strict=False)
+        except json.JSONDecodeError as e:
+            raise PartialJSONError(f"Invalid string: {e}") from None
+        if self._string_is_key:
+            self._key = value
+            self._state = _COLON
+        else:
+            self._complete(value)
+        return end + 1
+
+    def _end_literal(self) -> None:
+        raw = "".join(self._raw)
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            raise PartialJSONError(f"Invalid literal {raw[:20]!r}") from None
+        self._complete(value)
+
+    def _attach(self, value: Any) -> tuple:
+        """Add a value to the open container and return its path."""
+        if not self._stack:
+            self.root = value
+            return ()
+        container, path = self._stack[-1]
+        if isinstance(container, dict):
+            container[self._key] = value
+            return path + (self._key,)
+        container.append(value)
+        return path + (len(container) - 1,)
+
+    def _complete(self, value: Any) -> None:
+        path = self._attach(value)
+        self._state = _COMMA if self._stack else _DONE
+        self.on_value(path, value)
+
+    def _close(self, char: str) -> None:
+        container, path = self._stack[-1]
+        if isinstance(container, dict) != (char == "}"):
+            raise PartialJSONError(f"Mismatched {char!r}")
+        self._stack.pop()
+        self._state = _COMMA if self._stack else _DONE
+        self.on_value(path, container)
+
+
+class StructuredPlanParser:
+    """Turns a streamed structured plan document into plan events.
+
+    The overview is emitted when its string closes and each task when its
+    object closes, preceded by its week's week_start. Weeks only start
+    with their first valid task, so a week cut off before any task never
+    reaches the plan. Invalid tasks are skipped. If the document breaks
+    off or stops being valid JSON, the parser keeps what was already
+    complete and flush ends the plan there, so a damaged response still
+    yields a plan of the tasks it finished without another LLM call; its
+    done event is marked partial. If there is no overview or no task to
+    finish the plan with, flush emits an error event instead.
+
+    Has the process_chunk/flush interface of StreamingJSONParser.
+    """
+
+    def __init__(self):
+        """Initialize"""
+        self._parser = PartialJSONParser(self._on_value)
+        self._events: list[dict] = []
+        self._has_overview = False
+        self._started_weeks: set[int] = set()
+        self._failed = False
+        self._done = False
+
+    def process_chunk(self, content: str) -> list[dict]:
+        """Consume a fragment of the document and return completed events."""
+        if self._failed or self._done:
+            return []
+        try:
+            self._parser.feed(content)
+        except PartialJSONError as e:
+            self._failed = True
+            logger.warning(f"Structured plan output is invalid: {e}")
+        return self._take()
+
+    def flush(self) -> list[dict]:
+        """Return the remaining events, ending the plan if the document did not."""
+        if not self._failed and not self._done:
+            try:
+                self._parser.finish()
+            except PartialJSONError as e:
+                self._failed = True
+                logger.warning(f"Structured plan output is invalid: {e}")
+
+        if not self._done:
+            self._done = True
+            if self._has_overview and self._started_weeks:
+                STRUCTURED_PARSE_FAILURES.labels("recovered").inc()
+                logger.warning(f"Structured plan output ended early; finishing with {len(self._started_weeks)} weeks")
+                self._events.append({"type": "done", "partial": True})
+            else:
+                STRUCTURED_PARSE_FAILURES.labels("lost").inc()
+                logger.error("Structured plan output ended before any complete task")
+                self._events.append({"type": "error", "message": "The plan output was invalid or incomplete"})
+        return self._take()
+
+    def _take(self) -> list[dict]:
+        events, self._events = self._events, []
+        return events
+
+    def _on_value(self, path: tuple, value: Any) -> None:
+        if path == ("overview",) and isinstance(value, str):
+            self._has_overview = True
+            self._events.append({"type": "overview", "value": value})
+        elif len(path) == 4 and path[0] == "weeks" and isinstance(path[1], int) and path[2] == "tasks":
+            self._add_task(path[1], value)
+        elif path == ():
+            self._done = True
+            self._events.append({"type": "done"})
+
+    def _add_task(self, week_index: int, task: Any) -> None:
+        if not (isinstance(task, dict) and all(isinstance(task.get(field), str) for field in
+                                               ("title", "description", "duration"))):
+            logger.warning(f"Invalid task skipped in week {week_index + 1}: {str(task)[:100]}")
+            return
+
+        week = self._parser.root["weeks"][week_index]
+        week_num = week.get("week")
+        if not isinstance(week_num, int):
+            week_num = week_index + 1
+        if week_num not in self._started_weeks:
+            self._started_weeks.add(week_num)
+            focus = week.get("focus")
+            self._events.append({
+                "type": "week_start",
+                "week": week_num,
+                "focus": focus if isinstance(focus, str) else f"Week {week_num}"
+            })
+
+        self._events.append({
+            "type": "task",
+            "week": week_num,
+            "task": {field: task[field] for field in ("title", "description", "duration")}
+        })
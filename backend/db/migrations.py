@@ -0,0 +1,278 @@
+"""Idempotent data migrations run on startup or from the command line.
+
+    python -m backend.db.migrations
+    python -m backend.db.migrations --recompute-progress
+    python -m backend.db.migrations --reencode-plan-data zstd
+"""
+import logging
+
+from sqlalchemy import exists, func, inspect, text, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, select
+
+from backend.db.models import PLAN_SEARCH_DDL, PlanTask, PlanWeek, SavedPlan
+from backend.db.plan_codec import CODECS, decode_plan, get_codec
+from backend.db.plan_layout import PLAN_SCHEMA_VERSION, plan_to_rows
+from backend.db.plan_search import INSERT_DOCUMENT, SET_SEARCH_ID, UNINDEXED_PLANS
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def migrate_to_normalized_layout(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    """Copy weeks and tasks of legacy plans into the normalized tables.
+
+    Only plans without any week rows are touched, so the migration can be
+    re-run safely. Returns the number of plans migrated.
+    """
+    migrated = 0
+    last_id = ""
+
+    while True:
+        legacy_plans = db.exec(
+            select(SavedPlan)
+            .where(
+                SavedPlan.id > last_id,
+                ~exists().where(PlanWeek.plan_id == SavedPlan.id)
+            )
+            .order_by(SavedPlan.id)
+            .limit(batch_size)
+        ).all()
+
+        if not legacy_plans:
+            break
+        last_id = legacy_plans[-1].id
+
+        for saved_plan in legacy_plans:
+            try:
+                plan = decode_plan(saved_plan.plan_data_format, saved_plan.plan_data)
+            except Exception as e:
+                logger.error(f"Skipping plan {saved_plan.id} with invalid plan_data: {e}")
+                continue
+
+            weeks, tasks = plan_to_rows(plan)
+            db.add_all(weeks)
+            db.add_all(tasks)
+            saved_plan.total_tasks = len(tasks)
+            saved_plan.completed_tasks = sum(task.completed for task in tasks)
+            saved_plan.schema_version = PLAN_SCHEMA_VERSION
+            migrated += 1
+
+        db.commit()
+
+    if migrated:
+        logger.info(f"Migrated {migrated} plans to the normalized layout")
+    return migrated
+
+
+def reencode_plan_data(db: Session, codec_name: str, batch_size: int = BATCH_SIZE) -> int:
+    """Rewrite plan_data snapshots stored in any other format with a codec.
+
+    Plans are read and committed in small batches ordered by id, so the
+    command can run next to a live server. Rows that fail to decode are
+    logged and keep their format. Returns the number of plans re-encoded.
+    """
+    codec = get_codec(codec_name)
+    reencoded = 0
+    last_id = ""
+
+    while True:
+        saved_plans = db.exec(
+            select(SavedPlan)
+            .where(SavedPlan.id > last_id, SavedPlan.plan_data_format != codec.name)
+            .order_by(SavedPlan.id)
+            .limit(batch_size)
+        ).all()
+
+        if not saved_plans:
+            break
+        last_id = saved_plans[-1].id
+
+        for saved_plan in saved_plans:
+            try:
+                plan = decode_plan(saved_plan.plan_data_format, saved_plan.plan_data)
+            except Exception as e:
+                logger.error(f"Skipping plan {saved_plan.id} with invalid plan_data: {e}")
+                continue
+
+            saved_plan.plan_data = codec.encode(plan)
+            saved_plan.plan_data_format = codec.name
+            reencoded += 1
+
+        db.commit()
+
+    if reencoded:
+        logger.info(f"Re-encoded {reencoded} plans as {codec.name}")
+    return reencoded
+
+
+def backfill_progress(db: Session, recompute: bool = False, batch_size: int = BATCH_SIZE) -> int:
+    """Recompute the stored progress aggregates from the task rows.
+
+    By default only plans whose totals were never filled in (total_tasks
+    is 0) are touched, so the backfill is cheap to re-run on startup; pass
+    recompute=True to rebuild every plan. Returns the number of plans
+    updated.
+    """
+    week_total = (
+        select(func.count()).select_from(PlanTask)
+        .where(PlanTask.plan_id == PlanWeek.plan_id, PlanTask.week == PlanWeek.week)
+    )
+    plan_total = select(func.coalesce(func.sum(PlanWeek.total_tasks), 0)).where(PlanWeek.plan_id == SavedPlan.id)
+    plan_completed = select(func.coalesce(func.sum(PlanWeek.completed_tasks), 0)).where(PlanWeek.plan_id == SavedPlan.id)
+
+    updated = 0
+    last_id = ""
+
+    while True:
+        query = select(SavedPlan.id).where(
+            SavedPlan.id > last_id,
+            exists().where(PlanWeek.plan_id == SavedPlan.id)
+        )
+        if not recompute:
+            query = query.where(SavedPlan.total_tasks == 0)
+        plan_ids = db.exec(query.order_by(SavedPlan.id).limit(batch_size)).all()
+
+        if not plan_ids:
+            break
+        last_id = plan_ids[-1]
+
+        db.exec(
+            update(PlanWeek)
+            .where(PlanWeek.plan_id.in_(plan_ids))
+            .values(
+                total_tasks=week_total.scalar_subquery(),
+                completed_tasks=week_total.where(PlanTask.completed.is_(True)).scalar_subquery()
+            )
+        )
+        db.exec(
+            update(SavedPlan)
+            .where(SavedPlan.id.in_(plan_ids))
+            .values(
+                total_tasks=plan_total.scalar_subquery(),
+                completed_tasks=plan_completed.scalar_subquery()
+            )
+        )
+        db.commit()
+        updated += len(plan_ids)
+
+    if updated:
+        logger.info(f"Backfilled progress of {updated} plans")
+    return updated
+
+
+def create_search_index(engine: Engine) -> None:
+    """Create the plan_search full-text table in databases that predate it."""
+    if engine.dialect.name != "sqlite" or inspect(engine).has_table("plan_search"):
+        return
+    with engine.begin() as connection:
+        for statement in PLAN_SEARCH_DDL:
+            connection.execute(text(statement))
+    logger.info("Created the plan_search full-text index")
+
+
+def index_plans_for_search(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    """Add a search document for every plan that has none.
+
+    Returns the number of plans indexed.
+    """
+    indexed = 0
+    last_id = ""
+
+    while True:
+        plans = db.exec(UNINDEXED_PLANS, params={"after": last_id, "limit": batch_size}).all()
+        if not plans:
+            break
+        last_id = plans[-1].id
+
+        for plan in plans:
+            document = db.exec(INSERT_DOCUMENT, params={
+                "goal": plan.goal,
+                "overview": plan.overview or "",
+                "focus": plan.focus or "",
+                "tasks": plan.tasks or "",
+            })
+            db.exec(SET_SEARCH_ID, params={"search_id": document.lastrowid, "plan_id": plan.id})
+        db.commit()
+        indexed += len(plans)
+
+    if indexed:
+        logger.info(f"Indexed {indexed} plans for search")
+    return indexed
+
+
+def create_missing_indexes(engine: Engine) -> None:
+    """Create indexes declared on models that predate their table.
+
+    `create_all` only builds indexes together with new tables, so indexes
+    added to existing tables have to be created separately.
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def add_missing_columns(engine: Engine) -> None:
+    """Add columns declared on models that predate their table.
+
+    Only columns that are nullable or have a server default can be added
+    to a populated table; anything else is logged and left alone.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if column.server_default is None and not column.nullable:
+                    logger.error(f"Cannot add required column {table.name}.{column.name} without a default")
+                    continue
+
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    if not default.lstrip("-").isdigit():
+                        default = "'" + default.replace("'", "''") + "'"
+                    ddl += f" NOT NULL DEFAULT {default}"
+                connection.execute(text(ddl))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+
+def run_migrations(engine: Engine) -> None:
+    """Apply all schema and data migrations."""
+    add_missing_columns(engine)
+    create_missing_indexes(engine)
+    create_search_index(engine)
+
+    with Session(engine) as db:
+        migrate_to_normalized_layout(db)
+        backfill_progress(db)
+        index_plans_for_search(db)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from backend.db.session import create_db_and_tables, engine
+
+    arg_parser = argparse.ArgumentParser(description="Run schema and data migrations.")
+    arg_parser.add_argument("--recompute-progress", action="store_true",
+                            help="rebuild the progress aggregates of every plan")
+    arg_parser.add_argument("--reencode-plan-data", metavar="CODEC", choices=list(CODECS),
+                            help="rewrite stored plan_data snapshots with this codec")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    create_db_and_tables()
+    run_migrations(engine)
+    if args.recompute_progress:
+        with Session(engine) as db:
+            backfill_progress(db, recompute=True)
+    if args.reencode_plan_data:
+        with Session(engine) as db:
+            reencode_plan_data(db, args.reencode_plan_data)
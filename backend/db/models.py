@@ -1,11 +1,32 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Union
 
+from sqlalchemy import DDL, Index, LargeBinary, TypeDecorator, event
 from sqlmodel import Field, SQLModel
 
 
+class PlanDataType(TypeDecorator):
+    """Binary column for plan_data that also accepts text.
+
+    Text snapshots are stored as UTF-8. Rows written as text before the
+    column was binary are read back as str; every codec decodes either.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return value.encode() if isinstance(value, str) else value
+
+
 class SavedPlan(SQLModel, table=True):
     __tablename__ = "health_plans"
+    __table_args__ = (
+        # Keyset pagination of summaries, newest first
+        Index("ix_health_plans_created_at_id", "created_at", "id"),
+        # Maps full-text hits back to their plan
+        Index("ix_health_plans_search_id", "search_id", unique=True),
+    )
 
     id: str = Field(primary_key=True)
     goal: str
@@ -13,5 +34,84 @@ class SavedPlan(SQLModel, table=True):
     timeline: Optional[str] = None
     constraints: Optional[str] = None
     overview: Optional[str] = None
-    plan_data: str
+    # Snapshot of the plan as generated. Weeks and task state are served
+    # from the normalized `weeks` and `tasks` tables once a plan has rows
+    # there; legacy plans without them fall back to this document. Stored
+    # in the encoding named by plan_data_format.
+    plan_data: Union[str, bytes] = Field(sa_type=PlanDataType)
+    plan_data_format: str = Field(default="json", sa_column_kwargs={"server_default": "json"})
+    # Set when a structured generation broke off and the plan was finished
+    # from the weeks that were complete
+    partial: bool = Field(default=False, sa_column_kwargs={"server_default": "0"})
+    # Bumped on every change to the plan or its tasks; served as the ETag
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    # Progress aggregates, kept in step with the task rows on every write
+    total_tasks: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    completed_tasks: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    last_activity_at: Optional[datetime] = None
+    # Layout of the plan's week and task rows when the app wrote them; rows
+    # stamped with PLAN_SCHEMA_VERSION are served without validation
+    schema_version: Optional[int] = None
+    # Rowid of the plan's document in the plan_search full-text index
+    search_id: Optional[int] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# FTS5 index with one document per plan. Its rowids are referenced from
+# health_plans.search_id; unlike the implicit rowid of health_plans they
+# survive VACUUM. ORDER BY rank weighs goal matches highest.
+PLAN_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS plan_search USING fts5("
+    "goal, overview, focus, tasks, tokenize = 'porter unicode61')",
+    "INSERT INTO plan_search(plan_search, rank) VALUES ('rank', 'bm25(4.0, 2.0, 1.5, 1.0)')",
+)
+
+for _statement in PLAN_SEARCH_DDL:
+    event.listen(SavedPlan.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+class PlanWeek(SQLModel, table=True):
+    __tablename__ = "weeks"
+
+    plan_id: str = Field(foreign_key="health_plans.id", primary_key=True)
+    week: int = Field(primary_key=True)
+    focus: str
+    total_tasks: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    completed_tasks: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+
+class PlanTask(SQLModel, table=True):
+    __tablename__ = "tasks"
+
+    plan_id: str = Field(foreign_key="health_plans.id", primary_key=True)
+    id: str = Field(primary_key=True)
+    week: int
+    position: int
+    title: str
+    description: str
+    duration: str
+    completed: bool = False
+
+
+class CachedGeneration(SQLModel, table=True):
+    __tablename__ = "generation_cache"
+
+    key: str = Field(primary_key=True)
+    # JSON array of the plan events produced by the generation
+    events: str
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        index=True
+    )
+
+
+class GenerationCheckpoint(SQLModel, table=True):
+    __tablename__ = "generation_checkpoints"
+
+    plan_id: str = Field(primary_key=True)
+    goal: str
+    # JSON PlanBuilder snapshot: the overview and every completed week
+    state: str
+    # Number of SSE events the snapshot accounts for
+    event_count: int
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,156 @@
+"""Encodings of the plan_data snapshot, tagged per row by plan_data_format.
+
+Rows written before the tag existed hold plain JSON text and are tagged
+"json", so they keep decoding unchanged. zstd and msgpack are only
+available when their modules can be imported.
+"""
+import zlib
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+from backend.schemas.plan import GoalPlan, WeeklyPlan, WeeklyTask
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+PlanData = Union[str, bytes]
+
+
+class PlanCodec(ABC):
+    """Encodes plans for the plan_data column and decodes them back."""
+
+    name = ""
+
+    @abstractmethod
+    def encode(self, plan: GoalPlan) -> PlanData:
+        """Return the stored form of a plan."""
+
+    @abstractmethod
+    def decode(self, data: PlanData) -> GoalPlan:
+        """Return the plan a stored snapshot holds."""
+
+
+class JsonCodec(PlanCodec):
+    """Plain JSON text, the original format."""
+
+    name = "json"
+
+    def encode(self, plan: GoalPlan) -> PlanData:
+        return plan.model_dump_json()
+
+    def decode(self, data: PlanData) -> GoalPlan:
+        return GoalPlan.model_validate_json(data)
+
+
+class ZlibCodec(PlanCodec):
+    """zlib-compressed JSON."""
+
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        """Initialize"""
+        self.level = level
+
+    def encode(self, plan: GoalPlan) -> PlanData:
+        return zlib.compress(plan.model_dump_json().encode(), self.level)
+
+    def decode(self, data: PlanData) -> GoalPlan:
+        return GoalPlan.model_validate_json(zlib.decompress(data))
+
+
+class ZstdCodec(PlanCodec):
+    """zstd-compressed JSON."""
+
+    name = "zstd"
+
+    def encode(self, plan: GoalPlan) -> PlanData:
+        return zstd.compress(plan.model_dump_json().encode())
+
+    def decode(self, data: PlanData) -> GoalPlan:
+        return GoalPlan.model_validate_json(zstd.decompress(data))
+
+
+class MsgpackCodec(PlanCodec):
+    """msgpack of positional arrays instead of keyed objects.
+
+    Plans are validated when they are encoded, so decoding builds the
+    models with model_construct and skips validation.
+    """
+
+    name = "msgpack"
+
+    def encode(self, plan: GoalPlan) -> PlanData:
+        return msgpack.packb([
+            plan.id,
+            plan.goal,
+            plan.overview,
+            plan.created_at,
+            [
+                [
+                    week.week,
+                    week.focus,
+                    [
+                        [task.id, task.title, task.description, task.duration, task.completed]
+                        for task in week.tasks
+                    ]
+                ]
+                for week in plan.weeks
+            ]
+        ])
+
+    def decode(self, data: PlanData) -> GoalPlan:
+        plan_id, goal, overview, created_at, weeks = msgpack.unpackb(data)
+        return GoalPlan.model_construct(
+            id=plan_id,
+            goal=goal,
+            overview=overview,
+            created_at=created_at,
+            weeks=[
+                WeeklyPlan.model_construct(
+                    week=week,
+                    focus=focus,
+                    tasks=[
+                        WeeklyTask.model_construct(
+                            id=task_id,
+                            title=title,
+                            description=description,
+                            duration=duration,
+                            completed=completed
+                        )
+                        for task_id, title, description, duration, completed in tasks
+                    ]
+                )
+                for week, focus, tasks in weeks
+            ]
+        )
+
+
+CODECS: dict[str, PlanCodec] = {codec.name: codec for codec in [
+    JsonCodec(),
+    ZlibCodec(),
+    *([ZstdCodec()] if zstd is not None else []),
+    *([MsgpackCodec()] if msgpack is not None else []),
+]}
+
+
+def get_codec(name: str) -> PlanCodec:
+    """Return a codec by name, raising ValueError if it is unavailable."""
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Unknown or unavailable plan_data codec {name!r}; available: {', '.join(CODECS)}")
+    return codec
+
+
+def decode_plan(data_format: Optional[str], data: PlanData) -> GoalPlan:
+    """Decode a stored snapshot according to its format tag."""
+    return get_codec(data_format or JsonCodec.name).decode(data)
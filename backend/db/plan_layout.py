@@ -0,0 +1,161 @@
+"""Conversion between GoalPlan documents and the normalized plan tables."""
+import json
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any, Optional
+
+from backend.db.models import PlanTask, PlanWeek, SavedPlan
+from backend.schemas.plan import GoalPlan, PlanProgress, WeeklyPlan, WeeklyTask, WeekProgress
+
+# Version of the row layout written by plan_to_rows, stamped on plans as
+# schema_version. Bump it whenever GoalPlan or the plan tables change shape
+# so rows written under the old layout are validated again.
+PLAN_SCHEMA_VERSION = 1
+
+
+def plan_to_rows(plan: GoalPlan) -> tuple[list[PlanWeek], list[PlanTask]]:
+    """Split a plan into its week and task rows."""
+    weeks = []
+    tasks = []
+
+    for week in plan.weeks:
+        weeks.append(PlanWeek(
+            plan_id=plan.id,
+            week=week.week,
+            focus=week.focus,
+            total_tasks=len(week.tasks),
+            completed_tasks=sum(task.completed for task in week.tasks)
+        ))
+        for position, task in enumerate(week.tasks):
+            tasks.append(PlanTask(
+                plan_id=plan.id,
+                id=task.id,
+                week=week.week,
+                position=position,
+                title=task.title,
+                description=task.description,
+                duration=task.duration,
+                completed=task.completed
+            ))
+
+    return weeks, tasks
+
+
+def rows_to_plan(
+        saved_plan: SavedPlan,
+        weeks: Iterable[PlanWeek],
+        tasks: Iterable[PlanTask]
+) -> GoalPlan:
+    """Assemble a GoalPlan from its plan, week and task rows.
+
+    Rows may arrive in any order; weeks are sorted by number and tasks by
+    their position within the week.
+    """
+    weekly_plans = {
+        week.week: WeeklyPlan(week=week.week, focus=week.focus, tasks=[])
+        for week in sorted(weeks, key=lambda w: w.week)
+    }
+
+    for task in sorted(tasks, key=lambda t: (t.week, t.position)):
+        weekly_plans[task.week].tasks.append(WeeklyTask(
+            id=task.id,
+            title=task.title,
+            description=task.description,
+            duration=task.duration,
+            completed=task.completed
+        ))
+
+    return GoalPlan(
+        id=saved_plan.id,
+        goal=saved_plan.goal,
+        overview=saved_plan.overview,
+        weeks=list(weekly_plans.values()),
+        created_at=saved_plan.created_at.isoformat()
+    )
+
+
+def rows_to_document(
+        plan_row: Any,
+        week_rows: Iterable[tuple[int, str]],
+        task_rows: Iterable[tuple[int, str, str, str, str, bool]]
+) -> dict[str, Any]:
+    """Build a plan's JSON document directly from trusted rows.
+
+    The document has the keys and key order of a dumped GoalPlan, without
+    building any models. `plan_row` has id, goal, overview and created_at;
+    week rows are (week, focus) in week order and task rows are (week, id,
+    title, description, duration, completed) in week and position order.
+    """
+    weeks = {week: {"week": week, "focus": focus, "tasks": []} for week, focus in week_rows}
+    for week, task_id, title, description, duration, completed in task_rows:
+        weeks[week]["tasks"].append({
+            "id": task_id,
+            "title": title,
+            "description": description,
+            "duration": duration,
+            "completed": bool(completed),
+        })
+
+    return {
+        "id": plan_row.id,
+        "goal": plan_row.goal,
+        "overview": plan_row.overview,
+        "weeks": list(weeks.values()),
+        "created_at": plan_row.created_at.isoformat(),
+    }
+
+
+def dump_json(document: dict[str, Any]) -> bytes:
+    """Serialize a document compactly, as pydantic's model_dump_json does."""
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def rows_to_response_body(
+        plan_row: Any,
+        week_rows: Iterable[tuple[int, str]],
+        task_rows: Iterable[tuple[int, str, str, str, str, bool]]
+) -> bytes:
+    """Serialize a PlanResponse body directly from trusted rows.
+
+    Produces the same bytes as PlanResponse.model_dump_json().
+    """
+    return dump_json({"plan": rows_to_document(plan_row, week_rows, task_rows)})
+
+
+def percent_done(completed: int, total: int) -> int:
+    """Return the rounded share of completed tasks, 0 if there are none."""
+    return round(100 * completed / total) if total else 0
+
+
+def rows_to_progress(saved_plan: SavedPlan, weeks: Iterable[PlanWeek]) -> PlanProgress:
+    """Build a plan's progress from its stored aggregates."""
+    return PlanProgress(
+        plan_id=saved_plan.id,
+        total_tasks=saved_plan.total_tasks,
+        completed_tasks=saved_plan.completed_tasks,
+        percent=percent_done(saved_plan.completed_tasks, saved_plan.total_tasks),
+        last_activity_at=saved_plan.last_activity_at.isoformat() if saved_plan.last_activity_at else None,
+        weeks=[
+            WeekProgress(
+                week=week.week,
+                total_tasks=week.total_tasks,
+                completed_tasks=week.completed_tasks,
+                percent=percent_done(week.completed_tasks, week.total_tasks)
+            )
+            for week in sorted(weeks, key=lambda w: w.week)
+        ]
+    )
+
+
+def plan_to_progress(plan: GoalPlan, last_activity_at: Optional[datetime] = None) -> PlanProgress:
+    """Count a plan's progress from the plan itself."""
+    weeks, _ = plan_to_rows(plan)
+    saved_plan = SavedPlan(
+        id=plan.id,
+        goal=plan.goal,
+        plan_data="",
+        total_tasks=sum(week.total_tasks for week in weeks),
+        completed_tasks=sum(week.completed_tasks for week in weeks),
+        last_activity_at=last_activity_at
+    )
+    return rows_to_progress(saved_plan, weeks)
@@ -0,0 +1,139 @@
+"""Full-text search documents and queries over the plan_search FTS5 table."""
+import re
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String, text
+
+from backend.schemas.plan import GoalPlan
+
+# Longest query, in terms, that is passed on to FTS5
+MAX_QUERY_TERMS = 16
+
+# Snippets are built in Python for the returned page only; FTS5's
+# snippet() re-reads the long task column of every candidate
+SNIPPET_WORDS = 16
+SNIPPET_START = "**"
+SNIPPET_END = "**"
+
+INSERT_DOCUMENT = text(
+    "INSERT INTO plan_search (goal, overview, focus, tasks) "
+    "VALUES (:goal, :overview, :focus, :tasks)"
+)
+
+# Bulk imports assign rowids themselves, after their first write has taken
+# the database write lock, so they can insert documents with executemany
+INSERT_DOCUMENT_AT = text(
+    "INSERT INTO plan_search (rowid, goal, overview, focus, tasks) "
+    "VALUES (:search_id, :goal, :overview, :focus, :tasks)"
+)
+
+LAST_DOCUMENT_ID = text("SELECT coalesce(max(rowid), 0) FROM plan_search")
+
+DELETE_DOCUMENT = text("DELETE FROM plan_search WHERE rowid = :search_id")
+
+# Ranks only the newest :candidates matches: bm25 has to score every
+# candidate, which is what slows down terms found in most plans, while
+# FTS5 can stop walking a doclist in rowid order after the limit. Every
+# row carries the number of candidates, so callers can tell when the
+# limit cut off older matches.
+SEARCH = text(
+    "SELECT p.id, p.goal, p.overview, p.timeline, p.created_at, "
+    "s.goal AS document_goal, s.overview AS document_overview, s.focus, s.tasks, "
+    "hits.candidate_count "
+    "FROM ("
+    " SELECT id, rank, count(*) OVER () AS candidate_count FROM ("
+    "  SELECT rowid AS id, rank FROM plan_search WHERE plan_search MATCH :query "
+    "  ORDER BY rowid DESC LIMIT :candidates"
+    " ) ORDER BY rank LIMIT :limit OFFSET :offset"
+    ") AS hits "
+    "JOIN plan_search AS s ON s.rowid = hits.id "
+    "JOIN health_plans AS p ON p.search_id = hits.id "
+    "ORDER BY hits.rank"
+).columns(
+    id=String,
+    goal=String,
+    overview=String,
+    timeline=String,
+    created_at=DateTime,
+    document_goal=String,
+    document_overview=String,
+    focus=String,
+    tasks=String,
+    candidate_count=Integer
+)
+
+# Text of plans that have no document yet, assembled from their rows
+UNINDEXED_PLANS = text(
+    "SELECT p.id, p.goal, p.overview, "
+    "(SELECT group_concat(w.focus, ' ') FROM weeks AS w WHERE w.plan_id = p.id) AS focus, "
+    "(SELECT group_concat(t.title || ' ' || t.description, ' ') FROM tasks AS t "
+    " WHERE t.plan_id = p.id) AS tasks "
+    "FROM health_plans AS p "
+    "WHERE p.search_id IS NULL AND p.id > :after "
+    "ORDER BY p.id LIMIT :limit"
+).columns(id=String, goal=String, overview=String, focus=String, tasks=String)
+
+SET_SEARCH_ID = text("UPDATE health_plans SET search_id = :search_id WHERE id = :plan_id")
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_document(plan: GoalPlan) -> dict[str, str]:
+    """Return the indexed columns of a plan's document."""
+    return {
+        "goal": plan.goal,
+        "overview": plan.overview,
+        "focus": " ".join(week.focus for week in plan.weeks),
+        "tasks": " ".join(
+            f"{task.title} {task.description}"
+            for week in plan.weeks
+            for task in week.tasks
+        ),
+    }
+
+
+def query_terms(query: str) -> list[str]:
+    """Split free text into the terms that are searched for."""
+    return _TERM.findall(query)[:MAX_QUERY_TERMS]
+
+
+def match_query(terms: list[str]) -> str:
+    """Build an FTS5 query matching every term as a prefix.
+
+    Terms are quoted, so FTS5 operators and punctuation in user input are
+    matched literally instead of raising syntax errors.
+    """
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def snippet(columns: list[Optional[str]], terms: list[str]) -> str:
+    """Return a window of the first column containing a term, terms in bold.
+
+    Matching is by lowercase prefix, so words that only matched through
+    stemming fall back to the start of the first column.
+    """
+    prefixes = [term.lower() for term in terms]
+
+    def matches(word: str) -> bool:
+        word = word.lower().strip(".,;:!?()\"'")
+        return any(word.startswith(prefix) for prefix in prefixes)
+
+    texts = [column for column in columns if column]
+    if not texts:
+        return ""
+    for column in texts:
+        words = column.split()
+        first = next((i for i, word in enumerate(words) if matches(word)), None)
+        if first is not None:
+            break
+    else:
+        words, first = texts[0].split(), 0
+
+    start = max(0, first - SNIPPET_WORDS // 4)
+    window = [
+        f"{SNIPPET_START}{word}{SNIPPET_END}" if matches(word) else word
+        for word in words[start:start + SNIPPET_WORDS]
+    ]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + SNIPPET_WORDS < len(words) else ""
+    return prefix + " ".join(window) + suffix
@@ -0,0 +1,143 @@
+"""Streaming NDJSON export and bulk import of plans.
+
+Each line is a PlanExportRecord. Exports read plans through a server-side
+cursor and imports insert them in batches, so both run in memory bounded
+by the batch size rather than the number of plans.
+
+    python -m backend.db.plan_transfer export plans.ndjson
+    python -m backend.db.plan_transfer import plans.ndjson
+"""
+import logging
+from collections.abc import AsyncIterable, AsyncIterator
+
+from pydantic import ValidationError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.schemas.plan import PlanExportRecord, PlanImportResult
+
+logger = logging.getLogger(__name__)
+
+
+async def split_lines(chunks: AsyncIterable[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines.
+
+    Lines longer than max_line_bytes are yielded truncated to that size, so
+    they fail validation instead of growing the buffer without bound.
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        if skipping:
+            # Drop the rest of an oversized line
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            chunk = chunk[end + 1:]
+            skipping = False
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > max_line_bytes:
+            yield buffer[:max_line_bytes]
+            buffer = b""
+            skipping = True
+    if buffer:
+        yield buffer
+
+
+async def import_plans(
+        db: AsyncSession,
+        lines: AsyncIterable[bytes],
+        batch_size: int
+) -> PlanImportResult:
+    """Validate NDJSON plan records and insert them batch by batch.
+
+    Every batch commits on its own, so a failed batch does not undo the
+    ones before it. Blank lines are ignored; invalid lines are counted and
+    logged with their line number.
+    """
+    repository = PlanRepository(db)
+    result = PlanImportResult()
+    batch: list[PlanExportRecord] = []
+
+    async def flush() -> None:
+        counts = await repository.import_plans(batch)
+        if counts is None:
+            result.failed += len(batch)
+        else:
+            result.imported += counts[0]
+            result.skipped += counts[1]
+        batch.clear()
+
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            batch.append(PlanExportRecord.model_validate_json(line))
+        except ValidationError as e:
+            result.invalid += 1
+            logger.error(f"Skipping invalid plan record on line {line_number}: {e.error_count()} errors")
+            continue
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+    logger.info(
+        f"Imported {result.imported} plans ({result.skipped} skipped, "
+        f"{result.invalid} invalid, {result.failed} failed)"
+    )
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import sys
+
+    from backend.config import get_settings
+    from backend.db.session import AsyncSessionLocal, create_db_and_tables
+
+    settings = get_settings()
+
+    async def export_to(path: str) -> int:
+        count = 0
+        output = sys.stdout.buffer if path == "-" else open(path, "wb")
+        try:
+            async with AsyncSessionLocal() as db:
+                async for lines in PlanRepository(db).export_plans(settings.EXPORT_BATCH_SIZE):
+                    output.write(lines)
+                    count += lines.count(b"\n")
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+        logger.info(f"Exported {count} plans")
+        return 0
+
+    async def import_from(path: str) -> int:
+        async def file_chunks() -> AsyncIterator[bytes]:
+            with (sys.stdin.buffer if path == "-" else open(path, "rb")) as source:
+                while chunk := source.read(1 << 16):
+                    yield chunk
+
+        async with AsyncSessionLocal() as db:
+            result = await import_plans(
+                db,
+                split_lines(file_chunks(), settings.IMPORT_MAX_LINE_BYTES),
+                settings.IMPORT_BATCH_SIZE
+            )
+        return 1 if result.invalid or result.failed else 0
+
+    arg_parser = argparse.ArgumentParser(description="Export or import plans as NDJSON.")
+    arg_parser.add_argument("command", choices=["export", "import"])
+    arg_parser.add_argument("path", help="NDJSON file, or - for stdout/stdin")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    create_db_and_tables()
+    run = export_to if args.command == "export" else import_from
+    sys.exit(asyncio.run(run(args.path)))
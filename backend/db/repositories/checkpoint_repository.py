@@ -0,0 +1,56 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.db.models import GenerationCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointRepository:
+    """Partial plans of generations that are still streaming."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def save(self, plan_id: str, goal: str, state: dict, event_count: int) -> bool:
+        """Store the latest snapshot of a generation."""
+        try:
+            await self.db.merge(GenerationCheckpoint(
+                plan_id=plan_id,
+                goal=goal,
+                state=json.dumps(state),
+                event_count=event_count,
+                updated_at=datetime.now(timezone.utc).replace(tzinfo=None)
+            ))
+            await self.db.commit()
+            return True
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to checkpoint generation {plan_id}: {str(e)}")
+            return False
+
+    async def get(self, plan_id: str) -> Optional[GenerationCheckpoint]:
+        """Return the latest checkpoint of a generation."""
+        try:
+            return await self.db.get(GenerationCheckpoint, plan_id)
+        except Exception as e:
+            logger.error(f"Failed to read checkpoint {plan_id}: {str(e)}")
+            return None
+
+    async def delete(self, plan_id: str) -> bool:
+        """Drop the checkpoint of a generation that has ended."""
+        try:
+            checkpoint = await self.db.get(GenerationCheckpoint, plan_id)
+            if checkpoint is None:
+                return False
+            await self.db.delete(checkpoint)
+            await self.db.commit()
+            return True
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to delete checkpoint {plan_id}: {str(e)}")
+            return False
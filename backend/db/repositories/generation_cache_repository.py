@@ -0,0 +1,53 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.db.models import CachedGeneration
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationCacheRepository:
+    """Persistent tier of the generation cache."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, key: str, not_before: datetime) -> Optional[tuple[list[dict], float]]:
+        """Return cached events stored at or after not_before, and their age in seconds."""
+        try:
+            entry = await self.db.get(CachedGeneration, key)
+            if entry is None or entry.created_at < not_before:
+                return None
+            age = datetime.now(timezone.utc).replace(tzinfo=None) - entry.created_at
+            return json.loads(entry.events), age.total_seconds()
+        except Exception as e:
+            logger.error(f"Failed to read cached generation {key}: {str(e)}")
+            return None
+
+    async def put(self, key: str, events: list[dict], max_rows: int) -> bool:
+        """Store events under key and prune the oldest rows beyond max_rows."""
+        try:
+            await self.db.merge(CachedGeneration(
+                key=key,
+                events=json.dumps(events),
+                created_at=datetime.now(timezone.utc).replace(tzinfo=None)
+            ))
+
+            stale = (
+                select(CachedGeneration.key)
+                .order_by(CachedGeneration.created_at.desc())
+                .offset(max_rows)
+            )
+            await self.db.exec(delete(CachedGeneration).where(CachedGeneration.key.in_(stale)))
+            await self.db.commit()
+            return True
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to cache generation {key}: {str(e)}")
+            return False
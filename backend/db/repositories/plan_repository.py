@@ -1,12 +1,38 @@
-import json
 import logging
-from datetime import datetime
-from typing import Optional
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, bindparam, delete, insert, or_, update
+from sqlalchemy.orm import load_only
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from backend.db.models import SavedPlan
-from backend.schemas.plan import GoalPlan
+from backend.config import get_settings
+from backend.core.metrics import REPOSITORY_LATENCY, timed
+from backend.db.models import PlanTask, PlanWeek, SavedPlan
+from backend.db.plan_codec import decode_plan, get_codec
+from backend.db.plan_layout import (
+    PLAN_SCHEMA_VERSION,
+    dump_json,
+    plan_to_rows,
+    rows_to_document,
+    rows_to_plan,
+    rows_to_progress,
+    rows_to_response_body,
+)
+from backend.db.plan_search import (
+    DELETE_DOCUMENT,
+    INSERT_DOCUMENT,
+    INSERT_DOCUMENT_AT,
+    LAST_DOCUMENT_ID,
+    SEARCH,
+    SET_SEARCH_ID,
+    match_query,
+    search_document,
+    snippet,
+)
+from backend.schemas.plan import GoalPlan, PlanExportRecord, PlanProgress, PlanSearchHit, PlanSummary
 
 logger = logging.getLogger(__name__)
 
@@ -14,112 +40,581 @@ logger = logging.getLogger(__name__)
 class PlanRepository:
     """Plan Repository for  database operations."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def save(
+    @timed(REPOSITORY_LATENCY, "save")
+    async def save(
             self,
             plan: GoalPlan,
             current_level: str,
             timeline: str,
             constraints: Optional[str] = None,
-            user_id: Optional[str] = None
+            user_id: Optional[str] = None,
+            partial: bool = False
     ) -> bool:
         """Save a plan to the database."""
         try:
-            saved_plan = SavedPlan(
-                id=plan.id,
-                goal=plan.goal,
-                current_level=current_level,
-                timeline=timeline,
-                constraints=constraints or "",
-                overview=plan.overview,
-                plan_data=plan.model_dump_json(),
-                user_id=user_id,
-                created_at=datetime.fromisoformat(plan.created_at)
-            )
-            self.db.add(saved_plan)
-            self.db.commit()
+            await self.add_plan(plan, current_level, timeline, constraints, user_id, partial)
+            await self.db.commit()
             logger.info(f"Plan {plan.id} saved successfully")
             return True
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Failed to save plan {plan.id}: {str(e)}")
             return False
 
-    def update_task_status(self, plan_id: str, week_number: int,
-                           task_id: str, completed: bool) -> bool:
+    async def add_plan(
+            self,
+            plan: GoalPlan,
+            current_level: str,
+            timeline: str,
+            constraints: Optional[str] = None,
+            user_id: Optional[str] = None,
+            partial: bool = False
+    ) -> None:
+        """Stage a plan, its rows and its search document without committing."""
+        weeks, tasks = plan_to_rows(plan)
+        codec = get_codec(get_settings().PLAN_DATA_CODEC)
+        document = await self.db.exec(INSERT_DOCUMENT, params=search_document(plan))
+        saved_plan = SavedPlan(
+            id=plan.id,
+            goal=plan.goal,
+            current_level=current_level,
+            timeline=timeline,
+            constraints=constraints or "",
+            overview=plan.overview,
+            plan_data=codec.encode(plan),
+            plan_data_format=codec.name,
+            user_id=user_id,
+            partial=partial,
+            total_tasks=len(tasks),
+            completed_tasks=sum(task.completed for task in tasks),
+            schema_version=PLAN_SCHEMA_VERSION,
+            search_id=document.lastrowid,
+            created_at=datetime.fromisoformat(plan.created_at)
+        )
+        self.db.add(saved_plan)
+        # Flush the parent row first so the week/task foreign keys resolve
+        await self.db.flush()
+        self.db.add_all(weeks)
+        self.db.add_all(tasks)
+        await self.db.flush()
+
+    @timed(REPOSITORY_LATENCY, "update_task_status")
+    async def update_task_status(self, plan_id: str, week_number: int,
+                                 task_id: str, completed: bool) -> bool:
+        """Set a task's completion flag with a single indexed UPDATE."""
         try:
-            saved_plan = self.db.query(SavedPlan).filter(
-                SavedPlan.id == plan_id
-            ).with_for_update().first()
+            updated = await self.set_task_status(plan_id, week_number, task_id, completed)
+            await self.db.commit()
+            return updated
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to update task: {str(e)}")
+            return False
 
-            plan = GoalPlan.model_validate_json(saved_plan.plan_data)
+    async def set_task_status(self, plan_id: str, week_number: int,
+                              task_id: str, completed: bool) -> bool:
+        """Update a task in the current transaction without committing.
 
-            for week in plan.weeks:
-                if week.week == week_number:
-                    for task in week.tasks:
-                        if task.id == task_id:
-                            task.completed = completed
-                            saved_plan.plan_data = plan.model_dump_json()
-                            self.db.commit()
-                            return True
+        The progress aggregates and the plan version only change when the
+        flag actually flips. Returns whether the task exists.
+        """
+        task_filter = (
+            PlanTask.plan_id == plan_id,
+            PlanTask.id == task_id,
+            PlanTask.week == week_number
+        )
+        result = await self.db.exec(
+            update(PlanTask)
+            .where(*task_filter, PlanTask.completed != completed)
+            .values(completed=completed)
+        )
+        if result.rowcount != 1:
+            # Either missing or already in the requested state
+            return (await self.db.exec(select(PlanTask.id).where(*task_filter))).first() is not None
 
-            return False
+        delta = 1 if completed else -1
+        await self.db.exec(
+            update(PlanWeek)
+            .where(PlanWeek.plan_id == plan_id, PlanWeek.week == week_number)
+            .values(completed_tasks=PlanWeek.completed_tasks + delta)
+        )
+        await self.db.exec(
+            update(SavedPlan)
+            .where(SavedPlan.id == plan_id)
+            .values(
+                version=SavedPlan.version + 1,
+                completed_tasks=SavedPlan.completed_tasks + delta,
+                last_activity_at=datetime.now(timezone.utc)
+            )
+        )
+        return True
+
+    @timed(REPOSITORY_LATENCY, "update_task_statuses")
+    async def update_task_statuses(
+            self,
+            changes: List[tuple[str, int, str, bool]]
+    ) -> Optional[List[bool]]:
+        """Apply many (plan_id, week, task_id, completed) changes in one transaction.
+
+        The affected tasks are looked up with one query; tasks, weeks and
+        plans are then each updated with one executemany UPDATE, touching
+        only what actually changed. Returns whether each change matched a
+        task, in order, or None if the transaction failed.
+        """
+        plan_ids = {plan_id for plan_id, _, _, _ in changes}
+        task_ids = {task_id for _, _, task_id, _ in changes}
+        try:
+            rows = await self.db.exec(
+                select(PlanTask.plan_id, PlanTask.id, PlanTask.week, PlanTask.completed).where(
+                    PlanTask.plan_id.in_(plan_ids),
+                    PlanTask.id.in_(task_ids)
+                )
+            )
+            existing = {(row.plan_id, row.week, row.id): row.completed for row in rows}
+
+            matched = [(plan_id, week, task_id) in existing for plan_id, week, task_id, _ in changes]
+            # Later changes to the same task win
+            final = {
+                (plan_id, week, task_id): completed
+                for (plan_id, week, task_id, completed), found in zip(changes, matched)
+                if found
+            }
+            flipped = {key: completed for key, completed in final.items() if existing[key] != completed}
+
+            week_deltas = defaultdict(int)
+            plan_deltas = defaultdict(int)
+            for (plan_id, week, _), completed in flipped.items():
+                week_deltas[plan_id, week] += 1 if completed else -1
+                plan_deltas[plan_id] += 1 if completed else -1
+
+            if flipped:
+                tasks = PlanTask.__table__
+                await self.db.exec(
+                    update(tasks)
+                    .where(tasks.c.plan_id == bindparam("b_plan_id"), tasks.c.id == bindparam("b_task_id"))
+                    .values(completed=bindparam("b_completed")),
+                    params=[
+                        {"b_plan_id": plan_id, "b_task_id": task_id, "b_completed": completed}
+                        for (plan_id, _, task_id), completed in flipped.items()
+                    ]
+                )
+                weeks = PlanWeek.__table__
+                await self.db.exec(
+                    update(weeks)
+                    .where(weeks.c.plan_id == bindparam("b_plan_id"), weeks.c.week == bindparam("b_week"))
+                    .values(completed_tasks=weeks.c.completed_tasks + bindparam("b_delta")),
+                    params=[
+                        {"b_plan_id": plan_id, "b_week": week, "b_delta": delta}
+                        for (plan_id, week), delta in week_deltas.items()
+                    ]
+                )
+                plans = SavedPlan.__table__
+                await self.db.exec(
+                    update(plans)
+                    .where(plans.c.id == bindparam("b_plan_id"))
+                    .values(
+                        version=plans.c.version + 1,
+                        completed_tasks=plans.c.completed_tasks + bindparam("b_delta"),
+                        last_activity_at=datetime.now(timezone.utc)
+                    ),
+                    params=[{"b_plan_id": plan_id, "b_delta": delta} for plan_id, delta in plan_deltas.items()]
+                )
+            await self.db.commit()
+            return matched
         except Exception as e:
-            self.db.rollback()
-            logger.error(f"Failed to update task: {str(e)}")
-            return False
+            await self.db.rollback()
+            logger.error(f"Failed to update {len(changes)} tasks: {str(e)}")
+            return None
 
-    def get_by_id(self, plan_id: str) -> Optional[GoalPlan]:
+    async def get_by_id(self, plan_id: str) -> Optional[GoalPlan]:
         """Retrieve a plan by ID."""
+        loaded = await self.get_with_version(plan_id)
+        return loaded[0] if loaded else None
+
+    @timed(REPOSITORY_LATENCY, "get_by_id")
+    async def get_with_version(self, plan_id: str) -> Optional[tuple[GoalPlan, int]]:
+        """Retrieve a plan by ID together with its version."""
         try:
-            saved_plan = self.db.query(SavedPlan).filter(
-                SavedPlan.id == plan_id
-            ).first()
+            saved_plan = await self.db.get(SavedPlan, plan_id)
 
             if saved_plan:
-                return GoalPlan.model_validate_json(saved_plan.plan_data)
+                return (await self._load_plans([saved_plan]))[0], saved_plan.version
             return None
         except Exception as e:
             logger.error(f"Error retrieving plan {plan_id}: {str(e)}")
             return None
 
-    def list(self) -> list[GoalPlan]:
-        """List all saved plans."""
+    @timed(REPOSITORY_LATENCY, "get_body")
+    async def get_body_with_version(self, plan_id: str) -> Optional[tuple[bytes, int]]:
+        """Return a plan's serialized PlanResponse body and its version.
+
+        Reads only the columns of the response and serializes them without
+        building models, which is safe for rows the app wrote itself under
+        the current PLAN_SCHEMA_VERSION. Returns None for those that were
+        not, or do not exist; get_with_version validates them instead.
+        """
         try:
-            query = self.db.query(SavedPlan)
+            result = await self.db.exec(
+                select(SavedPlan.id, SavedPlan.goal, SavedPlan.overview, SavedPlan.created_at, SavedPlan.version)
+                .where(SavedPlan.id == plan_id, SavedPlan.schema_version == PLAN_SCHEMA_VERSION)
+            )
+            plan_row = result.first()
+            if plan_row is None:
+                return None
 
-            saved_plans = query.order_by(SavedPlan.created_at.desc()).all()
+            weeks = await self.db.exec(
+                select(PlanWeek.week, PlanWeek.focus)
+                .where(PlanWeek.plan_id == plan_id)
+                .order_by(PlanWeek.week)
+            )
+            tasks = await self.db.exec(
+                select(PlanTask.week, PlanTask.id, PlanTask.title, PlanTask.description,
+                       PlanTask.duration, PlanTask.completed)
+                .where(PlanTask.plan_id == plan_id)
+                .order_by(PlanTask.week, PlanTask.position)
+            )
+            return rows_to_response_body(plan_row, weeks.all(), tasks.all()), plan_row.version
+        except Exception as e:
+            logger.error(f"Error retrieving plan body {plan_id}: {str(e)}")
+            return None
 
-            # Convert to GoalPlan objects
-            plans = []
-            for saved_plan in saved_plans:
-                plan_data = json.loads(saved_plan.plan_data)
-                plans.append(GoalPlan(**plan_data))
+    @timed(REPOSITORY_LATENCY, "get_version")
+    async def get_version(self, plan_id: str) -> Optional[int]:
+        """Return a plan's version without loading the plan."""
+        try:
+            result = await self.db.exec(select(SavedPlan.version).where(SavedPlan.id == plan_id))
+            return result.first()
+        except Exception as e:
+            logger.error(f"Error retrieving version of plan {plan_id}: {str(e)}")
+            return None
+
+    @timed(REPOSITORY_LATENCY, "list_versions")
+    async def list_versions(self) -> Optional[List[tuple[str, int]]]:
+        """Return (id, version) of every plan, in list order."""
+        try:
+            result = await self.db.exec(
+                select(SavedPlan.id, SavedPlan.version).order_by(SavedPlan.created_at.desc())
+            )
+            return [(row.id, row.version) for row in result]
+        except Exception as e:
+            logger.error(f"Failed to list plan versions: {str(e)}")
+            return None
 
-            return plans
+    @timed(REPOSITORY_LATENCY, "get_progress")
+    async def get_progress(self, plan_id: str) -> Optional[PlanProgress]:
+        """Read a plan's stored progress aggregates without loading the plan."""
+        try:
+            saved_plan = (await self.db.exec(
+                select(SavedPlan)
+                .options(load_only(
+                    SavedPlan.id,
+                    SavedPlan.total_tasks,
+                    SavedPlan.completed_tasks,
+                    SavedPlan.last_activity_at
+                ))
+                .where(SavedPlan.id == plan_id)
+            )).first()
+            if saved_plan is None:
+                return None
+
+            weeks = await self.db.exec(select(PlanWeek).where(PlanWeek.plan_id == plan_id))
+            return rows_to_progress(saved_plan, weeks.all())
+        except Exception as e:
+            logger.error(f"Error retrieving progress of plan {plan_id}: {str(e)}")
+            return None
+
+    @timed(REPOSITORY_LATENCY, "list")
+    async def list(self) -> list[GoalPlan]:
+        """List all saved plans."""
+        try:
+            result = await self.db.exec(
+                select(SavedPlan).order_by(SavedPlan.created_at.desc())
+            )
+
+            return await self._load_plans(result.all())
 
         except Exception as e:
             logger.error(f"Failed to list plans: {str(e)}")
             return []
 
-    def delete(self, plan_id: str) -> bool:
+    @timed(REPOSITORY_LATENCY, "list_summaries")
+    async def list_summaries(
+            self,
+            limit: int,
+            after: Optional[tuple[datetime, str]] = None
+    ) -> List[PlanSummary]:
+        """List plan summaries newest first using keyset pagination.
+
+        `after` is the (created_at, id) of the last row of the previous
+        page. Only summary columns are selected; plan_data is never read.
+        """
+        query = select(
+            SavedPlan.id,
+            SavedPlan.goal,
+            SavedPlan.overview,
+            SavedPlan.timeline,
+            SavedPlan.created_at
+        )
+
+        if after is not None:
+            created_at, plan_id = after
+            query = query.where(or_(
+                SavedPlan.created_at < created_at,
+                and_(SavedPlan.created_at == created_at, SavedPlan.id < plan_id)
+            ))
+
+        try:
+            rows = await self.db.exec(
+                query.order_by(SavedPlan.created_at.desc(), SavedPlan.id.desc()).limit(limit)
+            )
+
+            return [
+                PlanSummary(
+                    id=row.id,
+                    goal=row.goal,
+                    overview=row.overview or "",
+                    timeline=row.timeline or "",
+                    created_at=row.created_at.isoformat()
+                )
+                for row in rows
+            ]
+        except Exception as e:
+            logger.error(f"Failed to list plan summaries: {str(e)}")
+            return []
+
+    @timed(REPOSITORY_LATENCY, "search")
+    async def search(
+            self,
+            terms: List[str],
+            limit: int,
+            offset: int = 0,
+            candidates: int = 1000
+    ) -> Tuple[List[PlanSearchHit], bool]:
+        """Return plans containing every term, best matches first.
+
+        Only the newest `candidates` matching plans are ranked, which keeps
+        terms that appear in most plans fast. The flag is set when that
+        limit was reached, so older matches may be missing from the ranking.
+        """
+        try:
+            rows = (await self.db.exec(SEARCH, params={
+                "query": match_query(terms),
+                "candidates": candidates,
+                "limit": limit,
+                "offset": offset
+            })).all()
+
+            hits = [
+                PlanSearchHit(
+                    id=row.id,
+                    goal=row.goal,
+                    overview=row.overview or "",
+                    timeline=row.timeline or "",
+                    created_at=row.created_at.isoformat(),
+                    snippet=snippet(
+                        [row.document_goal, row.document_overview, row.focus, row.tasks],
+                        terms
+                    )
+                )
+                for row in rows
+            ]
+            return hits, bool(rows) and rows[0].candidate_count >= candidates
+        except Exception as e:
+            logger.error(f"Failed to search plans for {terms}: {str(e)}")
+            return [], False
+
+    @timed(REPOSITORY_LATENCY, "delete")
+    async def delete(self, plan_id: str) -> bool:
         """Delete a plan by ID."""
         try:
-            plan = self.db.query(SavedPlan).filter(
-                SavedPlan.id == plan_id
-            ).first()
+            plan = await self.db.get(SavedPlan, plan_id)
 
             if plan:
-                self.db.delete(plan)
-                self.db.commit()
+                if plan.search_id is not None:
+                    await self.db.exec(DELETE_DOCUMENT, params={"search_id": plan.search_id})
+                await self.db.exec(delete(PlanTask).where(PlanTask.plan_id == plan_id))
+                await self.db.exec(delete(PlanWeek).where(PlanWeek.plan_id == plan_id))
+                await self.db.delete(plan)
+                await self.db.commit()
                 logger.info(f"Plan {plan_id} deleted successfully")
                 return True
 
             logger.warning(f"Plan {plan_id} not found for deletion")
             return False
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Error deleting plan {plan_id}: {str(e)}")
             return False
+
+    async def export_plans(self, batch_size: int) -> AsyncIterator[bytes]:
+        """Yield every plan as an NDJSON line of a PlanExportRecord, by id.
+
+        Plan rows come from a server-side cursor, batch_size rows at a time,
+        and each batch's weeks and tasks are read with one query each, so
+        memory is bounded by the batch however many plans there are. Rows
+        are trusted and serialized without models; legacy plans without
+        week rows are decoded from their plan_data.
+        """
+        try:
+            result = await self.db.stream(
+                select(
+                    SavedPlan.id, SavedPlan.goal, SavedPlan.overview, SavedPlan.created_at,
+                    SavedPlan.current_level, SavedPlan.timeline, SavedPlan.constraints,
+                    SavedPlan.partial
+                )
+                .order_by(SavedPlan.id)
+                .execution_options(yield_per=batch_size)
+            )
+            async for plan_rows in result.partitions():
+                plan_ids = [row.id for row in plan_rows]
+                weeks_by_plan = defaultdict(list)
+                tasks_by_plan = defaultdict(list)
+
+                weeks = await self.db.exec(
+                    select(PlanWeek.plan_id, PlanWeek.week, PlanWeek.focus)
+                    .where(PlanWeek.plan_id.in_(plan_ids))
+                    .order_by(PlanWeek.plan_id, PlanWeek.week)
+                )
+                for plan_id, week, focus in weeks:
+                    weeks_by_plan[plan_id].append((week, focus))
+                tasks = await self.db.exec(
+                    select(PlanTask.plan_id, PlanTask.week, PlanTask.id, PlanTask.title,
+                           PlanTask.description, PlanTask.duration, PlanTask.completed)
+                    .where(PlanTask.plan_id.in_(plan_ids))
+                    .order_by(PlanTask.plan_id, PlanTask.week, PlanTask.position)
+                )
+                for plan_id, *task in tasks:
+                    tasks_by_plan[plan_id].append(task)
+
+                lines = []
+                for row in plan_rows:
+                    if row.id in weeks_by_plan:
+                        document = rows_to_document(row, weeks_by_plan[row.id], tasks_by_plan[row.id])
+                    else:
+                        saved_plan = await self.db.get(SavedPlan, row.id)
+                        document = (await self._load_plans([saved_plan]))[0].model_dump(mode="json")
+                    lines.append(dump_json({
+                        "plan": document,
+                        "current_level": row.current_level,
+                        "timeline": row.timeline,
+                        "constraints": row.constraints,
+                        "partial": bool(row.partial),
+                    }) + b"\n")
+                yield b"".join(lines)
+        except Exception as e:
+            logger.error(f"Failed to export plans: {str(e)}")
+            raise
+
+    @timed(REPOSITORY_LATENCY, "import_plans")
+    async def import_plans(self, records: List[PlanExportRecord]) -> Optional[tuple[int, int]]:
+        """Insert a batch of validated plans in one transaction.
+
+        Plans, weeks, tasks and search documents are each written with one
+        executemany INSERT. Plans whose id already exists are skipped.
+        Returns (imported, skipped), or None if the transaction failed.
+        """
+        plan_ids = [record.plan.id for record in records]
+        try:
+            existing = set((await self.db.exec(select(SavedPlan.id).where(SavedPlan.id.in_(plan_ids)))).all())
+            new_records = {}
+            for record in records:
+                if record.plan.id not in existing:
+                    new_records.setdefault(record.plan.id, record)
+            if not new_records:
+                return 0, len(records)
+
+            codec = get_codec(get_settings().PLAN_DATA_CODEC)
+            plan_params, week_params, task_params = [], [], []
+            for record in new_records.values():
+                plan = record.plan
+                tasks = [task for week in plan.weeks for task in week.tasks]
+                plan_params.append({
+                    "id": plan.id,
+                    "goal": plan.goal,
+                    "current_level": record.current_level,
+                    "timeline": record.timeline,
+                    "constraints": record.constraints,
+                    "overview": plan.overview,
+                    "plan_data": codec.encode(plan),
+                    "plan_data_format": codec.name,
+                    "partial": record.partial,
+                    "total_tasks": len(tasks),
+                    "completed_tasks": sum(task.completed for task in tasks),
+                    "schema_version": PLAN_SCHEMA_VERSION,
+                    "created_at": datetime.fromisoformat(plan.created_at),
+                })
+                for week in plan.weeks:
+                    week_params.append({
+                        "plan_id": plan.id,
+                        "week": week.week,
+                        "focus": week.focus,
+                        "total_tasks": len(week.tasks),
+                        "completed_tasks": sum(task.completed for task in week.tasks),
+                    })
+                    for position, task in enumerate(week.tasks):
+                        task_params.append({
+                            "plan_id": plan.id,
+                            "id": task.id,
+                            "week": week.week,
+                            "position": position,
+                            "title": task.title,
+                            "description": task.description,
+                            "duration": task.duration,
+                            "completed": task.completed,
+                        })
+
+            await self.db.exec(insert(SavedPlan.__table__), params=plan_params)
+            await self.db.exec(insert(PlanWeek.__table__), params=week_params)
+            if task_params:
+                await self.db.exec(insert(PlanTask.__table__), params=task_params)
+
+            # The inserts above hold the write lock, so no other writer can
+            # take these rowids before the documents are inserted
+            last_id = (await self.db.exec(LAST_DOCUMENT_ID)).scalar_one()
+            documents = [
+                {"search_id": last_id + n, **search_document(record.plan)}
+                for n, record in enumerate(new_records.values(), start=1)
+            ]
+            await self.db.exec(INSERT_DOCUMENT_AT, params=documents)
+            await self.db.exec(SET_SEARCH_ID, params=[
+                {"search_id": document["search_id"], "plan_id": plan_id}
+                for plan_id, document in zip(new_records, documents)
+            ])
+
+            await self.db.commit()
+            return len(new_records), len(records) - len(new_records)
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to import {len(records)} plans: {str(e)}")
+            return None
+
+    async def _load_plans(self, saved_plans: List[SavedPlan]) -> List[GoalPlan]:
+        """Assemble plans from their normalized week and task rows.
+
+        Plans saved before the normalized layout existed have no week rows
+        and are decoded from their stored plan_data instead.
+        """
+        plan_ids = [saved_plan.id for saved_plan in saved_plans]
+        weeks_by_plan = defaultdict(list)
+        tasks_by_plan = defaultdict(list)
+
+        if plan_ids:
+            weeks = await self.db.exec(select(PlanWeek).where(PlanWeek.plan_id.in_(plan_ids)))
+            for week in weeks:
+                weeks_by_plan[week.plan_id].append(week)
+            tasks = await self.db.exec(select(PlanTask).where(PlanTask.plan_id.in_(plan_ids)))
+            for task in tasks:
+                tasks_by_plan[task.plan_id].append(task)
+
+        plans = []
+        for saved_plan in saved_plans:
+            weeks = weeks_by_plan.get(saved_plan.id)
+            if weeks:
+                plans.append(rows_to_plan(saved_plan, weeks, tasks_by_plan[saved_plan.id]))
+            else:
+                plans.append(decode_plan(saved_plan.plan_data_format, saved_plan.plan_data))
+
+        return plans
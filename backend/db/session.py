@@ -1,19 +1,91 @@
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, AsyncIterator, Generator
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, SQLModel
 from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from backend.config import get_settings
+from backend.config import Settings, get_settings
 
 settings = get_settings()
 
-connect_args = {"check_same_thread": False}  # for SQLite
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+
+def get_async_database_url(url: str) -> str:
+    """Swap a synchronous SQLite URL for its aiosqlite equivalent."""
+    parsed = make_url(url)
+    if parsed.drivername == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+def sqlite_pragmas(config: Settings) -> list[tuple[str, Any]]:
+    """Pragmas applied to each new connection for the tuned profile."""
+    return [
+        ("journal_mode", config.SQLITE_JOURNAL_MODE),
+        ("synchronous", config.SQLITE_SYNCHRONOUS),
+        ("mmap_size", config.SQLITE_MMAP_SIZE),
+        ("cache_size", config.SQLITE_CACHE_SIZE),
+        ("busy_timeout", config.SQLITE_BUSY_TIMEOUT_MS),
+    ]
+
+
+def engine_options(url: str, config: Settings) -> dict[str, Any]:
+    """Keyword arguments for create_engine under the configured profile."""
+    options: dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+
+    parsed = make_url(url)
+    is_file_sqlite = (
+        parsed.get_backend_name() == "sqlite"
+        and parsed.database not in (None, "", ":memory:")
+    )
+    if config.SQLITE_PROFILE == "tuned" and is_file_sqlite:
+        # In-memory databases use a static pool that takes no sizing
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+
+    return options
+
+
+def apply_storage_profile(engine: Engine, config: Settings) -> None:
+    """Apply the tuned SQLite pragmas whenever the pool opens a connection."""
+    if engine.dialect.name != "sqlite" or config.SQLITE_PROFILE != "tuned":
+        return
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# Synchronous engine for startup migrations and command-line tools
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, settings))
+apply_storage_profile(engine, settings)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=Session)
 
+# Asynchronous engine used by request handlers so commits never block the event loop
+async_database_url = get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(async_database_url, **engine_options(async_database_url, settings))
+apply_storage_profile(async_engine.sync_engine, settings)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
@@ -33,9 +105,7 @@ def get_db_context() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Dependency providing an async database session."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
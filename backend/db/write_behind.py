@@ -0,0 +1,216 @@
+"""Write-behind persistence with batched commits."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional, Union
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.config import get_settings
+from backend.core.metrics import REPOSITORY_LATENCY
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.db.session import AsyncSessionLocal
+from backend.schemas.plan import GoalPlan
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_BATCH_LATENCY = REPOSITORY_LATENCY.labels("write_behind_batch")
+
+
+@dataclass
+class _PlanSave:
+    plan: GoalPlan
+    current_level: str
+    timeline: str
+    constraints: Optional[str]
+    user_id: Optional[str]
+    done: asyncio.Future
+    partial: bool = False
+
+
+@dataclass
+class _TaskUpdate:
+    plan_id: str
+    week_number: int
+    task_id: str
+    completed: bool
+    done: asyncio.Future
+
+
+_Write = Union[_PlanSave, _TaskUpdate]
+
+
+class WriteBehindWriter:
+    """Queues plan inserts and task updates and commits them in batches.
+
+    A background task takes everything queued so far and applies it in one
+    transaction, so concurrent writers share a single SQLite commit. Plan
+    saves return as soon as they are queued; until they are committed,
+    get_pending_plan serves them so readers see their own writes. Task
+    updates wait for the commit of their batch and report whether the task
+    existed. The queue is bounded: writers wait when it is full.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession],
+            max_pending: int,
+            batch_size: int
+    ):
+        """Initialize"""
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.batches = 0
+        self.writes = 0
+        self._queue: asyncio.Queue[_Write] = asyncio.Queue(maxsize=max_pending)
+        self._pending_plans: dict[str, GoalPlan] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def save_plan(
+            self,
+            plan: GoalPlan,
+            current_level: str,
+            timeline: str,
+            constraints: Optional[str] = None,
+            user_id: Optional[str] = None,
+            partial: bool = False
+    ) -> asyncio.Future:
+        """Queue a plan insert and return a future for its outcome."""
+        self._ensure_running()
+        write = _PlanSave(plan, current_level, timeline, constraints, user_id, self._future(), partial)
+        self._pending_plans[plan.id] = plan
+        await self._queue.put(write)
+        return write.done
+
+    async def update_task_status(
+            self,
+            plan_id: str,
+            week_number: int,
+            task_id: str,
+            completed: bool
+    ) -> bool:
+        """Queue a task update and wait until its batch is committed."""
+        self._ensure_running()
+        pending = self._pending_plans.get(plan_id)
+        if pending is not None:
+            # Keep the uncommitted copy that readers see in step
+            for week in pending.weeks:
+                for task in week.tasks:
+                    if week.week == week_number and task.id == task_id:
+                        task.completed = completed
+
+        write = _TaskUpdate(plan_id, week_number, task_id, completed, self._future())
+        await self._queue.put(write)
+        return await write.done
+
+    def get_pending_plan(self, plan_id: str) -> Optional[GoalPlan]:
+        """Return a queued plan that is not committed yet."""
+        return self._pending_plans.get(plan_id)
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far is committed."""
+        if self._task is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush the queue and stop the background task."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    @staticmethod
+    def _future() -> asyncio.Future:
+        return asyncio.get_running_loop().create_future()
+
+    async def _run(self) -> None:
+        """Commit whatever has been queued, one batch at a time."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._apply(batch)
+            except Exception as e:
+                logger.error(f"Write-behind batch failed: {str(e)}")
+                for write in batch:
+                    if not write.done.done():
+                        write.done.set_result(False)
+            finally:
+                for write in batch:
+                    if isinstance(write, _PlanSave) and self._pending_plans.get(write.plan.id) is write.plan:
+                        del self._pending_plans[write.plan.id]
+                    self._queue.task_done()
+
+    async def _apply(self, batch: list[_Write]) -> None:
+        """Apply a batch in one transaction, or one by one if that fails."""
+        start = time.perf_counter()
+        async with self.session_factory() as db:
+            repository = PlanRepository(db)
+            try:
+                results = [await self._stage(repository, write) for write in batch]
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.warning(f"Batch of {len(batch)} writes failed, retrying one by one: {str(e)}")
+                results = [await self._apply_one(db, repository, write) for write in batch]
+
+        _BATCH_LATENCY.observe(time.perf_counter() - start)
+        self.batches += 1
+        self.writes += len(batch)
+        for write, result in zip(batch, results):
+            write.done.set_result(result)
+
+    async def _apply_one(self, db: AsyncSession, repository: PlanRepository, write: _Write) -> bool:
+        """Apply a single write in its own transaction."""
+        try:
+            result = await self._stage(repository, write)
+            await db.commit()
+            return result
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Write-behind write failed: {str(e)}")
+            return False
+
+    @staticmethod
+    async def _stage(repository: PlanRepository, write: _Write) -> bool:
+        """Stage one write in the current transaction."""
+        if isinstance(write, _PlanSave):
+            await repository.add_plan(
+                plan=write.plan,
+                current_level=write.current_level,
+                timeline=write.timeline,
+                constraints=write.constraints,
+                user_id=write.user_id,
+                partial=write.partial
+            )
+            return True
+        return await repository.set_task_status(
+            write.plan_id, write.week_number, write.task_id, write.completed
+        )
+
+
+@lru_cache()
+def get_write_behind() -> WriteBehindWriter:
+    """Get the process-wide write-behind writer."""
+    return WriteBehindWriter(
+        session_factory=AsyncSessionLocal,
+        max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+        batch_size=settings.WRITE_BEHIND_BATCH_SIZE
+    )
+
+
+async def close_write_behind() -> None:
+    """Flush and stop the process-wide writer if it was created."""
+    if get_write_behind.cache_info().currsize:
+        await get_write_behind().close()
+        get_write_behind.cache_clear()
@@ -1,12 +1,21 @@
+import asyncio
+import importlib
 import logging
+import sys
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from backend.api import routes
 from backend.config import get_settings
-from backend.db.session import create_db_and_tables
+from backend.core.generation_runs import get_generation_runs
+from backend.core.metrics import render_metrics
+from backend.db.migrations import run_migrations
+from backend.db.plan_codec import get_codec
+from backend.db.session import async_engine, create_db_and_tables, engine
+from backend.db.write_behind import close_write_behind
 
 # Logging
 logging.basicConfig(
@@ -16,19 +25,51 @@ logging.basicConfig(
 
 settings = get_settings()
 
+PLANNER_MODULE = "backend.core.planner"
+
+
+async def prewarm_planner() -> None:
+    """Import the planner stack off the event loop, then build the planner."""
+    try:
+        planner = await asyncio.to_thread(importlib.import_module, PLANNER_MODULE)
+        planner.get_planner()
+    except Exception as e:
+        # Nothing awaits the task until shutdown; the first generation
+        # retries the load and reports the error to its caller
+        logging.error(f"Failed to prewarm the planner: {str(e)}")
+        return
+    logging.info("Planner ready")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logging.info(f"Starting {settings.APP_NAME}")
     logging.info(f"Debug mode: {settings.DEBUG}")
 
+    # Fail fast on a plan_data codec whose module is not installed, which
+    # would otherwise make every plan save fail
+    get_codec(settings.PLAN_DATA_CODEC)
+
     # Migrate tables on startup
     create_db_and_tables()
+    run_migrations(engine)
+
+    # The planner (LLM client, connection pool, prompts) is slow to import,
+    # so it loads in the background while the app already serves reads; a
+    # generation that arrives first loads it itself
+    warmup = asyncio.create_task(prewarm_planner()) if settings.PLANNER_PREWARM else None
 
     yield
 
     # Shutdown
     logging.info(f"Shutting down {settings.APP_NAME}")
+    await get_generation_runs().cancel_all()
+    await close_write_behind()
+    if warmup is not None:
+        await asyncio.gather(warmup, return_exceptions=True)
+    if PLANNER_MODULE in sys.modules:
+        await sys.modules[PLANNER_MODULE].close_planner()
+    await async_engine.dispose()
 
 
 # App
@@ -62,6 +103,12 @@ def root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics, rendered on the event loop that updates them."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -56,6 +56,9 @@ class PlanCreate(BaseModel):
     constraints: Optional[str] = Field(None, max_length=1000,
                                        description="Any limitations or constraints")
     user_id: Optional[str] = Field(None, max_length=255)
+    output_mode: Optional[Literal["ndjson", "structured"]] = Field(
+        None, description="How the LLM returns the plan; defaults to LLM_OUTPUT_MODE"
+    )
 
 
 class PlanSummary(BaseModel):
@@ -71,11 +74,84 @@ class PlanSummary(BaseModel):
         from_attributes = True
 
 
+class PlanSummaryPage(BaseModel):
+    """A page of plan summaries with the cursor for the next page."""
+
+    items: list[PlanSummary]
+    next_cursor: Optional[str] = None
+
+
+class PlanSearchHit(PlanSummary):
+    """A plan matching a search, with the best matching passage."""
+
+    snippet: str
+
+
+class PlanSearchPage(BaseModel):
+    """A page of search hits with the cursor for the next page."""
+
+    items: list[PlanSearchHit]
+    next_cursor: Optional[str] = None
+    # Set when the matches reached SEARCH_MAX_CANDIDATES; only the newest
+    # that many were ranked, so older matches may be missing
+    truncated: bool = False
+
+
 class TaskStatusUpdate(BaseModel):
     """Schema for updating task completion status."""
     completed: bool
 
 
+class TaskStatusChange(BaseModel):
+    """One task completion change in a batch."""
+
+    plan_id: str
+    week: int = Field(..., ge=1, le=52)
+    task_id: str
+    completed: bool
+
+
+class TaskStatusBatch(BaseModel):
+    """Schema for updating many tasks, possibly across plans, at once."""
+
+    updates: list[TaskStatusChange] = Field(..., min_length=1)
+
+
+class TaskStatusResult(BaseModel):
+    """Outcome of one change in a batch."""
+
+    plan_id: str
+    week: int
+    task_id: str
+    updated: bool
+
+
+class TaskStatusBatchResponse(BaseModel):
+    """Per-change results of a batch, in request order."""
+
+    results: list[TaskStatusResult]
+
+
+class WeekProgress(BaseModel):
+    """Completion counts of one week."""
+
+    week: int
+    total_tasks: int
+    completed_tasks: int
+    percent: int
+
+
+class PlanProgress(BaseModel):
+    """Completion counts of a plan and each of its weeks."""
+
+    plan_id: str
+    total_tasks: int
+    completed_tasks: int
+    percent: int
+    last_activity_at: Optional[str] = None
+    weeks: list[WeekProgress]
+
+
 class PlanResponse(BaseModel):
     """Response schema for plan retrieval."""
 
@@ -85,6 +161,25 @@ class PlanResponse(BaseModel):
         from_attributes = True
 
 
+class PlanExportRecord(BaseModel):
+    """One line of an NDJSON plan export, and of a bulk import."""
+
+    plan: GoalPlan
+    current_level: Optional[str] = None
+    timeline: Optional[str] = None
+    constraints: Optional[str] = None
+    partial: bool = False
+
+
+class PlanImportResult(BaseModel):
+    """Counts of a bulk plan import."""
+
+    imported: int = 0
+    skipped: int = Field(0, description="Plans whose id already exists")
+    invalid: int = Field(0, description="Lines that are not valid plan records")
+    failed: int = Field(0, description="Plans in batches that could not be written")
+
+
 class StreamEvent(BaseModel):
     """Base schema for streaming events."""
 
@@ -1,58 +1,341 @@
 """Service layer for plan operations."""
+import base64
+import hashlib
+import json
 import logging
-from typing import AsyncIterator, Optional, List
+import time
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Optional, List
 
-from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from backend.core.planner import HealthPlannerAI
+from backend.config import get_settings
+from backend.core.generation_cache import get_generation_cache, replay_events
+from backend.core.generation_runs import get_generation_runs
+from backend.core.metrics import GENERATION_QUEUE_WAIT, GENERATIONS, PLAN_LOADS
+from backend.core.plan_builder import plan_events
+from backend.core.plan_cache import CachedPlan, PlanCache, get_plan_cache
+from backend.core.scheduler import GenerationTicket, get_generation_scheduler
+from backend.core.single_flight import get_single_flight
+from backend.db.repositories.checkpoint_repository import CheckpointRepository
+from backend.db.repositories.generation_cache_repository import GenerationCacheRepository
+from backend.db.plan_layout import plan_to_progress
+from backend.db.plan_search import query_terms
+from backend.db.plan_transfer import import_plans, split_lines
 from backend.db.repositories.plan_repository import PlanRepository
-from backend.schemas.plan import GoalPlan, PlanCreate, PlanResponse
+from backend.db.write_behind import WriteBehindWriter, get_write_behind
+from backend.schemas.plan import (
+    GoalPlan, PlanCreate, PlanImportResult, PlanProgress, PlanResponse, PlanSearchPage, PlanSummary, PlanSummaryPage, TaskStatusBatchResponse,
+    TaskStatusChange, TaskStatusResult, WeeklyPlan
+)
 
+if TYPE_CHECKING:
+    # Imported on first use: the planner pulls in langchain and the OpenAI SDK
+    from backend.core.planner import HealthPlannerAI
+
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
+_PASSTHROUGH_LOADS = PLAN_LOADS.labels("passthrough")
+_VALIDATED_LOADS = PLAN_LOADS.labels("validated")
+
+
+def encode_cursor(summary: PlanSummary) -> str:
+    """Encode the position after a summary as an opaque cursor token."""
+    raw = f"{summary.created_at}|{summary.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor token into its (created_at, id) position."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, plan_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), plan_id
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def plan_etag(version: int) -> str:
+    """Return the ETag of a plan at a version."""
+    return f'"{version}"'
+
+
+def collection_etag(versions: List[tuple[str, int]]) -> str:
+    """Return an ETag that changes whenever any listed plan changes."""
+    digest = hashlib.blake2b(digest_size=16)
+    for plan_id, version in versions:
+        digest.update(f"{plan_id}:{version}\n".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return whether an If-None-Match header matches an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def format_event(plan_id: str, seq: int, sse_event: str) -> str:
+    """Prefix an SSE event with its id within a generation."""
+    return f"id: {plan_id}:{seq}\n{sse_event}"
+
+
+def parse_event_id(plan_id: str, event_id: Optional[str]) -> int:
+    """Return the sequence number of an event id, 0 if there is none."""
+    if not event_id:
+        return 0
+    event_plan_id, _, seq = event_id.rpartition(":")
+    if event_plan_id != plan_id or not seq.isdigit():
+        raise ValueError(f"Invalid event id for generation {plan_id}: {event_id}")
+    return int(seq)
+
 
 class PlanService:
     """Service for managing health plans."""
 
-    def __init__(self, db: Session):
+    def __init__(
+            self,
+            db: AsyncSession,
+            planner: Optional["HealthPlannerAI"] = None,
+            writer: Optional[WriteBehindWriter] = None
+    ):
         """Initialize"""
         self.db = db
-        self.planner = HealthPlannerAI()
+        self._planner = planner
+        self.writer = writer or (get_write_behind() if settings.WRITE_BEHIND_ENABLED else None)
+        self.plan_cache: Optional[PlanCache] = get_plan_cache() if settings.PLAN_CACHE_ENABLED else None
         self.repository = PlanRepository(db)
+        self.cache = get_generation_cache()
+        self.cache_repository = GenerationCacheRepository(db)
+
+    @property
+    def planner(self) -> "HealthPlannerAI":
+        """The shared planner, imported and built on first use.
+
+        Requests that only read plans never load the LLM stack.
+        """
+        if self._planner is None:
+            from backend.core.planner import get_planner
+            self._planner = get_planner()
+        return self._planner
+
+    async def start_generation(
+            self,
+            plan_request: PlanCreate,
+            use_cache: bool = True,
+            user_key: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Admit a generation, start it in the background and follow it.
+
+        Cache hits and joins of an identical in-flight generation start no
+        new LLM stream and bypass the scheduler. Anything else takes a
+        scheduler ticket; raises GenerationQueueFull when none is available.
+        The generation keeps running if the client disconnects, and
+        resume_generation picks it up again.
+        """
+        key = self.planner.request_key(
+            goal=plan_request.goal,
+            current_level=plan_request.current_level,
+            timeline=plan_request.timeline,
+            constraints=plan_request.constraints or "",
+            output_mode=plan_request.output_mode
+        )
+
+        cached_events = None
+        if settings.GENERATION_CACHE_ENABLED and use_cache:
+            cached_events = await self.cache.get(key, self.cache_repository)
+
+        ticket = None
+        joins_flight = settings.SINGLE_FLIGHT_ENABLED and get_single_flight().is_running(key)
+        if cached_events is None and not joins_flight:
+            ticket = get_generation_scheduler().enqueue(
+                plan_request.user_id or user_key or "anonymous"
+            )
+
+        plan_id = str(uuid.uuid4())
+        run = get_generation_runs().start(
+            plan_id,
+            self._run_generation(plan_id, plan_request, key, cached_events, ticket)
+        )
+        return run.follow()
 
     async def generate_and_save_plan(
             self,
-            plan_request: PlanCreate
+            plan_request: PlanCreate,
+            use_cache: bool = True
     ) -> AsyncIterator[str]:
-        """Stream plan."""
-        plan_to_save: Optional[GoalPlan] = None
-
-        async for sse_event, plan in self.planner.generate_plan_streaming(
-                goal=plan_request.goal,
-                current_level=plan_request.current_level,
-                timeline=plan_request.timeline,
-                constraints=plan_request.constraints or ""
-        ):
+        """Stream plan.
+
+        Identical requests are replayed from the generation cache. With
+        use_cache=False the lookup is skipped and the entry is refreshed.
+        """
+        async for sse_event in await self.start_generation(plan_request, use_cache):
             yield sse_event
 
-            # If final event assign the plan to save
-            if plan:
-                plan_to_save = plan
-
-        # Save the plan
-        if plan_to_save:
-            success = self.repository.save(
-                plan=plan_to_save,
-                current_level=plan_request.current_level,
-                timeline=plan_request.timeline,
-                constraints=plan_request.constraints,
-                user_id=plan_request.user_id
-            )
+    async def resume_generation(
+            self,
+            plan_id: str,
+            last_event_id: Optional[str] = None
+    ) -> Optional[AsyncIterator[str]]:
+        """Stream the events of a generation after last_event_id.
+
+        A running or recently finished generation is followed live. Older
+        ones are replayed from the saved plan or, if the generation was
+        interrupted, from its last checkpoint. Returns None for unknown
+        plans and raises ValueError for an id from another generation.
+        """
+        after = parse_event_id(plan_id, last_event_id)
+
+        run = get_generation_runs().get(plan_id)
+        if run is not None:
+            return run.follow(after)
+
+        plan = await self.repository.get_by_id(plan_id)
+        if plan is not None:
+            events = plan_events(plan.overview, plan.weeks)
+            events.append({"type": "done", "plan_id": plan_id})
+            return self._replay(plan_id, events, after)
+
+        checkpoint = await CheckpointRepository(self.db).get(plan_id)
+        if checkpoint is not None:
+            state = json.loads(checkpoint.state)
+            weeks = [WeeklyPlan.model_validate(week) for week in state["weeks"]]
+            events = plan_events(state["overview"], weeks)
+            events.append({"type": "error", "message": "Generation was interrupted"})
+            return self._replay(plan_id, events, after)
+
+        return None
+
+    async def _replay(self, plan_id: str, events: list[dict], after: int) -> AsyncIterator[str]:
+        """Stream numbered events after the given sequence number."""
+        for seq, event in enumerate(events, start=1):
+            if seq > after:
+                yield format_event(plan_id, seq, self.planner.sse(event))
+
+    async def _run_generation(
+            self,
+            plan_id: str,
+            plan_request: PlanCreate,
+            key: str,
+            cached_events: Optional[list[dict]],
+            ticket: Optional[GenerationTicket]
+    ) -> AsyncIterator[tuple[Optional[int], str]]:
+        """Wait for admission, then stream the plan, checkpoint and save it.
+
+        Yields (sequence number, SSE event) pairs; queue positions are not
+        numbered. Runs detached from the request, so it uses its own session.
+        """
+        async with AsyncSession(self.db.bind, expire_on_commit=False, autoflush=False) as db:
+            repository = PlanRepository(db)
+            cache_repository = GenerationCacheRepository(db)
+            checkpoints = CheckpointRepository(db)
+
+            async def checkpoint(state: dict, event_count: int) -> None:
+                await checkpoints.save(plan_id, plan_request.goal, state, event_count)
+
+            try:
+                if ticket is not None:
+                    wait_start = time.perf_counter()
+                    async for position in ticket.wait():
+                        yield None, self.planner.sse({"type": "queued", "position": position})
+                    GENERATION_QUEUE_WAIT.observe(time.perf_counter() - wait_start)
 
-            if not success:
-                logger.error(f"Failed to save plan {plan_to_save.id}")
-            else:
-                logger.info(f"Plan {plan_to_save.id} saved successfully")
+                plan_to_save: Optional[GoalPlan] = None
+                cache_enabled = settings.GENERATION_CACHE_ENABLED
+                recorded_events: list[dict] = []
+                # Only the request that starts the upstream stream fills the cache
+                is_leader = cached_events is None
+
+                def upstream() -> AsyncIterator[dict]:
+                    return self.planner.stream_events(
+                        goal=plan_request.goal,
+                        current_level=plan_request.current_level,
+                        timeline=plan_request.timeline,
+                        constraints=plan_request.constraints or "",
+                        output_mode=plan_request.output_mode
+                    )
+
+                if cached_events is not None:
+                    events = replay_events(cached_events)
+                elif settings.SINGLE_FLIGHT_ENABLED:
+                    single_flight = get_single_flight()
+                    is_leader = not single_flight.is_running(key)
+                    if not is_leader and ticket is not None:
+                        # An identical generation started while we waited; share it
+                        ticket.release()
+                    events = self._record(single_flight.subscribe(key, upstream), recorded_events)
+                else:
+                    events = self._record(upstream(), recorded_events)
+
+                GENERATIONS.labels(
+                    "cache" if cached_events is not None else "llm" if is_leader else "shared"
+                ).inc()
+
+                seq = 0
+                async for sse_event, plan in self.planner.build_plan_streaming(
+                        plan_request.goal, events, plan_id=plan_id, checkpoint=checkpoint):
+                    seq += 1
+                    yield seq, format_event(plan_id, seq, sse_event)
+
+                    # If final event assign the plan to save
+                    if plan:
+                        plan_to_save = plan
+
+                if ticket is not None:
+                    # The LLM stream is over; saving does not need the slot
+                    ticket.release()
+
+                # A plan finished from a broken-off output is saved but never
+                # replayed to identical requests
+                partial = bool(recorded_events) and bool(recorded_events[-1].get("partial"))
+
+                if plan_to_save and cache_enabled and is_leader and not partial:
+                    await self.cache.put(key, recorded_events, cache_repository)
+
+                # Save the plan
+                if plan_to_save and self.writer:
+                    await self.writer.save_plan(
+                        plan=plan_to_save,
+                        current_level=plan_request.current_level,
+                        timeline=plan_request.timeline,
+                        constraints=plan_request.constraints,
+                        user_id=plan_request.user_id,
+                        partial=partial
+                    )
+                    logger.info(f"Plan {plan_to_save.id} queued for saving")
+                elif plan_to_save:
+                    success = await repository.save(
+                        plan=plan_to_save,
+                        current_level=plan_request.current_level,
+                        timeline=plan_request.timeline,
+                        constraints=plan_request.constraints,
+                        user_id=plan_request.user_id,
+                        partial=partial
+                    )
+
+                    if not success:
+                        logger.error(f"Failed to save plan {plan_to_save.id}")
+                    else:
+                        logger.info(f"Plan {plan_to_save.id} saved successfully")
+
+                # Finished either way; only interrupted runs keep a checkpoint
+                await checkpoints.delete(plan_id)
+            finally:
+                if ticket is not None:
+                    ticket.release()
+
+    @staticmethod
+    async def _record(events: AsyncIterator[dict], sink: list[dict]) -> AsyncIterator[dict]:
+        """Pass events through while collecting them into sink."""
+        try:
+            async for event in events:
+                sink.append(event)
+                yield event
+        finally:
+            await events.aclose()
 
     async def update_task_status(
             self,
@@ -62,21 +345,187 @@ class PlanService:
             completed: bool
     ) -> bool:
         """Update the completion status of a task."""
-        return self.repository.update_task_status(
-            plan_id=plan_id,
-            week_number=week_number,
-            task_id=task_id,
-            completed=completed
-        )
+        if self.writer:
+            updated = await self.writer.update_task_status(
+                plan_id=plan_id,
+                week_number=week_number,
+                task_id=task_id,
+                completed=completed
+            )
+        else:
+            updated = await self.repository.update_task_status(
+                plan_id=plan_id,
+                week_number=week_number,
+                task_id=task_id,
+                completed=completed
+            )
+
+        self._invalidate(plan_id)
+        return updated
+
+    async def update_task_statuses(
+            self,
+            changes: List[TaskStatusChange]
+    ) -> Optional[TaskStatusBatchResponse]:
+        """Apply a batch of task changes in one transaction.
+
+        Raises ValueError if the batch is too large; returns None if it
+        could not be applied.
+        """
+        if len(changes) > settings.TASK_BATCH_MAX_UPDATES:
+            raise ValueError(
+                f"At most {settings.TASK_BATCH_MAX_UPDATES} task updates are allowed per batch"
+            )
+
+        if self.writer:
+            # Queued plans must be committed before their tasks can be updated
+            await self.writer.flush()
+
+        updated = await self.repository.update_task_statuses([
+            (change.plan_id, change.week, change.task_id, change.completed)
+            for change in changes
+        ])
+        self._invalidate(*{change.plan_id for change in changes})
+        if updated is None:
+            return None
 
-    def get_plan(self, plan_id: str) -> Optional[GoalPlan]:
+        return TaskStatusBatchResponse(results=[
+            TaskStatusResult(
+                plan_id=change.plan_id,
+                week=change.week,
+                task_id=change.task_id,
+                updated=found
+            )
+            for change, found in zip(changes, updated)
+        ])
+
+    async def get_plan(self, plan_id: str) -> Optional[GoalPlan]:
         """Retrieve a plan by ID."""
-        return self.repository.get_by_id(plan_id)
+        cached = self.get_cached_plan(plan_id) or await self.load_plan(plan_id)
+        return cached.plan if cached else None
+
+    def get_cached_plan(self, plan_id: str) -> Optional[CachedPlan]:
+        """Return a plan from the plan cache without any I/O."""
+        return self.plan_cache.get(plan_id) if self.plan_cache else None
+
+    async def load_plan(self, plan_id: str) -> Optional[CachedPlan]:
+        """Load a plan from the database and fill the plan cache with it."""
+        if self.writer:
+            # Read your own writes while a saved plan is still queued
+            pending = self.writer.get_pending_plan(plan_id)
+            if pending is not None:
+                return CachedPlan.build(pending, etag=None)
+
+        token = self.plan_cache.token() if self.plan_cache else 0
+        # Rows the app wrote itself are serialized as they are; anything
+        # else is validated into a GoalPlan first
+        passthrough = await self.repository.get_body_with_version(plan_id)
+        if passthrough is not None:
+            body, version = passthrough
+            cached = CachedPlan(plan_etag(version), body)
+            _PASSTHROUGH_LOADS.inc()
+        else:
+            loaded = await self.repository.get_with_version(plan_id)
+            if loaded is None:
+                return None
+
+            plan, version = loaded
+            cached = CachedPlan.build(plan, plan_etag(version))
+            _VALIDATED_LOADS.inc()
+        if self.plan_cache:
+            self.plan_cache.put(plan_id, cached, token)
+        return cached
 
-    def list_plans(self) -> list[GoalPlan]:
+    async def get_progress(self, plan_id: str) -> Optional[PlanProgress]:
+        """Return a plan's completion counts from the stored aggregates."""
+        if self.writer:
+            pending = self.writer.get_pending_plan(plan_id)
+            if pending is not None:
+                return plan_to_progress(pending)
+        return await self.repository.get_progress(plan_id)
+
+    async def get_plan_etag(self, plan_id: str) -> Optional[str]:
+        """Return a plan's ETag without loading it, None if there is none."""
+        if self.writer and self.writer.get_pending_plan(plan_id) is not None:
+            # Uncommitted plans have no stable version yet
+            return None
+        version = await self.repository.get_version(plan_id)
+        return plan_etag(version) if version is not None else None
+
+    async def get_plans_etag(self) -> Optional[str]:
+        """Return the ETag of the plan list without loading any plan."""
+        versions = await self.repository.list_versions()
+        return collection_etag(versions) if versions is not None else None
+
+    async def list_plans(self) -> list[GoalPlan]:
         """List plans."""
-        return self.repository.list()
+        return await self.repository.list()
+
+    async def list_plan_summaries(
+            self,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None
+    ) -> PlanSummaryPage:
+        """List a page of plan summaries, newest first."""
+        limit = min(limit or settings.PLANS_PAGE_SIZE, settings.PLANS_MAX_PAGE_SIZE)
+        after = decode_cursor(cursor) if cursor else None
 
-    def delete_plan(self, plan_id: str) -> bool:
+        # Fetch one extra row to know whether another page follows
+        summaries = await self.repository.list_summaries(limit + 1, after)
+        if len(summaries) > limit:
+            summaries = summaries[:limit]
+            return PlanSummaryPage(items=summaries, next_cursor=encode_cursor(summaries[-1]))
+
+        return PlanSummaryPage(items=summaries)
+
+    async def search_plans(
+            self,
+            query: str,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None
+    ) -> PlanSearchPage:
+        """Search plan text, best matches first, a page at a time."""
+        terms = query_terms(query)
+        if not terms:
+            raise ValueError("Search query has no searchable terms")
+        if cursor is not None and not cursor.isdigit():
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+        limit = min(limit or settings.PLANS_PAGE_SIZE, settings.PLANS_MAX_PAGE_SIZE)
+        offset = int(cursor or 0)
+
+        # Fetch one extra hit to know whether another page follows
+        hits, truncated = await self.repository.search(terms, limit + 1, offset, settings.SEARCH_MAX_CANDIDATES)
+        if len(hits) > limit:
+            return PlanSearchPage(items=hits[:limit], next_cursor=str(offset + limit), truncated=truncated)
+
+        return PlanSearchPage(items=hits, truncated=truncated)
+
+    async def export_plans(self) -> AsyncIterator[bytes]:
+        """Stream every plan as NDJSON, a batch of lines at a time.
+
+        The stream outlives the request, so it reads from its own session.
+        """
+        if self.writer:
+            await self.writer.flush()
+        async with AsyncSession(self.db.bind, expire_on_commit=False, autoflush=False) as db:
+            async for lines in PlanRepository(db).export_plans(settings.EXPORT_BATCH_SIZE):
+                yield lines
+
+    async def import_plans(self, chunks: AsyncIterable[bytes]) -> PlanImportResult:
+        """Insert plans from an NDJSON byte stream in committed batches."""
+        lines = split_lines(chunks, settings.IMPORT_MAX_LINE_BYTES)
+        return await import_plans(self.db, lines, settings.IMPORT_BATCH_SIZE)
+
+    async def delete_plan(self, plan_id: str) -> bool:
         """Delete a plan."""
-        return self.repository.delete(plan_id)
+        if self.writer:
+            await self.writer.flush()
+        deleted = await self.repository.delete(plan_id)
+        self._invalidate(plan_id)
+        return deleted
+
+    def _invalidate(self, *plan_ids: str) -> None:
+        """Drop written plans from the plan cache."""
+        if self.plan_cache:
+            self.plan_cache.invalidate(*plan_ids)
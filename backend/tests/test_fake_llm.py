@@ -0,0 +1,81 @@
+import pytest
+
+from backend.config import get_settings
+from backend.core.llm import FakeLLMError, FakePlanChatModel
+from backend.core.planner import PLAN_TOOL, HealthPlannerAI
+
+settings = get_settings()
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BACKEND", "fake")
+    monkeypatch.setattr(settings, "FAKE_LLM_CHUNK_SIZE", 7)
+
+
+async def build(planner: HealthPlannerAI, timeline: str, output_mode: str = None):
+    plan = None
+    async for _, built in planner.generate_plan_streaming(
+            goal="Run a half marathon",
+            current_level="Beginner",
+            timeline=timeline,
+            output_mode=output_mode):
+        plan = built or plan
+    return plan
+
+
+@pytest.mark.anyio
+class TestFakeLLMBackend:
+    """Test the offline fake LLM backend."""
+
+    async def test_streams_a_complete_plan(self, fake_backend):
+        planner = HealthPlannerAI()
+        assert isinstance(planner.llm, FakePlanChatModel)
+
+        plan = await build(planner, "12 weeks")
+
+        assert [week.week for week in plan.weeks] == list(range(1, 13))
+        assert all(len(week.tasks) == 4 for week in plan.weeks)
+
+    async def test_answers_parallel_prompts(self, fake_backend, monkeypatch):
+        monkeypatch.setattr(settings, "PARALLEL_GENERATION_ENABLED", True)
+
+        plan = await build(HealthPlannerAI(), "16 weeks")
+
+        assert [week.week for week in plan.weeks] == list(range(1, 17))
+
+    async def test_compact_protocol_builds_the_same_plan(self, fake_backend):
+        json_plan = await build(HealthPlannerAI(protocol="json"), "6 weeks")
+        compact_plan = await build(HealthPlannerAI(protocol="compact"), "6 weeks")
+
+        strip_ids = {"id": True, "created_at": True, "weeks": {"__all__": {"tasks": {"__all__": {"id"}}}}}
+        assert compact_plan.model_dump(exclude=strip_ids) == json_plan.model_dump(exclude=strip_ids)
+
+    async def test_structured_mode_builds_the_same_plan(self, fake_backend):
+        planner = HealthPlannerAI()
+        chunks = [chunk async for chunk in planner._get_structured_chain(3).astream({
+            "goal": "Run a half marathon", "current_level": "Beginner",
+            "timeline": "3 weeks", "constraints": "None",
+        })]
+        assert chunks[0].tool_call_chunks[0]["name"] == PLAN_TOOL["function"]["name"]
+        assert all(chunk.content == "" for chunk in chunks)
+
+        ndjson_plan = await build(planner, "6 weeks")
+        structured_plan = await build(planner, "6 weeks", output_mode="structured")
+
+        strip_ids = {"id": True, "created_at": True, "weeks": {"__all__": {"tasks": {"__all__": {"id"}}}}}
+        assert structured_plan.model_dump(exclude=strip_ids) == ndjson_plan.model_dump(exclude=strip_ids)
+
+    async def test_output_is_deterministic(self, fake_backend):
+        planner = HealthPlannerAI()
+        first = [e async for e in planner.stream_events("Swim 1 km", "Beginner", "8 weeks")]
+        second = [e async for e in planner.stream_events("Swim 1 km", "Beginner", "8 weeks")]
+
+        assert first == second
+
+    async def test_error_injection(self):
+        llm = FakePlanChatModel(error_rate=1.0)
+
+        with pytest.raises(FakeLLMError):
+            async for _ in llm.astream("Create exactly 4 weeks"):
+                pass
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.benchmarks.bench_streaming_parser import load_recording
+from backend.config import get_settings
+from backend.core.generation_cache import GenerationCache, get_generation_cache
+from backend.core.planner import HealthPlannerAI
+from backend.db.models import SavedPlan
+from backend.db.repositories.generation_cache_repository import GenerationCacheRepository
+from backend.schemas.plan import PlanCreate
+from backend.services.plan_service import PlanService
+
+settings = get_settings()
+
+RECORDED_EVENTS = [json.loads(line) for line in load_recording("plan_16_weeks.ndjson").splitlines()]
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Replace the LLM stream with the recorded plan and count calls."""
+    calls = []
+
+    async def stream_events(self, goal, current_level, timeline, constraints="", parser=None, output_mode=None):
+        calls.append(goal)
+        for event in RECORDED_EVENTS:
+            yield event
+
+    monkeypatch.setattr(HealthPlannerAI, "stream_events", stream_events)
+    get_generation_cache().clear()
+    yield calls
+    get_generation_cache().clear()
+
+
+async def generate(db: AsyncSession, request: PlanCreate, use_cache: bool = True) -> list[dict]:
+    service = PlanService(db)
+    return [
+        json.loads(sse_event.split("data: ", 1)[1])
+        async for sse_event in service.generate_and_save_plan(request, use_cache=use_cache)
+    ]
+
+
+@pytest.mark.anyio
+class TestGenerationCache:
+    """Test replay of identical generation requests."""
+
+    request = PlanCreate(
+        goal="Run 10 km without stopping",
+        current_level="Beginner",
+        timeline="4 months"
+    )
+
+    async def test_identical_request_is_replayed(self, db: AsyncSession, llm_calls):
+        first = await generate(db, self.request)
+        same = self.request.model_copy(update={"goal": "  run 10 KM without   stopping "})
+        second = await generate(db, same)
+
+        assert len(llm_calls) == 1
+        assert [e["type"] for e in first] == [e["type"] for e in second]
+        assert first[-1]["plan_id"] != second[-1]["plan_id"]
+
+        service = PlanService(db)
+        first_plan = await service.get_plan(first[-1]["plan_id"])
+        second_plan = await service.get_plan(second[-1]["plan_id"])
+        assert len(second_plan.weeks) == 16
+        assert first_plan.weeks[0].tasks[0].id != second_plan.weeks[0].tasks[0].id
+
+    async def test_persistent_tier_survives_memory_eviction(self, db: AsyncSession, llm_calls):
+        await generate(db, self.request)
+        get_generation_cache().clear()
+        await generate(db, self.request)
+
+        assert len(llm_calls) == 1
+
+    async def test_database_hit_keeps_the_rows_deadline(self, db: AsyncSession):
+        cache = GenerationCache(max_entries=10, ttl_seconds=60, max_rows=10)
+        repository = GenerationCacheRepository(db)
+        await cache.put("key", RECORDED_EVENTS, repository)
+        await db.exec(text("UPDATE generation_cache SET created_at = datetime(created_at, '-50 seconds')"))
+        await db.commit()
+        cache.clear()
+
+        assert await cache.get("key", repository) == RECORDED_EVENTS
+
+        # The row expires 10 seconds from now; the memory entry with it
+        await db.exec(text("DELETE FROM generation_cache"))
+        await db.commit()
+        cache.ttl_seconds = 45
+        assert await cache.get("key", repository) is None
+
+    async def test_bypass_and_different_inputs_call_llm(self, db: AsyncSession, llm_calls):
+        await generate(db, self.request)
+        await generate(db, self.request, use_cache=False)
+        await generate(db, self.request.model_copy(update={"current_level": "Advanced"}))
+
+        assert len(llm_calls) == 3
+
+    async def test_output_mode_is_part_of_the_key(self, db: AsyncSession, llm_calls, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_OUTPUT_MODE", "ndjson")
+        await generate(db, self.request)
+        await generate(db, self.request.model_copy(update={"output_mode": "structured"}))
+        await generate(db, self.request.model_copy(update={"output_mode": "ndjson"}))
+
+        assert len(llm_calls) == 2
+
+    async def test_partial_plans_are_saved_marked_and_not_cached(self, db: AsyncSession, llm_calls, monkeypatch):
+        # A structured output that broke off after the first 3 weeks
+        cut = next(i for i, e in enumerate(RECORDED_EVENTS) if e.get("week") == 4)
+        events = RECORDED_EVENTS[:cut] + [{"type": "done", "partial": True}]
+
+        async def stream_events(self, goal, *args, **kwargs):
+            llm_calls.append(goal)
+            for event in events:
+                yield event
+
+        monkeypatch.setattr(HealthPlannerAI, "stream_events", stream_events)
+        first = await generate(db, self.request)
+        await generate(db, self.request)
+
+        assert len(llm_calls) == 2
+        assert first[-1]["partial"] is True
+        saved_plan = await db.get(SavedPlan, first[-1]["plan_id"])
+        assert saved_plan.partial
+        assert saved_plan.total_tasks == sum(e["type"] == "task" for e in events)
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.metrics import Counter, Histogram, REGISTRY, render_metrics, timed
+from backend.core.streaming_parser import StreamingJSONParser
+from backend.main import app
+
+
+@pytest.fixture
+def metrics():
+    """Metrics created by a test are unregistered afterwards."""
+    registered = len(REGISTRY)
+    yield
+    del REGISTRY[registered:]
+
+
+class TestMetrics:
+    """Test metric types and the Prometheus exposition."""
+
+    def test_histogram_buckets_are_cumulative(self, metrics):
+        histogram = Histogram("test_latency_seconds", "Test latency.", ("op",), buckets=(0.1, 1.0))
+        series = histogram.labels("read")
+        for value in (0.05, 0.1, 0.5, 5.0):
+            series.observe(value)
+
+        lines = histogram.render()
+
+        assert 'test_latency_seconds_bucket{op="read",le="0.1"} 2' in lines
+        assert 'test_latency_seconds_bucket{op="read",le="1"} 3' in lines
+        assert 'test_latency_seconds_bucket{op="read",le="+Inf"} 4' in lines
+        assert 'test_latency_seconds_count{op="read"} 4' in lines
+        assert 'test_latency_seconds_sum{op="read"} 5.65' in lines
+
+    def test_counter_renders_labelled_and_unlabelled(self, metrics):
+        plain = Counter("test_plain_total", "Plain.")
+        labelled = Counter("test_events_total", "Events.", ("type",))
+        plain.inc()
+        labelled.labels("task").inc(3)
+
+        text = render_metrics()
+
+        assert "# TYPE test_plain_total counter\ntest_plain_total 1\n" in text
+        assert 'test_events_total{type="task"} 3' in text
+
+    @pytest.mark.anyio
+    async def test_timed_observes_coroutines(self, metrics):
+        histogram = Histogram("test_op_seconds", "Ops.", ("op",))
+
+        @timed(histogram, "work")
+        async def work():
+            return 42
+
+        assert await work() == 42
+        assert histogram.labels("work").count == 1
+
+    def test_parser_counts_unparseable_lines(self):
+        counter = next(m for m in REGISTRY if m.name == "plan_parser_unparseable_lines_total")
+        before = counter.labels().value
+
+        StreamingJSONParser().process_chunk('{"type": "task"}\n{not json\n')
+
+        assert counter.labels().value == before + 1
+
+    def test_metrics_endpoint(self):
+        response = TestClient(app).get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE plan_generation_duration_seconds histogram" in response.text
+        assert "plan_generations_active 0" in response.text
@@ -0,0 +1,159 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.config import get_settings
+from backend.core.llm import FakePlanChatModel
+from backend.core.planner import HealthPlannerAI
+from backend.core.scheduler import get_llm_stream_slots
+
+settings = get_settings()
+
+WEEK_DELAY = 0.02
+
+
+class FakeStreams:
+    """Stand-in for LLM streams that tracks how many run at once."""
+
+    def __init__(self, fail_range: int = 0):
+        self.active = 0
+        self.max_active = 0
+        self.fail_range = fail_range
+
+    async def stream_chain(self, chain, inputs, parser=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if "first_week" not in inputs:
+                yield {"type": "overview", "value": "Build up gradually."}
+                for week in range(1, inputs["num_weeks"] + 1):
+                    yield {"type": "outline", "week": week, "focus": f"Focus {week}"}
+                return
+
+            if inputs["first_week"] == self.fail_range:
+                raise RuntimeError("range failed")
+
+            # Later ranges answer faster, so out-of-order completion is exercised
+            delay = WEEK_DELAY / inputs["first_week"]
+            for week in range(inputs["first_week"], inputs["last_week"] + 1):
+                await asyncio.sleep(delay)
+                yield {"type": "week_start", "week": week, "focus": f"Focus {week}"}
+                for n in range(3):
+                    yield {"type": "task", "week": week,
+                           "task": {"title": f"Task {n}", "description": "Do it", "duration": "30 mins"}}
+            # Stray weeks outside the range are ignored
+            yield {"type": "week_start", "week": inputs["last_week"] + 1, "focus": "Stray"}
+            yield {"type": "done"}
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def fake_streams(monkeypatch):
+    streams = FakeStreams()
+    monkeypatch.setattr(
+        HealthPlannerAI, "_stream_chain",
+        lambda planner, chain, inputs, parser=None: streams.stream_chain(chain, inputs, parser)
+    )
+    monkeypatch.setattr(settings, "PARALLEL_GENERATION_ENABLED", True)
+    monkeypatch.setattr(settings, "PARALLEL_MIN_WEEKS", 8)
+    monkeypatch.setattr(settings, "PARALLEL_WEEKS_PER_RANGE", 4)
+    return streams
+
+
+async def generate(planner: HealthPlannerAI, timeline: str):
+    plan = None
+    async for _, built in planner.generate_plan_streaming(
+            goal="Run a half marathon",
+            current_level="Beginner",
+            timeline=timeline):
+        plan = built or plan
+    return plan
+
+
+@pytest.mark.anyio
+class TestParallelGeneration:
+    """Test week-range fan-out for long plans."""
+
+    async def test_weeks_stream_in_order_and_build(self, fake_streams):
+        planner = HealthPlannerAI()
+        events = [event async for event in planner.stream_events(
+            "Run a half marathon", "Beginner", "16 weeks")]
+
+        assert events[0]["type"] == "overview"
+        assert events[-1] == {"type": "done"}
+        week_starts = [e["week"] for e in events if e["type"] == "week_start"]
+        assert week_starts == list(range(1, 17))
+        assert fake_streams.max_active == 4
+
+        plan = await generate(planner, "16 weeks")
+        assert [week.week for week in plan.weeks] == list(range(1, 17))
+        assert all(len(week.tasks) == 3 for week in plan.weeks)
+
+    async def test_ranges_run_concurrently(self, fake_streams):
+        planner = HealthPlannerAI()
+
+        start = time.perf_counter()
+        plan = await generate(planner, "16 weeks")
+        elapsed = time.perf_counter() - start
+
+        assert plan is not None
+        # Sequential ranges would take at least 16 week delays
+        assert elapsed < 16 * WEEK_DELAY
+
+    async def test_short_plans_stay_sequential(self, fake_streams, monkeypatch):
+        calls = []
+
+        async def sequential(planner, chain, inputs, parser=None):
+            calls.append(inputs)
+            yield {"type": "done"}
+
+        monkeypatch.setattr(HealthPlannerAI, "_stream_chain", sequential)
+        planner = HealthPlannerAI()
+        [event async for event in planner.stream_events("Run 5k", "Beginner", "4 weeks")]
+
+        assert len(calls) == 1
+        assert "first_week" not in calls[0]
+
+    async def test_range_failure_becomes_error_event(self, fake_streams):
+        fake_streams.fail_range = 5
+        planner = HealthPlannerAI()
+
+        sse_events = [sse async for sse, _ in planner.generate_plan_streaming(
+            "Run a half marathon", "Beginner", "16 weeks")]
+
+        assert '"type": "error"' in sse_events[-1]
+        assert '"week": 5' not in "".join(sse_events)
+
+
+@pytest.mark.anyio
+async def test_streams_are_bounded_by_llm_max_streams(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BACKEND", "fake")
+    monkeypatch.setattr(settings, "FAKE_LLM_CHUNK_SIZE", 64)
+    monkeypatch.setattr(settings, "FAKE_LLM_TOKEN_DELAY_MS", 1.0)
+    monkeypatch.setattr(settings, "PARALLEL_GENERATION_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_MAX_STREAMS", 2)
+    get_llm_stream_slots.cache_clear()
+
+    streams = FakeStreams()
+    astream = FakePlanChatModel._astream
+
+    async def counted(self, *args, **kwargs):
+        streams.active += 1
+        streams.max_active = max(streams.max_active, streams.active)
+        try:
+            async for chunk in astream(self, *args, **kwargs):
+                yield chunk
+        finally:
+            streams.active -= 1
+
+    monkeypatch.setattr(FakePlanChatModel, "_astream", counted)
+    try:
+        planners = [HealthPlannerAI() for _ in range(2)]
+        plans = await asyncio.gather(*(generate(planner, "16 weeks") for planner in planners))
+    finally:
+        get_llm_stream_slots.cache_clear()
+
+    assert all(len(plan.weeks) == 16 for plan in plans)
+    assert streams.max_active == 2
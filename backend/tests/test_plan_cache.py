@@ -0,0 +1,136 @@
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.core.plan_cache import CachedPlan, PlanCache
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.schemas.plan import PlanResponse
+from backend.services.plan_service import PlanService
+from backend.tests.test_plan_repository import make_plan
+
+
+def entry(plan_id: str) -> CachedPlan:
+    return CachedPlan.build(make_plan(plan_id), etag='"1"')
+
+
+class TestPlanCache:
+    """Test eviction, expiry and invalidation of the plan cache."""
+
+    def test_evicts_least_recently_used_by_size(self):
+        size = entry("plan-1").size
+        cache = PlanCache(max_bytes=2 * size, ttl_seconds=60)
+
+        cache.put("plan-1", entry("plan-1"), cache.token())
+        cache.put("plan-2", entry("plan-2"), cache.token())
+        assert cache.get("plan-1") is not None
+        cache.put("plan-3", entry("plan-3"), cache.token())
+
+        assert cache.get("plan-2") is None
+        assert cache.get("plan-1") is not None
+        assert cache.get("plan-3") is not None
+        assert cache.stats() == {
+            "entries": 2,
+            "bytes": 2 * size,
+            "max_bytes": 2 * size,
+            "hits": 3,
+            "misses": 1,
+            "evictions": 1,
+            "invalidations": 0,
+        }
+
+    def test_entries_are_charged_for_the_parsed_plan(self):
+        cached = CachedPlan('"1"', entry("plan-1").body)
+        cache = PlanCache(max_bytes=cached.size, ttl_seconds=60)
+        cache.put("plan-1", cached, cache.token())
+
+        assert cache.size == cached.size > len(cached.body)
+        assert cache.get("plan-1").plan == make_plan("plan-1")
+        assert cache.size == cached.size
+
+        cache.put("plan-2", CachedPlan('"1"', cached.body[:-1]), cache.token())
+        assert cache.stats()["entries"] == 1
+        assert cache.size <= cache.max_bytes
+
+    def test_expired_entries_are_misses(self):
+        cache = PlanCache(max_bytes=1 << 20, ttl_seconds=0)
+        cache.put("plan-1", entry("plan-1"), cache.token())
+
+        assert cache.get("plan-1") is None
+        assert cache.size == 0
+
+    def test_load_started_before_invalidation_is_not_stored(self):
+        cache = PlanCache(max_bytes=1 << 20, ttl_seconds=60)
+        token = cache.token()
+        cache.invalidate("plan-1")
+        cache.put("plan-1", entry("plan-1"), token)
+
+        assert cache.get("plan-1") is None
+
+
+@pytest.mark.anyio
+class TestPlanServiceCache:
+    """Test read-through caching in PlanService."""
+
+    async def test_hits_skip_the_database_until_a_write(self, db: AsyncSession, plan_cache, monkeypatch):
+        await PlanRepository(db).save(make_plan(), current_level="Beginner", timeline="2 weeks")
+        service = PlanService(db)
+        plan = await service.get_plan("plan-1")
+
+        async def no_database(*args):
+            raise AssertionError("plan was not served from the cache")
+
+        monkeypatch.setattr(service.repository, "get_with_version", no_database)
+        assert await service.get_plan("plan-1") == plan
+        assert service.get_cached_plan("plan-1").etag == await service.get_plan_etag("plan-1")
+
+        monkeypatch.undo()
+        assert await service.update_task_status("plan-1", 1, "plan-1-w1-t0", True)
+        assert service.get_cached_plan("plan-1") is None
+        assert (await service.get_plan("plan-1")).weeks[0].tasks[0].completed
+
+        assert await service.delete_plan("plan-1")
+        assert await service.get_plan("plan-1") is None
+        assert plan_cache.stats()["entries"] == 0
+
+
+@pytest.mark.anyio
+class TestPassthroughReads:
+    """Test serving plan bodies straight from trusted rows."""
+
+    async def test_body_matches_validated_response(self, db: AsyncSession):
+        plan = make_plan()
+        plan.goal = 'Laufen "ohne" Pause \u2014 5 km\n'
+        plan.weeks[1].tasks[2].completed = True
+        repository = PlanRepository(db)
+        await repository.save(plan, current_level="Beginner", timeline="2 weeks")
+        await repository.update_task_status(plan.id, 1, "plan-1-w1-t1", True)
+        plan.weeks[0].tasks[1].completed = True
+
+        body, version = await repository.get_body_with_version(plan.id)
+
+        assert body == PlanResponse(plan=plan).model_dump_json().encode()
+        assert version == 2
+        assert await repository.get_body_with_version("missing") is None
+
+    async def test_untrusted_rows_are_validated(self, db: AsyncSession, sync_db: Session):
+        plan = make_plan()
+        await PlanRepository(db).save(plan, current_level="Beginner", timeline="2 weeks")
+        # Rows written under an older layout
+        sync_db.exec(text("UPDATE health_plans SET schema_version = NULL"))
+        sync_db.commit()
+        service = PlanService(db)
+
+        assert await service.repository.get_body_with_version(plan.id) is None
+        cached = await service.load_plan(plan.id)
+        assert cached.plan == plan
+        assert cached.body == CachedPlan.build(plan, cached.etag).body
+
+    async def test_passthrough_entries_parse_the_plan_on_demand(self, db: AsyncSession):
+        plan = make_plan()
+        await PlanRepository(db).save(plan, current_level="Beginner", timeline="2 weeks")
+
+        cached = await PlanService(db).load_plan(plan.id)
+
+        assert cached._plan is None
+        assert cached.plan == plan
@@ -0,0 +1,91 @@
+from typing import get_args
+
+import pytest
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.config import Settings, get_settings
+from backend.db.migrations import reencode_plan_data
+from backend.db.models import SavedPlan
+from backend.db.plan_codec import CODECS, decode_plan, get_codec
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.tests.test_plan_repository import make_plan
+
+CONFIGURABLE_CODECS = get_args(Settings.model_fields["PLAN_DATA_CODEC"].annotation)
+
+
+class TestPlanCodecs:
+    """Test encoding and decoding of plan_data snapshots."""
+
+    @pytest.mark.parametrize("name", list(CODECS))
+    def test_round_trip(self, name):
+        plan = make_plan()
+        plan.weeks[1].tasks[2].completed = True
+        codec = get_codec(name)
+
+        assert decode_plan(name, codec.encode(plan)) == plan
+
+    def test_compressed_codecs_are_smaller(self):
+        plan = make_plan(num_weeks=12)
+        json_size = len(get_codec("json").encode(plan))
+
+        assert len(get_codec("zlib").encode(plan)) < json_size / 2
+
+    def test_untagged_rows_are_json(self):
+        plan = make_plan()
+        assert decode_plan(None, plan.model_dump_json()) == plan
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            get_codec("brotli")
+
+    @pytest.mark.parametrize("name", CONFIGURABLE_CODECS)
+    def test_every_configurable_codec(self, name):
+        assert set(CODECS) <= set(CONFIGURABLE_CODECS)
+        if name not in CODECS:
+            # Optional module not installed
+            with pytest.raises(ValueError, match="unavailable"):
+                get_codec(name)
+            return
+
+        plan = make_plan()
+        assert decode_plan(name, get_codec(name).encode(plan)) == plan
+
+    @pytest.mark.anyio
+    async def test_startup_fails_on_unavailable_codec(self, monkeypatch):
+        from backend.main import app, lifespan
+
+        monkeypatch.delitem(CODECS, "msgpack", raising=False)
+        monkeypatch.setattr(get_settings(), "PLAN_DATA_CODEC", "msgpack")
+
+        with pytest.raises(ValueError, match="msgpack"):
+            async with lifespan(app):
+                pass
+
+
+@pytest.mark.anyio
+class TestStoredPlanData:
+    """Test plan_data written by the repository and re-encoded by migration."""
+
+    async def test_saves_with_configured_codec(self, db: AsyncSession):
+        plan = make_plan()
+        await PlanRepository(db).save(plan, current_level="Beginner", timeline="2 weeks")
+
+        saved_plan = await db.get(SavedPlan, plan.id)
+        assert saved_plan.plan_data_format == get_settings().PLAN_DATA_CODEC
+        assert decode_plan(saved_plan.plan_data_format, saved_plan.plan_data) == plan
+
+    async def test_reencode_legacy_rows(self, db: AsyncSession, sync_db: Session):
+        plans = [make_plan(f"legacy-{n}") for n in range(3)]
+        for plan in plans:
+            sync_db.add(SavedPlan(id=plan.id, goal=plan.goal, plan_data=plan.model_dump_json()))
+        sync_db.commit()
+
+        assert reencode_plan_data(sync_db, "zlib", batch_size=2) == 3
+        assert reencode_plan_data(sync_db, "zlib") == 0
+
+        # Plans without week rows are served from the re-encoded snapshot
+        repository = PlanRepository(db)
+        for plan in plans:
+            assert (await db.get(SavedPlan, plan.id)).plan_data_format == "zlib"
+            assert await repository.get_by_id(plan.id) == plan
@@ -0,0 +1,298 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import Session, create_engine, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.db.migrations import add_missing_columns, backfill_progress, migrate_to_normalized_layout
+from backend.db.models import PlanTask, SavedPlan
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.schemas.plan import GoalPlan, WeeklyPlan, WeeklyTask
+from backend.services.plan_service import PlanService, etag_matches
+
+
+def make_plan(
+        plan_id: str = "plan-1",
+        num_weeks: int = 2,
+        created_at: datetime = datetime(2025, 1, 1, 9, 30)
+) -> GoalPlan:
+    return GoalPlan(
+        id=plan_id,
+        goal="Run a 5k without stopping",
+        overview="Build up running endurance gradually.",
+        weeks=[
+            WeeklyPlan(
+                week=week,
+                focus=f"Week {week} focus",
+                tasks=[
+                    WeeklyTask(
+                        id=f"{plan_id}-w{week}-t{n}",
+                        title=f"Task {n}",
+                        description="Do the thing",
+                        duration="20 mins"
+                    )
+                    for n in range(3)
+                ]
+            )
+            for week in range(1, num_weeks + 1)
+        ],
+        created_at=created_at.isoformat()
+    )
+
+
+async def count_tasks(db: AsyncSession) -> int:
+    return (await db.exec(select(func.count()).select_from(PlanTask))).one()
+
+
+@pytest.mark.anyio
+class TestPlanRepository:
+    """Test plan persistence on the normalized layout."""
+
+    async def test_save_and_get_round_trip(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        plan = make_plan()
+
+        assert await repository.save(plan, current_level="Beginner", timeline="2 weeks")
+        assert await repository.get_by_id(plan.id) == plan
+        assert await repository.list() == [plan]
+
+    async def test_update_task_status_touches_only_the_task_row(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        plan = make_plan()
+        await repository.save(plan, current_level="Beginner", timeline="2 weeks")
+        plan_data = (await db.get(SavedPlan, plan.id)).plan_data
+
+        assert await repository.update_task_status(plan.id, 2, "plan-1-w2-t1", True)
+
+        loaded = await repository.get_by_id(plan.id)
+        assert loaded.weeks[1].tasks[1].completed
+        assert sum(task.completed for week in loaded.weeks for task in week.tasks) == 1
+        saved_plan = await db.get(SavedPlan, plan.id)
+        await db.refresh(saved_plan)
+        assert saved_plan.plan_data == plan_data
+
+    async def test_update_task_status_wrong_week_or_task(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        await repository.save(make_plan(), current_level="Beginner", timeline="2 weeks")
+
+        assert not await repository.update_task_status("plan-1", 1, "plan-1-w2-t1", True)
+        assert not await repository.update_task_status("plan-1", 1, "missing", True)
+        assert not await repository.update_task_status("missing", 1, "plan-1-w1-t1", True)
+
+    async def test_update_task_statuses_across_plans(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        await repository.save(make_plan("plan-1"), current_level="Beginner", timeline="2 weeks")
+        await repository.save(make_plan("plan-2"), current_level="Beginner", timeline="2 weeks")
+
+        results = await repository.update_task_statuses([
+            ("plan-1", 1, "plan-1-w1-t0", True),
+            ("plan-1", 1, "plan-1-w1-t1", True),
+            ("plan-2", 2, "plan-2-w2-t2", True),
+            ("plan-2", 1, "plan-2-w2-t2", True),
+            ("missing", 1, "plan-1-w1-t0", True),
+            ("plan-1", 1, "plan-1-w1-t1", False),
+        ])
+
+        assert results == [True, True, True, False, False, True]
+        first = await repository.get_by_id("plan-1")
+        second = await repository.get_by_id("plan-2")
+        assert [task.completed for task in first.weeks[0].tasks] == [True, False, False]
+        assert [task.completed for task in second.weeks[1].tasks] == [False, False, True]
+
+    async def test_writes_bump_the_plan_version(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        await repository.save(make_plan(), current_level="Beginner", timeline="2 weeks")
+        assert await repository.get_version("plan-1") == 1
+
+        assert await repository.update_task_status("plan-1", 1, "plan-1-w1-t0", True)
+        assert not await repository.update_task_status("plan-1", 1, "missing", True)
+        assert await repository.get_version("plan-1") == 2
+
+        await repository.update_task_statuses([
+            ("plan-1", 1, "plan-1-w1-t1", True),
+            ("plan-1", 2, "plan-1-w2-t1", True),
+        ])
+        assert await repository.get_version("plan-1") == 3
+        assert await repository.get_version("missing") is None
+
+    async def test_progress_aggregates_follow_task_updates(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        plan = make_plan()
+        plan.weeks[1].tasks[0].completed = True
+        await repository.save(plan, current_level="Beginner", timeline="2 weeks")
+
+        progress = await repository.get_progress("plan-1")
+        assert (progress.total_tasks, progress.completed_tasks, progress.percent) == (6, 1, 17)
+        assert progress.last_activity_at is None
+        assert [(week.completed_tasks, week.total_tasks) for week in progress.weeks] == [(0, 3), (1, 3)]
+
+        assert await repository.update_task_status("plan-1", 1, "plan-1-w1-t0", True)
+        assert await repository.update_task_status("plan-1", 1, "plan-1-w1-t0", True)
+        await repository.update_task_statuses([
+            ("plan-1", 1, "plan-1-w1-t1", True),
+            ("plan-1", 2, "plan-1-w2-t0", False),
+            ("plan-1", 2, "plan-1-w2-t1", True),
+            ("plan-1", 2, "plan-1-w2-t1", False),
+        ])
+
+        progress = await repository.get_progress("plan-1")
+        assert (progress.completed_tasks, progress.percent) == (2, 33)
+        assert progress.last_activity_at is not None
+        assert [week.percent for week in progress.weeks] == [67, 0]
+        assert await repository.get_version("plan-1") == 3
+        assert await repository.get_progress("missing") is None
+
+    async def test_backfill_progress(self, db: AsyncSession, sync_db: Session):
+        repository = PlanRepository(db)
+        plan = make_plan()
+        plan.weeks[0].tasks[2].completed = True
+        await repository.save(plan, current_level="Beginner", timeline="2 weeks")
+        expected = await repository.get_progress("plan-1")
+
+        # Rows written before the aggregate columns existed
+        sync_db.exec(text("UPDATE health_plans SET total_tasks = 0, completed_tasks = 0"))
+        sync_db.exec(text("UPDATE weeks SET total_tasks = 0, completed_tasks = 0"))
+        sync_db.commit()
+
+        assert backfill_progress(sync_db) == 1
+        assert backfill_progress(sync_db) == 0
+        assert backfill_progress(sync_db, recompute=True) == 1
+        db.expunge_all()
+        assert await repository.get_progress("plan-1") == expected
+
+    async def test_plan_and_collection_etags(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        await repository.save(make_plan("plan-1"), current_level="Beginner", timeline="2 weeks")
+        await repository.save(make_plan("plan-2"), current_level="Beginner", timeline="2 weeks")
+        service = PlanService(db)
+
+        plan_etag = await service.get_plan_etag("plan-1")
+        plans_etag = await service.get_plans_etag()
+        assert await service.get_plan_etag("missing") is None
+
+        await service.update_task_status("plan-1", 1, "plan-1-w1-t0", True)
+        assert await service.get_plan_etag("plan-1") != plan_etag
+        assert await service.get_plans_etag() != plans_etag
+
+        plans_etag = await service.get_plans_etag()
+        await service.delete_plan("plan-2")
+        assert await service.get_plans_etag() != plans_etag
+
+        etag = await service.get_plan_etag("plan-1")
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches(plan_etag, etag)
+
+    async def test_delete_removes_weeks_and_tasks(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        await repository.save(make_plan(), current_level="Beginner", timeline="2 weeks")
+
+        assert await repository.delete("plan-1")
+        assert await repository.get_by_id("plan-1") is None
+        assert await count_tasks(db) == 0
+
+    async def test_migrate_legacy_plan(self, db: AsyncSession, sync_db: Session):
+        plan = make_plan("legacy")
+        plan.weeks[0].tasks[0].completed = True
+        sync_db.add(SavedPlan(
+            id=plan.id,
+            goal=plan.goal,
+            overview=plan.overview,
+            plan_data=plan.model_dump_json(),
+            created_at=datetime.fromisoformat(plan.created_at)
+        ))
+        sync_db.commit()
+
+        repository = PlanRepository(db)
+        assert await repository.get_by_id(plan.id) == plan
+
+        assert migrate_to_normalized_layout(sync_db) == 1
+        assert migrate_to_normalized_layout(sync_db) == 0
+        assert await count_tasks(db) == 6
+
+        assert (await repository.get_progress(plan.id)).completed_tasks == 1
+
+        assert await repository.update_task_status(plan.id, 1, "legacy-w1-t0", False)
+        assert not (await repository.get_by_id(plan.id)).weeks[0].tasks[0].completed
+        assert (await repository.get_progress(plan.id)).completed_tasks == 0
+
+    async def test_add_missing_columns(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE health_plans (id VARCHAR PRIMARY KEY, goal VARCHAR NOT NULL, "
+                "current_level VARCHAR, timeline VARCHAR, constraints VARCHAR, overview VARCHAR, "
+                "plan_data VARCHAR NOT NULL, created_at DATETIME NOT NULL)"
+            ))
+            connection.execute(text(
+                "INSERT INTO health_plans (id, goal, plan_data, created_at) "
+                "VALUES ('old', 'goal', '{}', '2025-01-01 00:00:00')"
+            ))
+
+        add_missing_columns(engine)
+        add_missing_columns(engine)
+
+        assert "version" in {column["name"] for column in inspect(engine).get_columns("health_plans")}
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT version FROM health_plans")).scalar() == 1
+            assert connection.execute(text("SELECT plan_data_format FROM health_plans")).scalar() == "json"
+        engine.dispose()
+
+    async def test_list_summaries_pages_by_cursor(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        # Two plans share a timestamp to exercise the id tie-breaker
+        for n, day in enumerate([1, 2, 3, 3, 4]):
+            plan = make_plan(f"plan-{n}", created_at=datetime(2025, 1, day))
+            await repository.save(plan, current_level="Beginner", timeline="2 weeks")
+
+        service = PlanService(db)
+        seen = []
+        page = await service.list_plan_summaries(limit=2)
+        while True:
+            seen.extend(summary.id for summary in page.items)
+            if not page.next_cursor:
+                break
+            page = await service.list_plan_summaries(limit=2, cursor=page.next_cursor)
+
+        assert seen == ["plan-4", "plan-3", "plan-2", "plan-1", "plan-0"]
+        assert page.items[0].timeline == "2 weeks"
+
+
+@pytest.mark.anyio
+class TestConcurrentAccess:
+    """Database writes must not stall other coroutines on the event loop."""
+
+    async def test_streams_keep_flowing_while_writes_commit(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        commit_windows = []
+        stream_ticks = []
+        writes_done = asyncio.Event()
+
+        async def stream():
+            while not writes_done.is_set():
+                stream_ticks.append(time.perf_counter())
+                await asyncio.sleep(0)
+
+        async def write():
+            for n in range(10):
+                started = time.perf_counter()
+                await repository.save(make_plan(f"plan-{n}", num_weeks=8), "Beginner", "8 weeks")
+                await repository.update_task_status(f"plan-{n}", 1, f"plan-{n}-w1-t0", True)
+                commit_windows.append((started, time.perf_counter()))
+            writes_done.set()
+
+        await asyncio.gather(stream(), write())
+
+        ticks_during_commits = sum(
+            1
+            for tick in stream_ticks
+            for started, finished in commit_windows
+            if started < tick < finished
+        )
+        assert len(commit_windows) == 10
+        assert ticks_during_commits > 0
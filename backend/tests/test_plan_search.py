@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.config import get_settings
+from backend.db.migrations import index_plans_for_search
+from backend.db.plan_search import match_query, query_terms, snippet
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.services.plan_service import PlanService
+from backend.tests.test_plan_repository import make_plan
+
+settings = get_settings()
+
+
+async def save(repository: PlanRepository, plan_id: str, goal: str, task_title: str = "Task") -> None:
+    plan = make_plan(plan_id)
+    plan.goal = goal
+    plan.weeks[1].tasks[0].title = task_title
+    await repository.save(plan, current_level="Beginner", timeline="2 weeks")
+
+
+class TestMatchQuery:
+    """Test turning user input into FTS5 queries."""
+
+    def test_terms_are_quoted_prefixes(self):
+        assert match_query(query_terms("run 5k")) == '"run"* "5k"*'
+
+    def test_operators_and_punctuation_are_literal(self):
+        terms = query_terms('yoga AND "stretch" -(NEAR')
+        assert match_query(terms) == '"yoga"* "AND"* "stretch"* "NEAR"*'
+        assert query_terms("  ?!  ") == []
+
+    def test_snippet_highlights_first_matching_column(self):
+        columns = ["Sleep better", None, "Week 1 rest", "Evening yoga, then stretch for ten minutes"]
+        assert snippet(columns, ["stretch", "yog"]) == (
+            "Evening **yoga,** then **stretch** for ten minutes"
+        )
+        assert snippet(columns, ["unrelated"]) == "Sleep better"
+
+
+@pytest.mark.anyio
+class TestPlanSearch:
+    """Test full-text search over saved plans."""
+
+    async def test_ranks_goal_matches_first(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        await save(repository, "plan-1", "Improve my swimming technique", task_title="Hill sprints")
+        await save(repository, "plan-2", "Sprint faster over 100 metres")
+        await save(repository, "plan-3", "Sleep better every night")
+
+        hits, truncated = await repository.search(["sprint"], limit=10)
+
+        assert [hit.id for hit in hits] == ["plan-2", "plan-1"]
+        assert "**sprints**" in hits[1].snippet
+        assert not truncated
+
+    async def test_deleted_plans_are_not_found(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        await save(repository, "plan-1", "Start running three times a week")
+
+        assert await repository.delete("plan-1")
+        assert await repository.search(["running"], limit=10) == ([], False)
+
+    async def test_pages_through_hits(self, db: AsyncSession):
+        repository = PlanRepository(db)
+        for n in range(5):
+            await save(repository, f"plan-{n}", "Start running three times a week")
+        service = PlanService(db)
+
+        seen = []
+        page = await service.search_plans("running", limit=2)
+        seen += [hit.id for hit in page.items]
+        while page.next_cursor:
+            page = await service.search_plans("running", limit=2, cursor=page.next_cursor)
+            seen += [hit.id for hit in page.items]
+
+        assert sorted(seen) == [f"plan-{n}" for n in range(5)]
+        with pytest.raises(ValueError):
+            await service.search_plans("...")
+        with pytest.raises(ValueError):
+            await service.search_plans("running", cursor="abc")
+
+    async def test_pages_say_when_matches_were_not_all_ranked(self, db: AsyncSession, monkeypatch):
+        repository = PlanRepository(db)
+        for n in range(3):
+            await save(repository, f"plan-{n}", "Start running three times a week")
+        service = PlanService(db)
+
+        monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 2)
+        page = await service.search_plans("running", limit=1)
+        assert page.truncated
+        assert not (await service.search_plans("running", limit=1, cursor=page.next_cursor)).next_cursor
+
+        monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 4)
+        assert not (await service.search_plans("running", limit=1)).truncated
+
+    async def test_index_existing_plans(self, db: AsyncSession, sync_db: Session):
+        repository = PlanRepository(db)
+        await save(repository, "plan-1", "Start running three times a week", task_title="Hill sprints")
+
+        # A plan saved before the search index existed
+        sync_db.exec(text("DELETE FROM plan_search"))
+        sync_db.exec(text("UPDATE health_plans SET search_id = NULL"))
+        sync_db.commit()
+        assert await repository.search(["sprints"], limit=10) == ([], False)
+
+        assert index_plans_for_search(sync_db) == 1
+        assert index_plans_for_search(sync_db) == 0
+        hits, _ = await repository.search(["sprints"], limit=10)
+        assert [hit.id for hit in hits] == ["plan-1"]
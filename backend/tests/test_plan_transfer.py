@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.db.models import SavedPlan
+from backend.db.plan_transfer import import_plans, split_lines
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.schemas.plan import PlanImportResult
+from backend.tests.test_plan_repository import make_plan
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(lines) -> list[bytes]:
+    return [line async for line in lines]
+
+
+@pytest.fixture
+async def target_db(tmp_path):
+    url = tmp_path / "target.db"
+    sync_engine = create_engine(f"sqlite:///{url}")
+    SQLModel.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+class TestPlanTransfer:
+    """Test NDJSON export and bulk import of plans."""
+
+    async def test_split_lines(self):
+        data = b'{"a":1}\n\n' + b"x" * 50 + b'\n{"b":2}'
+
+        assert await collect(split_lines(chunked(data, 7), max_line_bytes=20)) == [
+            b'{"a":1}', b"", b"x" * 20, b'{"b":2}'
+        ]
+
+    async def test_export_and_import_round_trip(self, db: AsyncSession, sync_db: Session, target_db: AsyncSession):
+        repository = PlanRepository(db)
+        plans = [make_plan(f"plan-{n}") for n in range(5)]
+        for plan in plans:
+            await repository.save(plan, current_level="Beginner", timeline="2 weeks", constraints="Knees")
+        await repository.update_task_status("plan-3", 2, "plan-3-w2-t1", True)
+        plans[3].weeks[1].tasks[1].completed = True
+        # A plan saved before the normalized layout existed
+        legacy = make_plan("legacy")
+        sync_db.add(SavedPlan(id=legacy.id, goal=legacy.goal, overview=legacy.overview,
+                              plan_data=legacy.model_dump_json()))
+        sync_db.commit()
+
+        export = b"".join([lines async for lines in repository.export_plans(batch_size=2)])
+        records = [json.loads(line) for line in export.splitlines()]
+        assert [record["plan"]["id"] for record in records] == ["legacy"] + [plan.id for plan in plans]
+        assert records[1]["timeline"] == "2 weeks" and records[1]["constraints"] == "Knees"
+
+        result = await import_plans(target_db, split_lines(chunked(export, 100), 1 << 20), batch_size=4)
+        assert result == PlanImportResult(imported=6)
+
+        imported = PlanRepository(target_db)
+        for plan in plans + [legacy]:
+            assert await imported.get_by_id(plan.id) == plan
+        assert (await imported.get_progress("plan-3")).completed_tasks == 1
+        assert (await imported.search(["running"], limit=10))[0]
+        assert [lines async for lines in imported.export_plans(batch_size=3)] != []
+
+    async def test_import_skips_existing_and_invalid_lines(self, db: AsyncSession):
+        plan = make_plan()
+        await PlanRepository(db).save(plan, current_level="Beginner", timeline="2 weeks")
+        lines = [
+            json.dumps({"plan": plan.model_dump()}).encode(),
+            b"not json",
+            json.dumps({"plan": {**make_plan("plan-2").model_dump(), "weeks": []}}).encode(),
+            json.dumps({"plan": make_plan("plan-3").model_dump(), "timeline": "2 weeks"}).encode(),
+            json.dumps({"plan": make_plan("plan-3").model_dump()}).encode(),
+        ]
+
+        result = await import_plans(db, chunked(b"", 1), batch_size=10)
+        assert result == PlanImportResult()
+        result = await import_plans(db, split_lines(chunked(b"\n".join(lines), 64), 1 << 20), batch_size=10)
+
+        assert result == PlanImportResult(imported=1, skipped=2, invalid=2)
+        assert await PlanRepository(db).get_by_id("plan-3") == make_plan("plan-3")
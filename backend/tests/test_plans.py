@@ -1,8 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from backend.config import get_settings
 from backend.main import app
 
+settings = get_settings()
+
 
 @pytest.fixture
 def client():
@@ -27,6 +30,17 @@ class TestPlanEndpoints:
         assert data is not None
         assert len(data) >= 0
 
+    def test_list_plan_summaries(self, client: TestClient):
+        response = client.get("/api/plans/summaries", params={"limit": 5})
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= 5
+        assert "next_cursor" in data
+
+    def test_list_plan_summaries_invalid_cursor(self, client: TestClient):
+        response = client.get("/api/plans/summaries", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
     def test_create_plan_validation(self, client: TestClient):
         response = client.post("/api/plans/generate", json={})
         assert response.status_code == 422  # Validation error
@@ -60,3 +74,30 @@ class TestPlanEndpoints:
             json={"completed": "not-a-boolean"}
         )
         assert response.status_code == 422
+
+    def test_update_task_statuses_invalid_batch(self, client: TestClient):
+        response = client.patch("/api/plans/tasks", json={"updates": []})
+        assert response.status_code == 422
+
+        change = {"plan_id": "some-plan-id", "week": 1, "task_id": "task-1", "completed": True}
+        response = client.patch("/api/plans/tasks", json={
+            "updates": [change] * (settings.TASK_BATCH_MAX_UPDATES + 1)
+        })
+        assert response.status_code == 400
+
+    def test_generation_gauges(self, client: TestClient):
+        response = client.get("/api/system/generations")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["active"] >= 0
+        assert data["queued"] >= 0
+
+    def test_resume_unknown_generation(self, client: TestClient):
+        response = client.get("/api/plans/generate/nonexistent-id/events")
+        assert response.status_code == 404
+
+        response = client.get(
+            "/api/plans/generate/nonexistent-id/events",
+            headers={"Last-Event-ID": "another-id:4"}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.core.generation_cache import get_generation_cache
+from backend.core.generation_runs import get_generation_runs
+from backend.core.planner import HealthPlannerAI
+from backend.db.repositories.checkpoint_repository import CheckpointRepository
+from backend.schemas.plan import PlanCreate
+from backend.services.plan_service import PlanService
+from backend.tests.test_generation_cache import RECORDED_EVENTS
+
+
+class GatedStream:
+    """Recorded plan stream that can be paused before a given event."""
+
+    def __init__(self):
+        self.calls = 0
+        self.pause_at = None
+        self.paused = asyncio.Event()
+        self.resume = asyncio.Event()
+
+    async def stream_events(self, planner, goal, current_level, timeline, constraints="", parser=None, output_mode=None):
+        self.calls += 1
+        for n, event in enumerate(RECORDED_EVENTS):
+            if n == self.pause_at:
+                self.paused.set()
+                await self.resume.wait()
+            await asyncio.sleep(0)
+            yield event
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    gated = GatedStream()
+    monkeypatch.setattr(
+        HealthPlannerAI, "stream_events",
+        lambda planner, *args, **kwargs: gated.stream_events(planner, *args, **kwargs)
+    )
+    get_generation_cache().clear()
+    yield gated
+    get_generation_cache().clear()
+
+
+def parse(sse_event: str) -> tuple[str, dict]:
+    id_line, data_line = sse_event.strip().split("\n")
+    return id_line.removeprefix("id: "), json.loads(data_line.removeprefix("data: "))
+
+
+async def collect(events) -> list[tuple[str, dict]]:
+    return [parse(sse_event) async for sse_event in events]
+
+
+@pytest.mark.anyio
+class TestResumableGeneration:
+    """Test event ids, checkpoints and resuming dropped streams."""
+
+    request = PlanCreate(
+        goal="Run 10 km without stopping",
+        current_level="Beginner",
+        timeline="4 months"
+    )
+
+    async def test_events_carry_sequential_ids(self, db: AsyncSession, stream):
+        events = await collect(PlanService(db).generate_and_save_plan(self.request, use_cache=False))
+
+        plan_id = events[-1][1]["plan_id"]
+        assert [event_id for event_id, _ in events] == [
+            f"{plan_id}:{seq}" for seq in range(1, len(events) + 1)
+        ]
+
+    async def test_dropped_client_resumes_running_generation(self, db: AsyncSession, stream):
+        stream.pause_at = 40
+        service = PlanService(db)
+        follower = await service.start_generation(self.request, use_cache=False)
+
+        received = []
+        async for sse_event in follower:
+            received.append(parse(sse_event))
+            if len(received) == 10:
+                break
+        await follower.aclose()
+
+        plan_id = received[0][0].split(":")[0]
+        await stream.paused.wait()
+        stream.resume.set()
+
+        resumed = await collect(await service.resume_generation(plan_id, received[-1][0]))
+
+        events = received + resumed
+        assert [int(event_id.split(":")[1]) for event_id, _ in events] == list(range(1, len(events) + 1))
+        assert events[-1][1] == {"type": "done", "plan_id": plan_id}
+        assert stream.calls == 1
+        assert len((await service.get_plan(plan_id)).weeks) == 16
+
+    async def test_finished_generation_replays_from_saved_plan(self, db: AsyncSession, stream):
+        service = PlanService(db)
+        get_generation_runs().retention_seconds = 0
+        try:
+            live = await collect(service.generate_and_save_plan(self.request, use_cache=False))
+            await asyncio.sleep(0)
+        finally:
+            get_generation_runs().retention_seconds = 300
+
+        plan_id = live[-1][1]["plan_id"]
+        assert get_generation_runs().get(plan_id) is None
+
+        replayed = await collect(await service.resume_generation(plan_id, live[4][0]))
+        assert replayed == live[5:]
+
+    async def test_interrupted_generation_replays_checkpoint(self, db: AsyncSession, stream):
+        # Pause inside week 3, after weeks 1 and 2 are checkpointed
+        week_3 = next(n for n, e in enumerate(RECORDED_EVENTS) if e.get("week") == 3)
+        stream.pause_at = week_3 + 2
+        service = PlanService(db)
+        follower = await service.start_generation(self.request, use_cache=False)
+        live = []
+
+        async def read():
+            async for sse_event in follower:
+                live.append(parse(sse_event))
+
+        reader = asyncio.create_task(read())
+        await stream.paused.wait()
+        await asyncio.sleep(0.05)
+        plan_id = live[0][0].split(":")[0]
+
+        checkpoint = await CheckpointRepository(db).get(plan_id)
+        assert [week["week"] for week in json.loads(checkpoint.state)["weeks"]] == [1, 2]
+
+        await get_generation_runs().cancel_all()
+        await reader
+
+        replayed = await collect(await service.resume_generation(plan_id))
+        assert replayed[:checkpoint.event_count] == live[:checkpoint.event_count]
+        assert replayed[-1][1]["type"] == "error"
+
+    async def test_unknown_or_foreign_ids(self, db: AsyncSession, stream):
+        service = PlanService(db)
+
+        assert await service.resume_generation("missing") is None
+        with pytest.raises(ValueError):
+            await service.resume_generation("missing", "other-plan:3")
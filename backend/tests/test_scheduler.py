@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from backend.core.scheduler import GenerationQueueFull, GenerationScheduler
+
+
+@pytest.mark.anyio
+class TestGenerationScheduler:
+    """Test admission control and fair queueing."""
+
+    async def test_admits_up_to_max_concurrency(self):
+        scheduler = GenerationScheduler(max_concurrency=2, max_queue=1, retry_after_seconds=5)
+
+        first = scheduler.enqueue("alice")
+        second = scheduler.enqueue("alice")
+        third = scheduler.enqueue("bob")
+
+        assert first.granted and second.granted and not third.granted
+        assert scheduler.stats()["active"] == 2
+        assert scheduler.stats()["queued"] == 1
+
+        with pytest.raises(GenerationQueueFull) as exc_info:
+            scheduler.enqueue("carol")
+        assert exc_info.value.retry_after == 5
+
+        first.release()
+        assert third.granted
+        assert scheduler.stats()["queued"] == 0
+
+    async def test_round_robin_across_users(self):
+        scheduler = GenerationScheduler(max_concurrency=1, max_queue=10, retry_after_seconds=5)
+        running = scheduler.enqueue("alice")
+        alice = [scheduler.enqueue("alice") for _ in range(3)]
+        bob = scheduler.enqueue("bob")
+
+        assert [scheduler.position(t) for t in alice] == [1, 3, 4]
+        assert scheduler.position(bob) == 2
+
+        order = []
+        current = running
+        for _ in range(4):
+            current.release()
+            current = next(t for t in alice + [bob] if t.granted and not t.released)
+            order.append(current.user_key)
+
+        assert order == ["alice", "bob", "alice", "alice"]
+
+    async def test_waiter_reports_positions_until_admitted(self):
+        scheduler = GenerationScheduler(max_concurrency=1, max_queue=10, retry_after_seconds=5)
+        running = scheduler.enqueue("alice")
+        ahead = scheduler.enqueue("bob")
+        ticket = scheduler.enqueue("carol")
+
+        async def wait():
+            return [position async for position in ticket.wait()]
+
+        waiter = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        running.release()
+        await asyncio.sleep(0)
+        ahead.release()
+
+        assert await waiter == [2, 1]
+        assert ticket.granted
+
+    async def test_abandoned_waiter_leaves_queue(self):
+        scheduler = GenerationScheduler(max_concurrency=1, max_queue=10, retry_after_seconds=5)
+        running = scheduler.enqueue("alice")
+        abandoned = scheduler.enqueue("bob")
+        waiting = scheduler.enqueue("carol")
+
+        abandoned.release()
+        assert scheduler.position(waiting) == 1
+
+        running.release()
+        assert waiting.granted
+        assert scheduler.stats() == {
+            "active": 1, "queued": 0, "rejected": 0, "max_concurrency": 1, "max_queue": 10
+        }
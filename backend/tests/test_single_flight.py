@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from backend.core.single_flight import SingleFlight
+
+EVENTS = [{"type": "task", "n": n} for n in range(20)]
+
+
+class Upstream:
+    """A controllable upstream stream that counts how often it is opened."""
+
+    def __init__(self, fail_after: int = -1):
+        self.opened = 0
+        self.fail_after = fail_after
+
+    async def stream(self):
+        self.opened += 1
+        for n, event in enumerate(EVENTS):
+            if n == self.fail_after:
+                raise RuntimeError("upstream failed")
+            await asyncio.sleep(0)
+            yield event
+
+
+async def collect(events) -> list[dict]:
+    return [event async for event in events]
+
+
+@pytest.mark.anyio
+class TestSingleFlight:
+    """Test coalescing of identical concurrent streams."""
+
+    async def test_concurrent_subscribers_share_one_stream(self):
+        single_flight = SingleFlight(queue_size=64)
+        upstream = Upstream()
+
+        results = await asyncio.gather(*(
+            collect(single_flight.subscribe("key", upstream.stream)) for _ in range(5)
+        ))
+
+        assert upstream.opened == 1
+        assert all(result == EVENTS for result in results)
+        assert not single_flight.is_running("key")
+
+    async def test_late_joiner_replays_missed_events(self):
+        single_flight = SingleFlight(queue_size=64)
+        upstream = Upstream()
+
+        first = single_flight.subscribe("key", upstream.stream)
+        received = [await anext(first) for _ in range(10)]
+        late = single_flight.subscribe("key", upstream.stream)
+
+        received.extend(await collect(first))
+        assert received == EVENTS
+        assert await collect(late) == EVENTS
+        assert upstream.opened == 1
+
+    async def test_slow_subscriber_with_small_queue_gets_everything(self):
+        single_flight = SingleFlight(queue_size=1)
+        upstream = Upstream()
+
+        async def slow():
+            events = []
+            async for event in single_flight.subscribe("key", upstream.stream):
+                events.append(event)
+                await asyncio.sleep(0.001)
+            return events
+
+        fast, slow_events = await asyncio.gather(
+            collect(single_flight.subscribe("key", upstream.stream)), slow()
+        )
+
+        assert fast == EVENTS
+        assert slow_events == EVENTS
+
+    async def test_upstream_error_reaches_every_subscriber(self):
+        single_flight = SingleFlight(queue_size=64)
+        upstream = Upstream(fail_after=5)
+
+        results = await asyncio.gather(
+            collect(single_flight.subscribe("key", upstream.stream)),
+            collect(single_flight.subscribe("key", upstream.stream)),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert not single_flight.is_running("key")
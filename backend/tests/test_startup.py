@@ -0,0 +1,41 @@
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend import main
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+class TestStartup:
+    """Test what importing the app loads."""
+
+    def test_app_import_skips_the_llm_stack(self):
+        code = (
+            "import sys, backend.main\n"
+            "print(sorted({m.split('.')[0] for m in sys.modules} & {'langchain_core', 'langchain_openai', 'openai'}))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=REPO_ROOT,
+            env={"OPENAI_API_KEY": "dummy", **os.environ},
+            capture_output=True,
+            text=True,
+            check=True
+        )
+
+        assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.anyio
+async def test_prewarm_failure_is_logged(monkeypatch, caplog):
+    monkeypatch.setattr(main, "PLANNER_MODULE", "backend.core.no_such_planner")
+
+    with caplog.at_level(logging.ERROR):
+        await main.prewarm_planner()
+
+    assert "Failed to prewarm the planner" in caplog.text
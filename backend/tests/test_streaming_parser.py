@@ -0,0 +1,74 @@
+import json
+
+from backend.benchmarks.bench_streaming_parser import chunk_stream, load_recording
+from backend.core.planner import EVENT_EXAMPLES
+from backend.core.streaming_parser import StreamingJSONParser, compact_event, expand_event
+
+
+def parse_all(chunks: list[str]) -> list[dict]:
+    parser = StreamingJSONParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.process_chunk(chunk))
+    events.extend(parser.flush())
+    return events
+
+
+class TestStreamingJSONParser:
+    """Test incremental NDJSON parsing."""
+
+    def test_chunk_size_does_not_change_events(self):
+        text = load_recording("plan_16_weeks.ndjson")
+        expected = parse_all([text])
+
+        assert expected[0]["type"] == "overview"
+        assert expected[-1]["type"] == "done"
+        for size in (1, 3, 7, 64):
+            assert parse_all(chunk_stream(text, size)) == expected
+
+    def test_partial_line_is_buffered(self):
+        parser = StreamingJSONParser()
+
+        assert parser.process_chunk('{"type":"ove') == []
+        assert parser.has_buffered_data()
+        assert parser.buffer == '{"type":"ove'
+
+        events = parser.process_chunk('rview","value":"x"}\n{"type"')
+        assert events == [{"type": "overview", "value": "x"}]
+        assert parser.buffer == '{"type"'
+
+    def test_invalid_and_blank_lines_are_skipped(self):
+        events = parse_all(['not json\n', '\n  \r\n', '{"type":"done"}\r\n'])
+        assert events == [{"type": "done"}]
+
+    def test_flush_parses_trailing_line_and_resets(self):
+        parser = StreamingJSONParser()
+        parser.process_chunk('{"type":"done"}')
+
+        assert parser.flush() == [{"type": "done"}]
+        assert not parser.has_buffered_data()
+        assert parser.flush() == []
+
+
+class TestCompactEvents:
+    """Test the compact positional event protocol."""
+
+    def test_recording_round_trips_through_compact_lines(self):
+        events = parse_all([load_recording("plan_16_weeks.ndjson")])
+        compact = "".join(json.dumps(compact_event(event)) + "\n" for event in events)
+
+        for size in (1, 7, 64):
+            assert parse_all(chunk_stream(compact, size)) == events
+
+    def test_prompt_examples_expand_to_their_json_events(self):
+        for event_type, example in EVENT_EXAMPLES["compact"].items():
+            expected = json.loads(EVENT_EXAMPLES["json"][event_type].replace("WEEK", "3"))
+            assert expand_event(json.loads(example.replace("WEEK", "3"))) == expected
+
+    def test_malformed_compact_lines_are_skipped(self):
+        events = parse_all(['["t",1,"Title"]\n', '["x"]\n', '[]\n', '["d"]'])
+        assert events == [{"type": "done"}]
+
+    def test_arrays_with_unhashable_tags_are_skipped(self):
+        events = parse_all(['[["t",1,"a","b","c"]]\n', '[{"type":"done"}]\n', '[1]\n', '["d"]\n'])
+        assert events == [{"type": "done"}]
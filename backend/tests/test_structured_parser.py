@@ -0,0 +1,158 @@
+import json
+
+import pytest
+
+from backend.benchmarks.bench_streaming_parser import chunk_stream
+from backend.core.planner import HealthPlannerAI
+from backend.core.structured_parser import PartialJSONParser, StructuredPlanParser
+
+DOCUMENT = {
+    "overview": 'Build to a "first" 5k \\ at an easy pace, café stops allowed.',
+    "weeks": [
+        {
+            "week": week,
+            "focus": f"Week {week}: run\twalk intervals",
+            "tasks": [
+                {"title": f"Run {n}", "description": f"Jog {n + week} min, walk 1 — repeat", "duration": "30 mins"}
+                for n in range(1, 4)
+            ],
+        }
+        for week in (1, 2)
+    ],
+}
+
+
+def parse_all(chunks: list[str]) -> list[dict]:
+    parser = StructuredPlanParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.process_chunk(chunk))
+    events.extend(parser.flush())
+    return events
+
+
+def expected_events(document: dict) -> list[dict]:
+    events = [{"type": "overview", "value": document["overview"]}]
+    for week in document["weeks"]:
+        events.append({"type": "week_start", "week": week["week"], "focus": week["focus"]})
+        events.extend({"type": "task", "week": week["week"], "task": task} for task in week["tasks"])
+    return events + [{"type": "done"}]
+
+
+class TestPartialJSONParser:
+    """Test incremental parsing of one JSON document."""
+
+    def test_reports_values_as_they_complete(self):
+        values = []
+        parser = PartialJSONParser(lambda path, value: values.append((path, value)))
+
+        parser.feed('{"a": [1, tr')
+        assert values == [(("a", 0), 1)]
+        assert parser.root == {"a": [1]}
+
+        parser.feed('ue], "b": {}}')
+        assert values[1:] == [
+            (("a", 1), True),
+            (("a",), [1, True]),
+            (("b",), {}),
+            ((), {"a": [1, True], "b": {}}),
+        ]
+
+
+class TestStructuredPlanParser:
+    """Test turning a streamed structured plan into plan events."""
+
+    def test_chunk_size_does_not_change_events(self):
+        text = json.dumps(DOCUMENT, indent=2)
+        assert "\\u2014" in text and '\\"' in text and "\\\\" in text
+
+        expected = expected_events(DOCUMENT)
+        assert parse_all([text]) == expected
+        for size in (1, 2, 5):
+            assert parse_all(chunk_stream(text, size)) == expected
+
+    def test_escapes_split_across_chunks(self):
+        text = json.dumps(DOCUMENT)
+        escapes = [text.index("\\u2014"), text.index('\\"'), text.index("\\\\")]
+
+        for at in escapes:
+            for offset in range(1, 6):
+                chunks = [text[:at + offset], text[at + offset:]]
+                assert parse_all(chunks) == expected_events(DOCUMENT)
+
+    def test_cut_off_document_keeps_completed_tasks(self):
+        text = json.dumps(DOCUMENT)
+        # Cut inside the second task of week 2
+        cut = text.index('"Run 2"', text.index('"week": 2')) + 3
+
+        events = parse_all(chunk_stream(text[:cut], 7))
+
+        assert [e["type"] for e in events] == [
+            "overview", "week_start", "task", "task", "task", "week_start", "task", "done"
+        ]
+        assert events[-2]["task"]["title"] == "Run 1"
+        assert events[-1] == {"type": "done", "partial": True}
+
+    def test_invalid_json_without_usable_output_is_an_error(self):
+        events = parse_all(['{"overview": "Start slow", "weeks": [{"week": 1,', ' oops}'])
+
+        assert events[0] == {"type": "overview", "value": "Start slow"}
+        assert events[-1]["type"] == "error"
+        assert parse_all([""])[-1]["type"] == "error"
+
+    def test_invalid_json_after_complete_tasks_is_recovered(self):
+        text = json.dumps(DOCUMENT)
+        cut = text.index('{"title": "Run 1"', text.index('"week": 2'))
+        parser = StructuredPlanParser()
+
+        events = parser.process_chunk(text[:cut] + "garbage")
+        assert parser.process_chunk(text[cut:]) == []
+        events += parser.flush()
+
+        assert [e["type"] for e in events] == ["overview", "week_start", "task", "task", "task", "done"]
+
+    def test_invalid_tasks_are_skipped(self):
+        document = {
+            "overview": "Walk more",
+            "weeks": [{"week": 1, "focus": "Walking", "tasks": [
+                {"title": "Walk", "description": "Walk 20 min"},
+                {"title": "Walk", "description": "Walk 20 min", "duration": 20},
+                "walk",
+                {"title": "Walk", "description": "Walk 30 min", "duration": "30 mins"},
+            ]}],
+        }
+
+        events = parse_all([json.dumps(document)])
+
+        assert [e["type"] for e in events] == ["overview", "week_start", "task", "done"]
+        assert events[2]["task"]["description"] == "Walk 30 min"
+
+    def test_tasks_before_focus(self):
+        text = json.dumps({
+            "overview": "Swim more",
+            "weeks": [
+                {"tasks": [{"title": "Swim", "description": "Swim 200 m", "duration": "20 mins"}], "focus": "Late"},
+                {"week": 2, "tasks": [{"title": "Swim", "description": "Swim 300 m", "duration": "25 mins"}]},
+            ],
+        })
+
+        events = parse_all([text])
+
+        assert [(e["week"], e["focus"]) for e in events if e["type"] == "week_start"] == [
+            (1, "Week 1"), (2, "Week 2")
+        ]
+        assert events[-1] == {"type": "done"}
+
+
+@pytest.mark.anyio
+async def test_unrecoverable_output_streams_an_error():
+    async def events():
+        for event in parse_all(['{"overview": "Start slow", "weeks": [', '}']):
+            yield event
+
+    planner = HealthPlannerAI()
+    sse = [(json.loads(event.split("data: ", 1)[1]), plan)
+           async for event, plan in planner.build_plan_streaming("Run", events())]
+
+    assert [event["type"] for event, _ in sse] == ["overview", "error"]
+    assert sse[-1][1] is None
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.db.repositories.plan_repository import PlanRepository
+from backend.db.write_behind import WriteBehindWriter
+from backend.services.plan_service import PlanService
+from backend.tests.test_plan_repository import make_plan
+
+
+@pytest.fixture
+async def writer(db: AsyncSession):
+    writer = WriteBehindWriter(
+        session_factory=async_sessionmaker(db.bind, class_=AsyncSession, expire_on_commit=False),
+        max_pending=8,
+        batch_size=100
+    )
+    yield writer
+    await writer.close()
+
+
+@pytest.mark.anyio
+class TestWriteBehind:
+    """Test batched write-behind persistence."""
+
+    async def test_concurrent_writes_share_commits(self, db: AsyncSession, writer: WriteBehindWriter):
+        plans = [make_plan(f"plan-{n}") for n in range(4)]
+        saved = await asyncio.gather(*(writer.save_plan(plan, "Beginner", "2 weeks") for plan in plans))
+        updates = await asyncio.gather(*(
+            writer.update_task_status(plan.id, 1, plan.weeks[0].tasks[0].id, True) for plan in plans
+        ))
+        await writer.flush()
+
+        assert all(future.result() for future in saved)
+        assert updates == [True] * 4
+        assert writer.writes == 8
+        assert writer.batches < writer.writes
+
+        stored = await PlanRepository(db).get_by_id("plan-3")
+        assert stored.weeks[0].tasks[0].completed
+
+    async def test_read_your_writes_before_commit(self, db: AsyncSession, writer: WriteBehindWriter):
+        service = PlanService(db, writer=writer)
+        plan = make_plan()
+
+        await writer.save_plan(plan, "Beginner", "2 weeks")
+        assert writer.get_pending_plan(plan.id) is plan
+        assert (await service.get_plan(plan.id)).id == plan.id
+
+        assert await service.update_task_status(plan.id, 2, plan.weeks[1].tasks[2].id, True)
+        assert writer.get_pending_plan(plan.id) is None
+        assert (await service.get_plan(plan.id)).weeks[1].tasks[2].completed
+
+    async def test_missing_task_and_failed_write_are_isolated(self, db: AsyncSession, writer: WriteBehindWriter):
+        plan = make_plan()
+        first = await writer.save_plan(plan, "Beginner", "2 weeks")
+        duplicate = await writer.save_plan(make_plan(), "Beginner", "2 weeks")
+        missing = writer.update_task_status(plan.id, 1, "no-such-task", True)
+
+        assert not await missing
+        await writer.flush()
+        assert first.result() is True
+        assert duplicate.result() is False
+        assert await PlanRepository(db).get_by_id(plan.id) is not None
+
+    async def test_close_flushes_queue(self, db: AsyncSession, writer: WriteBehindWriter):
+        await writer.save_plan(make_plan(), "Beginner", "2 weeks")
+        await writer.close()
+
+        assert await PlanRepository(db).get_by_id("plan-1") is not None
@@ -4,11 +4,12 @@ import {PlanDisplay} from './components/PlanDisplay';
 import {SavedPlans} from './components/SavedPlans';
 
 
-import type {HealthGoal, GoalPlan} from './types';
+import type {HealthGoal, GoalPlan, PlanSummary} from './types';
 import {ErrorAlert} from "./components/ui/error-alert.tsx";
 import {
     generatePlanStreaming,
-    listPlans,
+    getPlan,
+    listPlanSummaries,
     updateTaskStatus,
     deletePlan
 } from "./services/api.ts";
@@ -16,7 +17,8 @@ import {
 function App() {
     const [loading, setLoading] = useState(false);
     const [plan, setPlan] = useState<GoalPlan | null>(null);
-    const [savedPlans, setSavedPlans] = useState<GoalPlan[]>([]);
+    const [savedPlans, setSavedPlans] = useState<PlanSummary[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [error, setError] = useState<string>('');
 
     // Load saved plans
@@ -26,13 +28,26 @@ function App() {
 
     const loadSavedPlans = useCallback(async () => {
         try {
-            const plans = await listPlans();
-            setSavedPlans(plans);
+            const page = await listPlanSummaries();
+            setSavedPlans(page.items);
+            setNextCursor(page.next_cursor);
         } catch (err) {
             console.error('Failed to load saved plans:', err);
         }
     }, []);
 
+    const loadMoreSavedPlans = useCallback(async () => {
+        if (!nextCursor) return;
+
+        try {
+            const page = await listPlanSummaries(nextCursor);
+            setSavedPlans(prev => [...prev, ...page.items]);
+            setNextCursor(page.next_cursor);
+        } catch (err) {
+            console.error('Failed to load saved plans:', err);
+        }
+    }, [nextCursor]);
+
     const handleGoalSubmit = async (goal: HealthGoal) => {
         setLoading(true);
         setError('');
@@ -130,7 +145,6 @@ function App() {
         });
 
         setPlan(prev => prev ? updatePlanTasks(prev) : prev);
-        setSavedPlans(prev => prev.map(p => p.id === plan.id ? updatePlanTasks(p) : p));
 
         try {
             await updateTaskStatus(plan.id, weekNumber, taskId, completed);
@@ -139,16 +153,18 @@ function App() {
 
             // Revert on error
             setPlan(prev => prev ? updatePlanTasks({...prev, weeks: prev.weeks}) : prev);
-            setSavedPlans(prev => prev.map(p =>
-                p.id === plan.id ? updatePlanTasks(p) : p
-            ));
             setError('Failed to update task. Please try again.');
         }
     };
 
-    const handlePlanSelect = useCallback((selectedPlan: GoalPlan) => {
-        setPlan(selectedPlan);
+    const handlePlanSelect = useCallback(async (planId: string) => {
         setError('');
+        try {
+            setPlan(await getPlan(planId));
+        } catch (err) {
+            console.error('Failed to load plan:', err);
+            setError('Failed to load plan. Please try again.');
+        }
     }, []);
 
     const handlePlanDelete = async (id: string) => {
@@ -233,6 +249,7 @@ function App() {
                             plans={savedPlans}
                             onSelect={handlePlanSelect}
                             onDelete={handlePlanDelete}
+                            onLoadMore={nextCursor ? loadMoreSavedPlans : undefined}
                             selectedPlanId={plan?.id}
                         />
                     </div>
@@ -1,12 +1,13 @@
 import {Button} from "./ui/button.tsx";
 import {Card, CardContent, CardHeader, CardTitle} from "./ui/card.tsx";
-import type {GoalPlan} from "../types";
+import type {PlanSummary} from "../types";
 import React from "react";
 
 interface SavedPlansProps {
-    plans: GoalPlan[];
-    onSelect: (plan: GoalPlan) => void;
+    plans: PlanSummary[];
+    onSelect: (planId: string) => void;
     onDelete: (id: string) => void;
+    onLoadMore?: () => void;
     selectedPlanId?: string;
 }
 
@@ -14,6 +15,7 @@ export const SavedPlans: React.FC<SavedPlansProps> = ({
                                                           plans,
                                                           onSelect,
                                                           onDelete,
+                                                          onLoadMore,
                                                           selectedPlanId
                                                       }) => {
     if (plans.length === 0) {
@@ -37,15 +39,15 @@ export const SavedPlans: React.FC<SavedPlansProps> = ({
                     >
                         <div
                             className="cursor-pointer flex-1"
-                            onClick={() => onSelect(plan)}
+                            onClick={() => onSelect(plan.id)}
                         >
                             <p className="font-medium">{plan.goal}</p>
                             <p className="text-xs text-gray-500">
                                 {new Date(plan.created_at).toLocaleDateString()}
                             </p>
-                            {plan.weeks.length > 0 && (
+                            {plan.timeline && (
                                 <p className="text-xs text-gray-400 mt-1">
-                                    {plan.weeks.length} weeks
+                                    {plan.timeline}
                                 </p>
                             )}
                         </div>
@@ -61,6 +63,11 @@ export const SavedPlans: React.FC<SavedPlansProps> = ({
                         </Button>
                     </div>
                 ))}
+                {onLoadMore && (
+                    <Button variant="outline" className="w-full" onClick={onLoadMore}>
+                        Load more
+                    </Button>
+                )}
             </CardContent>
         </Card>
     );
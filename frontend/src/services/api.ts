@@ -1,5 +1,7 @@
 import axios from 'axios';
-import type {HealthGoal} from '../types';
+import type {
+    GoalPlan, HealthGoal, PlanProgress, PlanSearchPage, PlanSummaryPage, TaskStatusChange, TaskStatusResult
+} from '../types';
 
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
@@ -11,21 +13,20 @@ const api = axios.create({
     },
 });
 
-export const generatePlanStreaming = async (
-    goal: HealthGoal,
+const MAX_RESUME_ATTEMPTS = 3;
+
+interface StreamState {
+    lastEventId: string | null;
+    finished: boolean;
+}
+
+// Read an SSE response, tracking the last event id and whether the
+// generation reached a final event.
+const readEvents = async (
+    response: Response,
+    state: StreamState,
     onEvent: (event: any) => void
 ): Promise<void> => {
-    const response = await fetch(`${API_BASE_URL}/api/plans/generate`, {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({
-            goal: goal.goal,
-            current_level: goal.currentLevel,
-            timeline: goal.timeline,
-            constraints: goal.constraints,
-        }),
-    });
-
     if (!response.body) {
         throw new Error('No response body');
     }
@@ -44,16 +45,68 @@ export const generatePlanStreaming = async (
         buffer = events.pop()!;
 
         for (const evt of events) {
-            if (!evt.startsWith('data:')) continue;
+            let data = '';
+            for (const line of evt.split('\n')) {
+                if (line.startsWith('id:')) state.lastEventId = line.replace(/^id:\s*/, '');
+                if (line.startsWith('data:')) data = line.replace(/^data:\s*/, '');
+            }
+            if (!data) continue;
 
-            const json = evt.replace(/^data:\s*/, '');
-            const parsed = JSON.parse(json);
+            const parsed = JSON.parse(data);
+            if (parsed.type === 'done' || parsed.type === 'error') state.finished = true;
 
             onEvent(parsed);
         }
     }
 };
 
+export const generatePlanStreaming = async (
+    goal: HealthGoal,
+    onEvent: (event: any) => void
+): Promise<void> => {
+    const response = await fetch(`${API_BASE_URL}/api/plans/generate`, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({
+            goal: goal.goal,
+            current_level: goal.currentLevel,
+            timeline: goal.timeline,
+            constraints: goal.constraints,
+        }),
+    });
+
+    if (response.status === 429) {
+        const retryAfter = response.headers.get('Retry-After') ?? 'a few';
+        throw new Error(`Too many plans are being generated. Retry in ${retryAfter} seconds.`);
+    }
+
+    const state: StreamState = {lastEventId: null, finished: false};
+    try {
+        await readEvents(response, state, onEvent);
+    } catch (err) {
+        if (!state.lastEventId) throw err;
+    }
+
+    // The generation keeps running on the server if the connection drops;
+    // pick it up again after the last event we saw instead of starting over.
+    for (let attempt = 0; !state.finished && state.lastEventId && attempt < MAX_RESUME_ATTEMPTS; attempt++) {
+        const planId = state.lastEventId.slice(0, state.lastEventId.lastIndexOf(':'));
+        try {
+            const resumed = await fetch(`${API_BASE_URL}/api/plans/generate/${planId}/events`, {
+                headers: {'Last-Event-ID': state.lastEventId},
+            });
+            if (!resumed.ok) break;
+            await readEvents(resumed, state, onEvent);
+        } catch (err) {
+            console.error('Failed to resume plan stream:', err);
+        }
+    }
+
+    if (!state.finished) {
+        throw new Error('Plan stream ended unexpectedly');
+    }
+};
+
 
 export const listPlans = async () => {
     const response = await api.get('/api/plans');
@@ -61,6 +114,34 @@ export const listPlans = async () => {
 };
 
 
+export const listPlanSummaries = async (cursor?: string | null): Promise<PlanSummaryPage> => {
+    const response = await api.get('/api/plans/summaries', {
+        params: cursor ? {cursor} : undefined,
+    });
+    return response.data;
+};
+
+
+export const searchPlans = async (query: string, cursor?: string | null): Promise<PlanSearchPage> => {
+    const response = await api.get('/api/plans/search', {
+        params: cursor ? {q: query, cursor} : {q: query},
+    });
+    return response.data;
+};
+
+
+export const getPlan = async (planId: string): Promise<GoalPlan> => {
+    const response = await api.get(`/api/plans/${planId}`);
+    return response.data.plan;
+};
+
+
+export const getPlanProgress = async (planId: string): Promise<PlanProgress> => {
+    const response = await api.get(`/api/plans/${planId}/progress`);
+    return response.data;
+};
+
+
 export const updateTaskStatus = async (
     planId: string,
     weekNumber: number,
@@ -75,6 +156,15 @@ export const updateTaskStatus = async (
 }
 
 
+// Apply many task changes, e.g. a whole week or an offline replay, in one request.
+export const updateTaskStatuses = async (
+    updates: TaskStatusChange[]
+): Promise<TaskStatusResult[]> => {
+    const response = await api.patch('/api/plans/tasks', {updates});
+    return response.data.results;
+};
+
+
 export const deletePlan = async (planId: string) => {
     await api.delete(`/api/plans/${planId}`);
 };
\ No newline at end of file
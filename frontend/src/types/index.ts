@@ -25,4 +25,56 @@ export interface GoalPlan {
     overview: string;
     weeks: WeeklyPlan[];
     created_at: string;
-}
\ No newline at end of file
+}
+
+export interface PlanSummary {
+    id: string;
+    goal: string;
+    overview: string;
+    timeline: string;
+    created_at: string;
+}
+
+export interface PlanSummaryPage {
+    items: PlanSummary[];
+    next_cursor: string | null;
+}
+
+export interface TaskStatusChange {
+    plan_id: string;
+    week: number;
+    task_id: string;
+    completed: boolean;
+}
+
+export interface TaskStatusResult {
+    plan_id: string;
+    week: number;
+    task_id: string;
+    updated: boolean;
+}
+
+export interface WeekProgress {
+    week: number;
+    total_tasks: number;
+    completed_tasks: number;
+    percent: number;
+}
+
+export interface PlanProgress {
+    plan_id: string;
+    total_tasks: number;
+    completed_tasks: number;
+    percent: number;
+    last_activity_at: string | null;
+    weeks: WeekProgress[];
+}
+
+export interface PlanSearchHit extends PlanSummary {
+    snippet: string;
+}
+
+export interface PlanSearchPage {
+    items: PlanSearchHit[];
+    next_cursor: string | null;
+}